@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+"""
+Foreign-key graph engine for impact analysis.
+This script builds the FK graph of a schema (DDL or Mermaid ERD, loaded through
+sql_to_mmd), finds FK cycles as strongly connected components, condenses them
+into a DAG and precomputes a bitset reachability index, so ancestor/descendant
+and cascade-delete depth questions are answered without walking the graph.
+"""
+
+import sys
+import json
+from typing import List, Dict, Any
+
+from sql_dialect_translate import split_cli_args
+
+
+INDEX_FORMAT_VERSION = 1
+
+
+def strongly_connected_components(node_count: int, successors: List[List[int]]) -> List[List[int]]:
+    """
+    Iterative Tarjan's algorithm (no recursion, so deep FK chains are safe).
+    Components are returned in reverse topological order: every edge leaving a
+    component points to a component that appears earlier in the list.
+    """
+    index_of = [-1] * node_count
+    lowlink = [0] * node_count
+    on_stack = [False] * node_count
+    stack = []
+    components = []
+    counter = 0
+
+    for root in range(node_count):
+        if index_of[root] != -1:
+            continue
+        work = [(root, 0)]
+        while work:
+            node, edge = work[-1]
+            if edge == 0:
+                index_of[node] = lowlink[node] = counter
+                counter += 1
+                stack.append(node)
+                on_stack[node] = True
+            if edge < len(successors[node]):
+                work[-1] = (node, edge + 1)
+                nxt = successors[node][edge]
+                if index_of[nxt] == -1:
+                    work.append((nxt, 0))
+                elif on_stack[nxt]:
+                    lowlink[node] = min(lowlink[node], index_of[nxt])
+                continue
+            work.pop()
+            if work:
+                parent = work[-1][0]
+                lowlink[parent] = min(lowlink[parent], lowlink[node])
+            if lowlink[node] == index_of[node]:
+                component = []
+                while True:
+                    member = stack.pop()
+                    on_stack[member] = False
+                    component.append(member)
+                    if member == node:
+                        break
+                components.append(sorted(component))
+    return components
+
+
+class FkGraph:
+    """
+    FK graph with a precomputed reachability index.
+    Edges point from a referenced (parent) table to the referencing (child)
+    table, the direction in which deletes and drops propagate. Descendants of a
+    table are everything that depends on it; ancestors are what it depends on.
+    """
+
+    def __init__(self, tables: List[str], edges: List[Dict[str, Any]], index: Dict[str, Any] = None):
+        self.names = list(tables)
+        self.ids = {name.lower(): i for i, name in enumerate(self.names)}
+        self.edges = edges
+        count = len(self.names)
+        self.children = [[] for _ in range(count)]
+        self.parents = [[] for _ in range(count)]
+        self.cascade_children = [[] for _ in range(count)]
+        for edge in edges:
+            parent, child = self.ids[edge["parent"].lower()], self.ids[edge["child"].lower()]
+            if child not in self.children[parent]:
+                self.children[parent].append(child)
+                self.parents[child].append(parent)
+            if edge.get("on_delete") == "CASCADE" and child not in self.cascade_children[parent]:
+                self.cascade_children[parent].append(child)
+
+        if index is None:
+            self.components = strongly_connected_components(count, self.children)
+        else:
+            self.components = index["components"]
+        self._build_dag()
+        if index is None:
+            self._build_index()
+        else:
+            self.down = [int(bits, 16) for bits in index["down"]]
+            self.up = [int(bits, 16) for bits in index["up"]]
+            self.depth = index["depth"]
+            self.cascade_depth = index["cascade_depth"]
+            self.cascade_cycle = index["cascade_cycle"]
+
+    @classmethod
+    def from_model(cls, model: Dict[str, Any]) -> "FkGraph":
+        """Build from a sql_to_mmd schema model; FKs to tables outside the schema are ignored."""
+        tables = [entry["name"] for entry in model["tables"].values()]
+        known = {name.lower() for name in tables}
+        edges = []
+        for entry in model["tables"].values():
+            for fk in entry["foreign_keys"]:
+                parent = fk["to_table"].split('.')[-1]
+                if parent.lower() not in known:
+                    continue
+                columns = [entry["columns"].get(name.lower(), {}) for name in fk["from_columns"]]
+                edges.append({
+                    "parent": model["tables"][parent.lower()]["name"],
+                    "child": entry["name"],
+                    "child_columns": fk["from_columns"],
+                    "parent_columns": fk["to_columns"] or model["tables"][parent.lower()]["primary_keys"],
+                    "on_delete": fk.get("on_delete", "NO ACTION"),
+                    "nullable": any(not (column.get("is_not_null") or column.get("is_primary_key"))
+                                    for column in columns)
+                })
+        return cls(tables, edges)
+
+    def _build_dag(self):
+        count = len(self.names)
+        self.component_of = [0] * count
+        for c, members in enumerate(self.components):
+            for node in members:
+                self.component_of[node] = c
+
+        # Condensed DAG; component order is reverse topological, so successors have smaller ids
+        component_count = len(self.components)
+        self.dag_children = [set() for _ in range(component_count)]
+        self.dag_parents = [set() for _ in range(component_count)]
+        for parent in range(count):
+            for child in self.children[parent]:
+                a, b = self.component_of[parent], self.component_of[child]
+                if a != b:
+                    self.dag_children[a].add(b)
+                    self.dag_parents[b].add(a)
+
+    def _build_index(self):
+        component_count = len(self.components)
+
+        # Transitive closure as one int bitset per component, in both directions
+        self.down = [0] * component_count
+        for c in range(component_count):
+            bits = 0
+            for child in self.dag_children[c]:
+                bits |= (1 << child) | self.down[child]
+            self.down[c] = bits
+        self.up = [0] * component_count
+        for c in reversed(range(component_count)):
+            bits = 0
+            for parent in self.dag_parents[c]:
+                bits |= (1 << parent) | self.up[parent]
+            self.up[c] = bits
+
+        # Longest dependent chain below each component (any FK and CASCADE-only)
+        self.depth = [0] * component_count
+        self.cascade_depth = [0] * component_count
+        self.cascade_cycle = [False] * component_count
+        for c in range(component_count):
+            self.depth[c] = max((1 + self.depth[child] for child in self.dag_children[c]), default=0)
+            depth = 0
+            for node in self.components[c]:
+                for child in self.cascade_children[node]:
+                    target = self.component_of[child]
+                    if target == c:
+                        self.cascade_cycle[c] = True
+                    else:
+                        depth = max(depth, 1 + self.cascade_depth[target])
+                        self.cascade_cycle[c] = self.cascade_cycle[c] or self.cascade_cycle[target]
+            self.cascade_depth[c] = depth
+
+    def node(self, table: str) -> int:
+        key = table.strip('"').lower().split('.')[-1]
+        if key not in self.ids:
+            raise KeyError(f"Unknown table: {table}")
+        return self.ids[key]
+
+    def _members(self, bits: int, own_component: int, include_cycle: bool) -> List[str]:
+        result = []
+        if include_cycle:
+            result.extend(self.names[n] for n in self.components[own_component])
+        while bits:
+            low = bits & -bits
+            result.extend(self.names[n] for n in self.components[low.bit_length() - 1])
+            bits ^= low
+        return sorted(result, key=str.lower)
+
+    def descendants(self, table: str) -> List[str]:
+        """All tables that (transitively) reference the table: the impact of dropping it."""
+        node = self.node(table)
+        c = self.component_of[node]
+        cyclic = len(self.components[c]) > 1 or node in self.children[node]
+        return [name for name in self._members(self.down[c], c, cyclic) if name != self.names[node] or node in self.children[node]]
+
+    def ancestors(self, table: str) -> List[str]:
+        """All tables the table (transitively) references."""
+        node = self.node(table)
+        c = self.component_of[node]
+        cyclic = len(self.components[c]) > 1 or node in self.children[node]
+        return [name for name in self._members(self.up[c], c, cyclic) if name != self.names[node] or node in self.children[node]]
+
+    def depends_on(self, child: str, parent: str) -> bool:
+        """O(1) test: does child (transitively) reference parent?"""
+        a, b = self.component_of[self.node(parent)], self.component_of[self.node(child)]
+        if a == b:
+            return len(self.components[a]) > 1 or self.node(child) in self.children[self.node(parent)]
+        return bool(self.down[a] >> b & 1)
+
+    def impact(self, table: str) -> Dict[str, Any]:
+        """Summary of what a DROP or DELETE on the table touches."""
+        node = self.node(table)
+        c = self.component_of[node]
+        return {
+            "table": self.names[node],
+            "direct_children": sorted((self.names[n] for n in self.children[node]), key=str.lower),
+            "direct_parents": sorted((self.names[n] for n in self.parents[node]), key=str.lower),
+            "descendants": self.descendants(table),
+            "ancestors": self.ancestors(table),
+            "dependency_depth": self.depth[c],
+            "cascade_delete_depth": self.cascade_depth[c],
+            "cascade_cycle": self.cascade_cycle[c],
+            "fk_cycle": [self.names[n] for n in self.components[c]] if len(self.components[c]) > 1 else []
+        }
+
+    def cycles(self) -> List[List[str]]:
+        """FK cycles: components with more than one table, or a self-referencing table."""
+        result = []
+        for members in self.components:
+            if len(members) > 1 or members[0] in self.children[members[0]]:
+                result.append(sorted((self.names[n] for n in members), key=str.lower))
+        return result
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "tables": len(self.names),
+            "foreign_keys": len(self.edges),
+            "components": len(self.components),
+            "dag_edges": sum(len(children) for children in self.dag_children),
+            "cycles": len(self.cycles()),
+            "max_dependency_depth": max(self.depth, default=0),
+            "max_cascade_delete_depth": max(self.cascade_depth, default=0)
+        }
+
+    def to_json(self) -> Dict[str, Any]:
+        """Serializable index; the bitsets are stored as hex so reloading skips recomputation."""
+        return {
+            "version": INDEX_FORMAT_VERSION,
+            "tables": self.names,
+            "edges": self.edges,
+            "components": self.components,
+            "down": [format(bits, 'x') for bits in self.down],
+            "up": [format(bits, 'x') for bits in self.up],
+            "depth": self.depth,
+            "cascade_depth": self.cascade_depth,
+            "cascade_cycle": self.cascade_cycle
+        }
+
+    @classmethod
+    def from_json(cls, data: Dict[str, Any]) -> "FkGraph":
+        if data.get("version") != INDEX_FORMAT_VERSION:
+            raise ValueError(f"Unsupported FK index version: {data.get('version')}")
+        return cls(data["tables"], data["edges"], data)
+
+
+def load_fk_graph(path: str) -> FkGraph:
+    """Load a saved index (.json) or build one from a DDL/ERD schema file."""
+    if path.lower().endswith('.json'):
+        with open(path, 'r', encoding='utf-8') as f:
+            return FkGraph.from_json(json.load(f))
+    from sql_to_mmd import load_schema_model
+    return FkGraph.from_model(load_schema_model(path))
+
+
+def main():
+    """Main entry point for the script."""
+    positional, options = split_cli_args(sys.argv[1:])
+    if len(positional) < 1:
+        print(json.dumps({"error": "Usage: fk_graph.py <schema_ddl_mmd_or_index_json> [--save=index.json] [--impact=T1,T2] [--descendants=T] [--ancestors=T] [--cycles]"}), file=sys.stderr)
+        sys.exit(1)
+
+    try:
+        graph = load_fk_graph(positional[0])
+        if options.get("save"):
+            with open(options["save"], 'w', encoding='utf-8') as f:
+                json.dump(graph.to_json(), f)
+
+        result = {"summary": graph.summary()}
+        if options.get("impact"):
+            result["impact"] = [graph.impact(name) for name in options["impact"].split(',') if name]
+        if options.get("descendants"):
+            result["descendants"] = graph.descendants(options["descendants"])
+        if options.get("ancestors"):
+            result["ancestors"] = graph.ancestors(options["ancestors"])
+        if "cycles" in options:
+            result["cycles"] = graph.cycles()
+        print(json.dumps(result, indent=2))
+
+    except FileNotFoundError as e:
+        print(json.dumps({"error": f"File not found: {e.filename}"}), file=sys.stderr)
+        sys.exit(1)
+    except KeyError as e:
+        print(json.dumps({"error": str(e.args[0])}), file=sys.stderr)
+        sys.exit(1)
+    except Exception as e:
+        print(json.dumps({"error": str(e)}), file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+"""
+Shortest FK join-path finder with SQL JOIN generation.
+This script loads the FK graph of a schema (see fk_graph.py) into an undirected
+adjacency index once, then answers "how do these tables connect" with the k
+shortest join paths (Yen's algorithm over Dijkstra) and the matching JOIN
+clauses. Paths through nullable FKs and large tables cost more.
+"""
+
+import sys
+import json
+import math
+import heapq
+from typing import List, Dict, Any, Tuple
+
+from fk_graph import load_fk_graph, FkGraph
+from sql_dialect_translate import split_cli_args
+
+
+# Cost of one join hop, plus penalties for nullable FK columns and for table size
+HOP_COST = 1.0
+NULLABLE_PENALTY = 0.5
+SIZE_WEIGHT = 0.1
+
+DEFAULT_K = 3
+
+
+class JoinPathIndex:
+    """Undirected adjacency lists over the FK graph; each entry keeps the FK it came from."""
+
+    def __init__(self, graph: FkGraph, table_rows: Dict[str, float] = None):
+        self.graph = graph
+        count = len(graph.names)
+        # adjacency[node] = [(neighbour, edge number, hop cost)]; entering a table adds its size cost
+        self.adjacency = [[] for _ in range(count)]
+        table_rows = {name.lower(): rows for name, rows in (table_rows or {}).items()}
+        self.size_cost = [
+            SIZE_WEIGHT * math.log10(max(1.0, table_rows.get(name.lower(), 1.0)))
+            for name in graph.names
+        ]
+        for number, edge in enumerate(graph.edges):
+            parent, child = graph.node(edge["parent"]), graph.node(edge["child"])
+            if parent == child:
+                continue
+            base = HOP_COST + (NULLABLE_PENALTY if edge.get("nullable") else 0.0)
+            self.adjacency[parent].append((child, number, base))
+            self.adjacency[child].append((parent, number, base))
+
+    def shortest_path(self, sources, targets: set, banned_nodes: set = frozenset(),
+                      banned_edges: set = frozenset()) -> Tuple[float, List[int], List[int]]:
+        """
+        Dijkstra from one source (or several, all at cost 0) to the nearest of targets.
+        Returns (cost, nodes, edge numbers); nodes is empty when no path exists.
+        """
+        sources = [sources] if isinstance(sources, int) else list(sources)
+        if len(sources) == 1 and len(targets) == 1:
+            return self._bidirectional(sources[0], next(iter(targets)), banned_nodes, banned_edges)
+        best = {source: 0.0 for source in sources}
+        previous = {}
+        heap = [(0.0, source) for source in sources]
+        while heap:
+            cost, node = heapq.heappop(heap)
+            if cost > best.get(node, math.inf):
+                continue
+            if node in targets:
+                nodes, edges = [node], []
+                while node in previous:
+                    node, edge = previous[node]
+                    nodes.append(node)
+                    edges.append(edge)
+                return cost, nodes[::-1], edges[::-1]
+            for neighbour, edge, base in self.adjacency[node]:
+                if neighbour in banned_nodes or (node, neighbour, edge) in banned_edges:
+                    continue
+                new_cost = cost + base + self.size_cost[neighbour]
+                if new_cost < best.get(neighbour, math.inf):
+                    best[neighbour] = new_cost
+                    previous[neighbour] = (node, edge)
+                    heapq.heappush(heap, (new_cost, neighbour))
+        return math.inf, [], []
+
+    def _bidirectional(self, source: int, target: int, banned_nodes: set,
+                       banned_edges: set) -> Tuple[float, List[int], List[int]]:
+        """
+        Point-to-point Dijkstra searching from both ends; on wide schemas this
+        settles far fewer tables than a one-sided search.
+        """
+        if source == target:
+            return 0.0, [source], []
+        best = [{source: 0.0}, {target: 0.0}]
+        previous = [{}, {}]
+        heaps = [[(0.0, source)], [(0.0, target)]]
+        settled = [set(), set()]
+        meeting, shortest = None, math.inf
+        while heaps[0] and heaps[1]:
+            if heaps[0][0][0] + heaps[1][0][0] >= shortest:
+                break
+            side = 0 if heaps[0][0][0] <= heaps[1][0][0] else 1
+            cost, node = heapq.heappop(heaps[side])
+            if node in settled[side]:
+                continue
+            settled[side].add(node)
+            for neighbour, edge, base in self.adjacency[node]:
+                if neighbour in banned_nodes:
+                    continue
+                # Costs are for the source-to-target direction, so the backward search pays for node
+                if side == 0:
+                    if (node, neighbour, edge) in banned_edges:
+                        continue
+                    new_cost = cost + base + self.size_cost[neighbour]
+                else:
+                    if (neighbour, node, edge) in banned_edges:
+                        continue
+                    new_cost = cost + base + self.size_cost[node]
+                if new_cost < best[side].get(neighbour, math.inf):
+                    best[side][neighbour] = new_cost
+                    previous[side][neighbour] = (node, edge)
+                    heapq.heappush(heaps[side], (new_cost, neighbour))
+                other = best[1 - side].get(neighbour)
+                if other is not None and best[side][neighbour] + other < shortest:
+                    shortest = best[side][neighbour] + other
+                    meeting = neighbour
+        if meeting is None:
+            return math.inf, [], []
+
+        nodes, edges = [meeting], []
+        node = meeting
+        while node in previous[0]:
+            node, edge = previous[0][node]
+            nodes.append(node)
+            edges.append(edge)
+        nodes.reverse()
+        edges.reverse()
+        node = meeting
+        while node in previous[1]:
+            node, edge = previous[1][node]
+            nodes.append(node)
+            edges.append(edge)
+        return shortest, nodes, edges
+
+    def _edge_cost(self, node: int, neighbour: int, edge: int) -> float:
+        base = next(b for n, e, b in self.adjacency[node] if n == neighbour and e == edge)
+        return base + self.size_cost[neighbour]
+
+    def k_shortest_paths(self, source: int, target: int, k: int = DEFAULT_K) -> List[Tuple[float, List[int], List[int]]]:
+        """Yen's algorithm: the k cheapest loop-free join paths between two tables."""
+        first = self.shortest_path(source, {target})
+        if not first[1]:
+            return []
+        paths = [first]
+        candidates = []
+        seen = {tuple(first[2])}
+        while len(paths) < k:
+            _, last_nodes, last_edges = paths[-1]
+            for i in range(len(last_nodes) - 1):
+                spur = last_nodes[i]
+                root_nodes, root_edges = last_nodes[:i + 1], last_edges[:i]
+                banned_edges = set()
+                for _, nodes, edges in paths:
+                    if nodes[:i + 1] == root_nodes and len(edges) > i:
+                        banned_edges.add((nodes[i], nodes[i + 1], edges[i]))
+                        banned_edges.add((nodes[i + 1], nodes[i], edges[i]))
+                spur_cost, spur_nodes, spur_edges = self.shortest_path(
+                    spur, {target}, set(root_nodes[:-1]), banned_edges)
+                if not spur_nodes:
+                    continue
+                edges = root_edges + spur_edges
+                if tuple(edges) in seen:
+                    continue
+                seen.add(tuple(edges))
+                root_cost = sum(self._edge_cost(root_nodes[j], root_nodes[j + 1], root_edges[j])
+                                for j in range(len(root_edges)))
+                heapq.heappush(candidates, (root_cost + spur_cost, root_nodes[:-1] + spur_nodes, edges))
+            if not candidates:
+                break
+            paths.append(heapq.heappop(candidates))
+        return paths
+
+    def join_tree(self, nodes: List[int]) -> Tuple[float, List[int], List[int]]:
+        """Connect several tables greedily: repeatedly attach the nearest remaining table to the tree."""
+        tree_nodes, tree_edges, total = [nodes[0]], [], 0.0
+        remaining = set(nodes[1:]) - {nodes[0]}
+        while remaining:
+            cost, path_nodes, path_edges = self.shortest_path(tree_nodes, remaining)
+            if not path_nodes:
+                raise ValueError("No FK path connects " + ", ".join(self.graph.names[n] for n in sorted(remaining)))
+            total += cost
+            tree_nodes.extend(path_nodes[1:])
+            tree_edges.extend(path_edges)
+            remaining -= set(path_nodes)
+        return total, tree_nodes, tree_edges
+
+
+def _alias_for(table: str, used: set) -> str:
+    """Short alias from the initials of the table name parts, numbered on collision."""
+    base = ''.join(part[0] for part in table.lower().split('_') if part) or 't'
+    alias, number = base, 1
+    while alias in used:
+        number += 1
+        alias = f"{base}{number}"
+    used.add(alias)
+    return alias
+
+
+def generate_join_sql(index: JoinPathIndex, nodes: List[int], edges: List[int]) -> str:
+    """FROM/JOIN clause for a path or tree; nodes[0] is the driving table and edges attach the rest in order."""
+    graph = index.graph
+    used, aliases = set(), {}
+    first = graph.names[nodes[0]]
+    aliases[nodes[0]] = _alias_for(first, used)
+    lines = [f"FROM {first} {aliases[nodes[0]]}"]
+    for number in edges:
+        edge = graph.edges[number]
+        parent, child = graph.node(edge["parent"]), graph.node(edge["child"])
+        joined = child if parent in aliases else parent
+        aliases[joined] = _alias_for(graph.names[joined], used)
+        conditions = [
+            f"{aliases[child]}.{child_column} = {aliases[parent]}.{parent_column}"
+            for child_column, parent_column in zip(edge["child_columns"], edge["parent_columns"])
+        ]
+        lines.append(f"JOIN {graph.names[joined]} {aliases[joined]} ON {' AND '.join(conditions)}")
+    return "\n".join(lines)
+
+
+def describe(index: JoinPathIndex, cost: float, nodes: List[int], edges: List[int]) -> Dict[str, Any]:
+    graph = index.graph
+    return {
+        "cost": round(cost, 3),
+        "tables": [graph.names[n] for n in nodes],
+        "foreign_keys": [
+            f"{graph.edges[e]['child']}({', '.join(graph.edges[e]['child_columns'])}) -> "
+            f"{graph.edges[e]['parent']}({', '.join(graph.edges[e]['parent_columns'])})"
+            for e in edges
+        ],
+        "nullable_hops": sum(1 for e in edges if graph.edges[e].get("nullable")),
+        "sql": generate_join_sql(index, nodes, edges)
+    }
+
+
+def find_join_paths(index: JoinPathIndex, tables: List[str], k: int = DEFAULT_K) -> List[Dict[str, Any]]:
+    """k shortest paths for two tables; for three or more, one greedy join tree."""
+    nodes = [index.graph.node(table) for table in tables]
+    if len(nodes) < 2:
+        raise ValueError("At least two tables are required")
+    if len(nodes) == 2:
+        return [describe(index, *path) for path in index.k_shortest_paths(nodes[0], nodes[1], k)]
+    return [describe(index, *index.join_tree(nodes))]
+
+
+def load_table_rows(export_files: List[str], graph: FkGraph) -> Dict[str, float]:
+    """CARD per table from SYSCAT.TABLES exports (tables without statistics are left out)."""
+    from syscat_stats import load_catalog_stats
+
+    catalog = load_catalog_stats(export_files)
+    rows = {}
+    for name in graph.names:
+        card = catalog.cardinality(name)
+        if card is not None:
+            rows[name] = card
+    return rows
+
+
+def main():
+    """Main entry point for the script."""
+    positional, options = split_cli_args(sys.argv[1:])
+    if len(positional) < 1 or (len(positional) < 3 and "serve" not in options):
+        print(json.dumps({"error": "Usage: fk_join_path.py <schema_ddl_mmd_or_fk_index_json> <table1> <table2> [table3...] [--k=N] [--stats=syscat_export[,more]] [--serve]"}), file=sys.stderr)
+        sys.exit(1)
+
+    try:
+        graph = load_fk_graph(positional[0])
+        table_rows = load_table_rows(options["stats"].split(','), graph) if options.get("stats") else None
+        index = JoinPathIndex(graph, table_rows)
+        k = int(options.get("k", str(DEFAULT_K)))
+
+        if "serve" in options:
+            # One request per line (table names separated by spaces or commas), one JSON answer per line
+            for line in sys.stdin:
+                tables = line.replace(',', ' ').split()
+                if not tables:
+                    continue
+                try:
+                    answer = {"tables": tables, "paths": find_join_paths(index, tables, k)}
+                except (KeyError, ValueError) as e:
+                    answer = {"tables": tables, "error": str(e.args[0])}
+                print(json.dumps(answer), flush=True)
+            return
+
+        print(json.dumps(find_join_paths(index, positional[1:], k), indent=2))
+
+    except FileNotFoundError as e:
+        print(json.dumps({"error": f"File not found: {e.filename}"}), file=sys.stderr)
+        sys.exit(1)
+    except KeyError as e:
+        print(json.dumps({"error": str(e.args[0])}), file=sys.stderr)
+        sys.exit(1)
+    except Exception as e:
+        print(json.dumps({"error": str(e)}), file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
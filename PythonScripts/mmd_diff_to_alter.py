@@ -6,6 +6,8 @@ Generates SQL ALTER statements from differences between two Mermaid ERD diagrams
 import sys
 import re
 
+from sql_type_model import annotated_type, format_sql_type
+
 def parse_mermaid_schema(mermaid_content):
     """Parse Mermaid ERD and return a dictionary of tables and columns."""
     lines = mermaid_content.strip().split('\n')
@@ -40,6 +42,7 @@ def parse_mermaid_schema(mermaid_content):
             
             tables[current_table]['columns'][column_name] = {
                 'type': data_type,
+                'sql_type': annotated_type(attributes),
                 'constraint': constraint,
                 'attributes': attributes
             }
@@ -73,7 +76,7 @@ def generate_alter_statements(before_tables, after_tables, dialect=''):
             for col_name in after_cols:
                 if col_name not in before_cols:
                     col_def = after_cols[col_name]
-                    sql_type = map_type_to_sql(col_def['type'], dialect)
+                    sql_type = map_type_to_sql(col_def['type'], dialect, col_def['sql_type'])
                     attrs = col_def['attributes'].upper() if col_def['attributes'] else ''
                     
                     alter_stmt = f"ALTER TABLE {table_name}\n    ADD COLUMN {col_name} {sql_type}"
@@ -102,8 +105,8 @@ def generate_alter_statements(before_tables, after_tables, dialect=''):
                     before_col = before_cols[col_name]
                     after_col = after_cols[col_name]
                     
-                    if before_col['type'] != after_col['type']:
-                        sql_type = map_type_to_sql(after_col['type'], dialect)
+                    if (before_col['type'], before_col['sql_type']) != (after_col['type'], after_col['sql_type']):
+                        sql_type = map_type_to_sql(after_col['type'], dialect, after_col['sql_type'])
                         statements.append(f"-- Modified column: {table_name}.{col_name}")
                         
                         if dialect.lower() == 'postgres':
@@ -113,8 +116,12 @@ def generate_alter_statements(before_tables, after_tables, dialect=''):
     
     return '\n\n'.join(statements) if statements else '-- No schema changes detected'
 
-def map_type_to_sql(mermaid_type, dialect=''):
-    """Map Mermaid data types to SQL types."""
+def map_type_to_sql(mermaid_type, dialect='', sql_type=None):
+    """Map Mermaid data types to SQL types; an exact sql_type annotation wins."""
+    exact_type = format_sql_type(sql_type, dialect) if sql_type else None
+    if exact_type:
+        return exact_type
+    
     type_map = {
         'int': 'INTEGER',
         'varchar': 'VARCHAR(255)',
@@ -141,7 +148,7 @@ def generate_create_table_from_dict(table_name, table_info, dialect=''):
     
     for col_name in table_info['order']:
         col = table_info['columns'][col_name]
-        col_def = f"    {col_name} {map_type_to_sql(col['type'], dialect)}"
+        col_def = f"    {col_name} {map_type_to_sql(col['type'], dialect, col['sql_type'])}"
         
         attrs = col['attributes'].upper() if col['attributes'] else ''
         if 'NOT NULL' in attrs:
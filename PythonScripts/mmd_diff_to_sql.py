@@ -7,6 +7,9 @@ Compares two Mermaid ERD diagrams and generates SQL ALTER statements for the dif
 import sys
 import json
 import re
+import bisect
+import hashlib
+import time
 from typing import List, Dict, Any, Tuple, Set
 
 try:
@@ -16,6 +19,8 @@ except ImportError:
     print(json.dumps({"error": "SQLGlot not installed. Please install with: pip install sqlglot"}), file=sys.stderr)
     sys.exit(1)
 
+from sql_type_model import annotated_type, format_sql_type
+
 
 def parse_mermaid_erd(mermaid_content: str) -> Dict[str, Any]:
     """
@@ -69,6 +74,7 @@ def parse_column_definition(line: str) -> Dict[str, Any]:
     """
     Parse a Mermaid column definition line.
     Format: datatype column_name PK/FK/UK "constraints"
+    A "sql:<TYPE>" constraint item (see sql_type_model) becomes sql_type.
     """
     # Remove quotes and split
     parts = line.split('"')
@@ -106,6 +112,7 @@ def parse_column_definition(line: str) -> Dict[str, Any]:
     return {
         'name': column_name,
         'data_type': data_type,
+        'sql_type': annotated_type(constraints_str),
         'is_primary_key': is_primary_key,
         'is_foreign_key': is_foreign_key,
         'is_unique': is_unique,
@@ -127,47 +134,68 @@ def compare_entities(before: Dict[str, Any], after: Dict[str, Any]) -> Dict[str,
         'columns_to_modify': {}
     }
     
-    before_tables = set(before.keys())
-    after_tables = set(after.keys())
+    # Sorted for consistent ordering
+    for table_name in sorted(set(before.keys()) | set(after.keys())):
+        update_table_changes(changes, table_name, before, after)
     
-    # New tables (sorted for consistent ordering)
-    changes['tables_to_add'] = sorted(list(after_tables - before_tables))
+    return changes
+
+
+def update_table_changes(changes: Dict[str, Any], table_name: str,
+                         before: Dict[str, Any], after: Dict[str, Any]):
+    """
+    Recompute the entries of one table in a changes dictionary, in place.
+    compare_entities runs this for every table; the watch mode runs it only for
+    tables whose entity blocks changed.
+    """
+    for key in ('tables_to_add', 'tables_to_drop'):
+        position = bisect.bisect_left(changes[key], table_name)
+        if position < len(changes[key]) and changes[key][position] == table_name:
+            del changes[key][position]
+    for key in ('columns_to_add', 'columns_to_drop', 'columns_to_modify'):
+        changes[key].pop(table_name, None)
     
-    # Dropped tables (sorted for consistent ordering)
-    changes['tables_to_drop'] = sorted(list(before_tables - after_tables))
+    if table_name not in before and table_name not in after:
+        return
     
-    # Modified tables
-    common_tables = before_tables & after_tables
-    for table_name in common_tables:
-        before_cols = before[table_name]['columns']
-        after_cols = after[table_name]['columns']
-        
-        before_col_names = set(before_cols.keys())
-        after_col_names = set(after_cols.keys())
-        
-        # New columns (sorted for consistent ordering)
-        new_cols = after_col_names - before_col_names
-        if new_cols:
-            changes['columns_to_add'][table_name] = [after_cols[col] for col in sorted(new_cols)]
-        
-        # Dropped columns
-        dropped_cols = before_col_names - after_col_names
-        if dropped_cols:
-            changes['columns_to_drop'][table_name] = sorted(list(dropped_cols))
-        
-        # Modified columns (same name but different properties)
-        common_cols = before_col_names & after_col_names
-        modified = []
-        for col_name in sorted(common_cols):
-            if before_cols[col_name] != after_cols[col_name]:
-                modified.append({
-                    'before': before_cols[col_name],
-                    'after': after_cols[col_name]
-                })
-        if modified:
-            changes['columns_to_modify'][table_name] = modified
+    # New table
+    if table_name not in before:
+        bisect.insort(changes['tables_to_add'], table_name)
+        return
     
-    return changes
+    # Dropped table
+    if table_name not in after:
+        bisect.insort(changes['tables_to_drop'], table_name)
+        return
+    
+    # Modified table
+    before_cols = before[table_name]['columns']
+    after_cols = after[table_name]['columns']
+    
+    before_col_names = set(before_cols.keys())
+    after_col_names = set(after_cols.keys())
+    
+    # New columns (sorted for consistent ordering)
+    new_cols = after_col_names - before_col_names
+    if new_cols:
+        changes['columns_to_add'][table_name] = [after_cols[col] for col in sorted(new_cols)]
+    
+    # Dropped columns
+    dropped_cols = before_col_names - after_col_names
+    if dropped_cols:
+        changes['columns_to_drop'][table_name] = sorted(list(dropped_cols))
+    
+    # Modified columns (same name but different properties)
+    common_cols = before_col_names & after_col_names
+    modified = []
+    for col_name in sorted(common_cols):
+        if before_cols[col_name] != after_cols[col_name]:
+            modified.append({
+                'before': before_cols[col_name],
+                'after': after_cols[col_name]
+            })
+    if modified:
+        changes['columns_to_modify'][table_name] = modified
 
 
 def generate_alter_statements(changes: Dict[str, Any], after: Dict[str, Any], dialect: str) -> str:
@@ -191,7 +219,7 @@ def generate_alter_statements(changes: Dict[str, Any], after: Dict[str, Any], di
         # Sort columns by name for consistent ordering
         for col_name in sorted(entity['columns'].keys()):
             col = entity['columns'][col_name]
-            col_def = f"{col['name']} {map_data_type(col['data_type'], dialect)}"
+            col_def = f"{col['name']} {map_data_type(col['data_type'], dialect, col.get('sql_type'))}"
             
             if col['is_primary_key']:
                 col_def += " PRIMARY KEY"
@@ -216,7 +244,7 @@ def generate_alter_statements(changes: Dict[str, Any], after: Dict[str, Any], di
         columns = changes['columns_to_add'][table_name]
         for col in columns:
             statements.append(f"-- Adding column to {table_name}: {col['name']}")
-            col_def = f"{col['name']} {map_data_type(col['data_type'], dialect)}"
+            col_def = f"{col['name']} {map_data_type(col['data_type'], dialect, col.get('sql_type'))}"
             
             if col['is_not_null']:
                 col_def += " NOT NULL"
@@ -249,7 +277,7 @@ def generate_alter_statements(changes: Dict[str, Any], after: Dict[str, Any], di
             statements.append(f"-- Modifying column {table_name}.{col_name}")
             
             # Generate MODIFY/ALTER COLUMN based on dialect
-            col_def = f"{col_name} {map_data_type(after_col['data_type'], dialect)}"
+            col_def = f"{col_name} {map_data_type(after_col['data_type'], dialect, after_col.get('sql_type'))}"
             
             if after_col['is_not_null']:
                 col_def += " NOT NULL"
@@ -264,7 +292,7 @@ def generate_alter_statements(changes: Dict[str, Any], after: Dict[str, Any], di
                 statements.append(f"ALTER TABLE {table_name} MODIFY COLUMN {col_def};")
             elif dialect in ['postgres']:
                 # PostgreSQL requires separate commands for type, null, default
-                statements.append(f"ALTER TABLE {table_name} ALTER COLUMN {col_name} TYPE {map_data_type(after_col['data_type'], dialect)};")
+                statements.append(f"ALTER TABLE {table_name} ALTER COLUMN {col_name} TYPE {map_data_type(after_col['data_type'], dialect, after_col.get('sql_type'))};")
                 if after_col['is_not_null'] != before_col['is_not_null']:
                     if after_col['is_not_null']:
                         statements.append(f"ALTER TABLE {table_name} ALTER COLUMN {col_name} SET NOT NULL;")
@@ -281,8 +309,15 @@ def generate_alter_statements(changes: Dict[str, Any], after: Dict[str, Any], di
     return '\n'.join(statements) if statements else "-- No changes detected"
 
 
-def map_data_type(mermaid_type: str, dialect: str) -> str:
-    """Map Mermaid data types to SQL dialect-specific types."""
+def map_data_type(mermaid_type: str, dialect: str, sql_type: str = None) -> str:
+    """
+    Map Mermaid data types to SQL dialect-specific types.
+    An exact sql_type from the column's annotation wins over the defaults below.
+    """
+    exact_type = format_sql_type(sql_type, dialect) if sql_type else None
+    if exact_type:
+        return exact_type
+    
     mermaid_type_lower = mermaid_type.lower()
     
     if mermaid_type_lower in ['int', 'integer']:
@@ -319,17 +354,213 @@ def map_data_type(mermaid_type: str, dialect: str) -> str:
         return mermaid_type.upper()
 
 
+_ENTITY_START_RE = re.compile(r'^(\w+)\s*\{')
+
+
+class ErdDocument:
+    """
+    A Mermaid ERD kept in memory as lines plus the spans of its entity blocks.
+    Edits re-parse only the entity blocks they touch (with parse_mermaid_erd, so
+    the result is identical to parsing the whole file) and report which entity
+    names may have changed.
+    """
+    
+    def __init__(self, content: str = ""):
+        self.lines = []
+        self.spans = []  # [start, end) line indexes and entity name, in document order
+        self.block_entities = []  # parsed entity for each span
+        self.entities = {}
+        self.content_hash = None
+        self.set_content(content)
+    
+    @staticmethod
+    def hash_content(content: str) -> str:
+        return hashlib.sha1(content.encode('utf-8')).hexdigest()
+    
+    def _scan(self, start: int, stop: int):
+        """
+        Find entity blocks beginning in lines[start:stop]; a block still open at
+        stop is followed to its end. Returns (spans, index after the last line scanned).
+        """
+        spans = []
+        open_block = None
+        index = start
+        while index < len(self.lines) and (index < stop or open_block is not None):
+            line = self.lines[index].strip()
+            if line and not line.startswith('%%'):
+                match = _ENTITY_START_RE.match(line)
+                if match:
+                    if open_block is not None:
+                        spans.append((open_block[0], index, open_block[1]))
+                    open_block = (index, match.group(1))
+                elif line == '}' and open_block is not None:
+                    spans.append((open_block[0], index + 1, open_block[1]))
+                    open_block = None
+            index += 1
+        if open_block is not None:
+            spans.append((open_block[0], index, open_block[1]))
+        return spans, index
+    
+    def _parse_span(self, span) -> Dict[str, Any]:
+        start, end, name = span
+        return parse_mermaid_erd('\n'.join(self.lines[start:end])).get(name)
+    
+    def _rebuild_entities(self, names) -> Set[str]:
+        """Re-derive entities for the given names from the blocks (the last block of a name wins)."""
+        for name in names:
+            self.entities.pop(name, None)
+        for span, entity in zip(self.spans, self.block_entities):
+            if span[2] in names and entity is not None:
+                self.entities[span[2]] = entity
+        return set(names)
+    
+    def set_content(self, content: str, content_hash: str = None) -> Set[str]:
+        """
+        Replace the whole text. Blocks whose text is unchanged reuse their parsed
+        entity, so only edited blocks are re-parsed. A matching content_hash is a no-op.
+        """
+        content_hash = content_hash or self.hash_content(content)
+        if content_hash == self.content_hash:
+            return set()
+        cache = {}
+        for (start, end, _), entity in zip(self.spans, self.block_entities):
+            cache['\n'.join(self.lines[start:end])] = entity
+        old_entities = self.entities
+        
+        self.lines = content.split('\n')
+        self.spans, _ = self._scan(0, len(self.lines))
+        self.block_entities = []
+        for span in self.spans:
+            text = '\n'.join(self.lines[span[0]:span[1]])
+            entity = cache[text] if text in cache else self._parse_span(span)
+            self.block_entities.append(entity)
+        self.entities = {}
+        for span, entity in zip(self.spans, self.block_entities):
+            if entity is not None:
+                self.entities[span[2]] = entity
+        self.content_hash = content_hash
+        
+        names = set(old_entities) | set(self.entities)
+        return {name for name in names if old_entities.get(name) is not self.entities.get(name)}
+    
+    def apply_edit(self, start_line: int, end_line: int, text: str) -> Set[str]:
+        """
+        Replace lines start_line..end_line (1-based, inclusive) with text.
+        end_line = start_line - 1 inserts before start_line. Returns the entity
+        names whose definition may have changed.
+        """
+        first, last = start_line - 1, end_line
+        if first < 0 or last < first or last > len(self.lines):
+            raise ValueError(f"Edit range {start_line}-{end_line} is outside the document ({len(self.lines)} lines)")
+        new_lines = text.split('\n')
+        delta = len(new_lines) - (last - first)
+        self.lines[first:last] = new_lines
+        
+        # Blocks touching the edited range (or ending right before it, in case the
+        # edit removed the entity line that implicitly closed them) are re-scanned;
+        # later blocks only shift
+        lo = bisect.bisect_right([span[1] for span in self.spans], first - 1)
+        hi = lo
+        while hi < len(self.spans) and self.spans[hi][0] <= last:
+            hi += 1
+        region_start = min(first, self.spans[lo][0]) if lo < hi else first
+        region_stop = max(last, self.spans[hi - 1][1]) + delta if lo < hi else last + delta
+        new_spans, scanned_to = self._scan(region_start, region_stop)
+        
+        # A block left open by the edit can swallow following blocks
+        while hi < len(self.spans) and self.spans[hi][0] + delta < scanned_to:
+            hi += 1
+        
+        changed = {span[2] for span in self.spans[lo:hi]} | {span[2] for span in new_spans}
+        shifted = [(start + delta, end + delta, name) for start, end, name in self.spans[hi:]]
+        self.spans[lo:] = new_spans + shifted
+        self.block_entities[lo:hi] = [self._parse_span(span) for span in new_spans]
+        self.content_hash = None
+        return self._rebuild_entities(changed)
+    
+    def content(self) -> str:
+        return '\n'.join(self.lines)
+
+
+class IncrementalDiff:
+    """
+    Keeps both ERDs parsed and the change set up to date as either side is edited.
+    Only tables named by an edit are compared again.
+    """
+    
+    def __init__(self, before_content: str, after_content: str, dialect: str = 'ansi'):
+        self.documents = {'before': ErdDocument(before_content), 'after': ErdDocument(after_content)}
+        self.dialect = dialect
+        self.changes = compare_entities(self.documents['before'].entities, self.documents['after'].entities)
+    
+    def apply(self, side: str, start_line: int = None, end_line: int = None, text: str = None,
+              content: str = None, content_hash: str = None) -> Set[str]:
+        """Apply a line-range edit or a full-content update to one side and refresh the change set."""
+        document = self.documents[side]
+        if content is not None:
+            names = document.set_content(content, content_hash)
+        else:
+            names = document.apply_edit(start_line, end_line, text)
+        for name in names:
+            update_table_changes(self.changes, name, self.documents['before'].entities,
+                                 self.documents['after'].entities)
+        return names
+    
+    def sql(self) -> str:
+        return generate_alter_statements(self.changes, self.documents['after'].entities, self.dialect)
+
+
+def watch_main(before_file: str, after_file: str, dialect: str):
+    """
+    Watch mode: read one JSON edit per stdin line and answer with the updated ALTER SQL.
+    Edit: {"side": "after", "start_line": 12, "end_line": 14, "text": "..."}
+    or    {"side": "after", "content": "...", "hash": "<optional content hash>"}
+    """
+    with open(before_file, 'r', encoding='utf-8') as f:
+        before_content = f.read()
+    with open(after_file, 'r', encoding='utf-8') as f:
+        after_content = f.read()
+    
+    diff = IncrementalDiff(before_content, after_content, dialect)
+    print(json.dumps({"ready": True, "sql": diff.sql()}), flush=True)
+    
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        started = time.perf_counter()
+        try:
+            edit = json.loads(line)
+            changed = diff.apply(
+                edit.get("side", "after"),
+                start_line=edit.get("start_line"),
+                end_line=edit.get("end_line"),
+                text=edit.get("text"),
+                content=edit.get("content"),
+                content_hash=edit.get("hash")
+            )
+            result = {"changed_entities": sorted(changed), "sql": diff.sql()}
+        except Exception as e:
+            result = {"error": str(e)}
+        result["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 3)
+        print(json.dumps(result), flush=True)
+
+
 def main():
     """Main entry point for the script."""
-    if len(sys.argv) < 3:
-        print(json.dumps({"error": "Usage: mmd_diff_to_sql.py <before_mermaid_file> <after_mermaid_file> [dialect]"}), file=sys.stderr)
+    arguments = [arg for arg in sys.argv[1:] if arg != '--watch']
+    if len(arguments) < 2:
+        print(json.dumps({"error": "Usage: mmd_diff_to_sql.py <before_mermaid_file> <after_mermaid_file> [dialect] [--watch]"}), file=sys.stderr)
         sys.exit(1)
     
-    before_file = sys.argv[1]
-    after_file = sys.argv[2]
-    dialect = sys.argv[3] if len(sys.argv) > 3 else 'ansi'
+    before_file = arguments[0]
+    after_file = arguments[1]
+    dialect = arguments[2] if len(arguments) > 2 else 'ansi'
     
     try:
+        if '--watch' in sys.argv:
+            watch_main(before_file, after_file, dialect)
+            return
+        
         # Read Mermaid files
         with open(before_file, 'r', encoding='utf-8') as f:
             before_content = f.read()
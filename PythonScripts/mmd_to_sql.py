@@ -7,6 +7,8 @@ This is a temporary implementation until we find or build a proper Mermaid→SQL
 import sys
 import re
 
+from sql_type_model import annotated_type, format_sql_type
+
 def parse_mermaid_to_sql(mermaid_content, target_dialect=''):
     """
     Parse Mermaid ERD and generate SQL CREATE TABLE statements.
@@ -65,7 +67,7 @@ def parse_mermaid_to_sql(mermaid_content, target_dialect=''):
             
             current_columns.append({
                 'name': column_name,
-                'type': map_mermaid_type_to_sql(data_type, target_dialect),
+                'type': map_mermaid_type_to_sql(data_type, target_dialect, annotated_type(attributes)),
                 'constraint': constraint,
                 'attributes': attributes
             })
@@ -90,8 +92,12 @@ def parse_mermaid_to_sql(mermaid_content, target_dialect=''):
     
     return '\n\n'.join(sql_statements)
 
-def map_mermaid_type_to_sql(mermaid_type, dialect=''):
-    """Map Mermaid data types to SQL types."""
+def map_mermaid_type_to_sql(mermaid_type, dialect='', sql_type=None):
+    """Map Mermaid data types to SQL types; an exact sql_type annotation wins."""
+    exact_type = format_sql_type(sql_type, dialect) if sql_type else None
+    if exact_type:
+        return exact_type
+    
     type_map = {
         'int': 'INTEGER',
         'bigint': 'BIGINT',
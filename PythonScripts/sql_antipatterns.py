@@ -0,0 +1,394 @@
+#!/usr/bin/env python3
+"""
+Static SQL anti-pattern analyzer using SQLGlot.
+This script checks SQL statements against a schema model (DDL or Mermaid ERD,
+loaded through sql_to_mmd) and reports performance anti-patterns with their
+file, line and column.
+"""
+
+import sys
+import os
+import json
+from typing import List, Dict, Any, Tuple
+
+try:
+    import sqlglot
+    from sqlglot import parse_one, exp
+except ImportError:
+    print(json.dumps({"error": "SQLGlot not installed. Please install with: pip install sqlglot"}), file=sys.stderr)
+    sys.exit(1)
+
+from sql_to_mmd import load_schema_model, table_for, is_leading_index_column
+from sql_dialect_translate import iter_sql_statements, collect_batch_inputs, split_cli_args
+
+
+# SELECT * is reported for tables with at least this many columns
+WIDE_TABLE_COLUMNS = 15
+
+COMPARISON_TYPES = (exp.EQ, exp.NEQ, exp.GT, exp.GTE, exp.LT, exp.LTE, exp.Like, exp.ILike, exp.In, exp.Between)
+
+SEVERITY_ORDER = {"error": 0, "warning": 1, "info": 2}
+
+
+def from_clause(select: exp.Select):
+    """FROM clause of a SELECT (the arg is 'from_' in newer SQLGlot releases)."""
+    return select.args.get("from_") or select.args.get("from")
+
+
+def walk_scope(node):
+    """Walk an expression without descending into nested queries."""
+    return node.walk(prune=lambda n: n is not node and isinstance(n, (exp.Select, exp.Subquery)))
+
+
+def node_location(node) -> Tuple[int, int]:
+    """First (line, column) recorded by the tokenizer inside the node."""
+    for child in node.walk(bfs=False):
+        meta = getattr(child, "meta", None) or {}
+        if "line" in meta:
+            return meta["line"], meta.get("col", 0)
+    return 1, 0
+
+
+class SelectScope:
+    """Sources visible in one SELECT: alias -> schema table (None for subqueries or unknown tables)."""
+
+    def __init__(self, select: exp.Select, model: Dict[str, Any]):
+        self.select = select
+        self.sources = {}
+        self.order = []
+        clause = from_clause(select)
+        nodes = [clause.this] if clause else []
+        nodes += [join.this for join in select.args.get("joins") or []]
+        for node in nodes:
+            alias = node.alias_or_name.lower()
+            table = table_for(model, node.name) if isinstance(node, exp.Table) else None
+            self.sources[alias] = table
+            self.order.append(alias)
+
+    def resolve(self, column: exp.Column) -> Tuple[str, Dict[str, Any]]:
+        """Return (alias, table) owning the column, or (None, None) when it cannot be resolved."""
+        qualifier = column.table.lower()
+        if qualifier:
+            return (qualifier, self.sources.get(qualifier)) if qualifier in self.sources else (None, None)
+        if len(self.sources) == 1:
+            alias = self.order[0]
+            return alias, self.sources[alias]
+        owners = [
+            alias for alias, table in self.sources.items()
+            if table is not None and column.name.lower() in table["columns"]
+        ]
+        if len(owners) == 1:
+            return owners[0], self.sources[owners[0]]
+        return None, None
+
+
+def _predicates(select: exp.Select) -> List[exp.Expression]:
+    """WHERE and ON conditions of a SELECT."""
+    conditions = []
+    where = select.args.get("where")
+    if where is not None:
+        conditions.append(where.this)
+    for join in select.args.get("joins") or []:
+        if join.args.get("on") is not None:
+            conditions.append(join.args["on"])
+    return conditions
+
+
+def check_non_sargable(scope: SelectScope, add):
+    """Functions, casts or arithmetic wrapped around indexed columns, and leading-wildcard LIKE."""
+    for condition in _predicates(scope.select):
+        for node in walk_scope(condition):
+            if not isinstance(node, COMPARISON_TYPES):
+                continue
+
+            if isinstance(node, (exp.Like, exp.ILike)):
+                pattern = node.expression
+                if isinstance(pattern, exp.Literal) and pattern.is_string and pattern.this[:1] in ("%", "_"):
+                    column = node.this if isinstance(node.this, exp.Column) else None
+                    alias, table = scope.resolve(column) if column is not None else (None, None)
+                    indexed = table is not None and is_leading_index_column(table, column.name)
+                    add(node, "leading_wildcard_like", "warning" if indexed else "info",
+                        f"LIKE '{pattern.this}' starts with a wildcard, so no index range scan is possible"
+                        + (f" on indexed column {column.sql()}" if indexed else ""))
+
+            for side in (node.this, node.args.get("expression")):
+                if side is None or isinstance(side, (exp.Column, exp.Literal, exp.Placeholder, exp.Null)):
+                    continue
+                if isinstance(side, exp.Paren) and isinstance(side.unnest(), exp.Column):
+                    continue
+                if isinstance(side, (exp.Subquery, exp.Select, exp.Tuple)):
+                    continue
+                for column in walk_scope(side):
+                    if not isinstance(column, exp.Column):
+                        continue
+                    alias, table = scope.resolve(column)
+                    if table is not None and is_leading_index_column(table, column.name):
+                        wrapper = side.sql_name() if isinstance(side, exp.Func) else side.key.upper()
+                        add(side, "non_sargable_predicate", "warning",
+                            f"{wrapper} applied to indexed column {column.sql()} prevents index use; "
+                            f"compare the bare column against a transformed value instead")
+
+
+def check_cartesian(scope: SelectScope, add):
+    """Sources in FROM/JOIN that no join predicate connects."""
+    if len(scope.order) < 2:
+        return
+
+    parent = {alias: alias for alias in scope.order}
+
+    def find(alias):
+        while parent[alias] != alias:
+            parent[alias] = parent[parent[alias]]
+            alias = parent[alias]
+        return alias
+
+    def union(a, b):
+        parent[find(a)] = find(b)
+
+    joins = scope.select.args.get("joins") or []
+    for join in joins:
+        alias = join.this.alias_or_name.lower()
+        if alias not in parent:
+            continue
+        # Explicit CROSS JOIN, USING and lateral sources are intentional connections
+        if (join.args.get("kind") or "").upper() == "CROSS" or join.args.get("using") or not isinstance(join.this, exp.Table):
+            union(alias, scope.order[0])
+
+    for condition in _predicates(scope.select):
+        for node in walk_scope(condition):
+            if not isinstance(node, exp.EQ):
+                continue
+            aliases = set()
+            for column in walk_scope(node):
+                if isinstance(column, exp.Column):
+                    alias, _ = scope.resolve(column)
+                    if alias in parent:
+                        aliases.add(alias)
+            aliases = sorted(aliases)
+            for other in aliases[1:]:
+                union(aliases[0], other)
+
+    groups = {}
+    for alias in scope.order:
+        groups.setdefault(find(alias), []).append(alias)
+    if len(groups) > 1:
+        described = " x ".join("(" + ", ".join(group) + ")" for group in groups.values())
+        add(scope.select, "implicit_cartesian_join", "error",
+            f"No join predicate connects {described}; the result is a cartesian product")
+
+
+def check_select_star(scope: SelectScope, add, wide_columns: int):
+    """SELECT * or t.* over wide tables."""
+    for projection in scope.select.expressions:
+        if isinstance(projection, exp.Star):
+            aliases = scope.order
+        elif isinstance(projection, exp.Column) and isinstance(projection.this, exp.Star):
+            aliases = [projection.table.lower()]
+        else:
+            continue
+        for alias in aliases:
+            table = scope.sources.get(alias)
+            if table is not None and len(table["columns"]) >= wide_columns:
+                add(projection, "select_star_wide_table", "warning",
+                    f"SELECT * on {table['name']} reads all {len(table['columns'])} columns; "
+                    f"list the needed columns so narrower indexes can cover the query")
+
+
+def check_or_chains(scope: SelectScope, add):
+    """OR chains across different columns, which usually defeat single-index access."""
+    for condition in _predicates(scope.select):
+        for node in walk_scope(condition):
+            if not isinstance(node, exp.Or) or isinstance(node.parent, exp.Or):
+                continue
+            disjuncts = list(node.flatten())
+            column_sets = []
+            for disjunct in disjuncts:
+                columns = {column.sql().lower() for column in walk_scope(disjunct) if isinstance(column, exp.Column)}
+                column_sets.append(columns)
+            all_columns = set().union(*column_sets)
+            if len(all_columns) > 1:
+                add(node, "or_chain_across_columns", "warning",
+                    f"OR across {', '.join(sorted(all_columns))} prevents a single index range scan; "
+                    f"consider UNION ALL of indexed branches")
+            elif len(all_columns) == 1 and len(disjuncts) > 2 and all(isinstance(d, exp.EQ) for d in disjuncts):
+                add(node, "or_chain_same_column", "info",
+                    f"{len(disjuncts)} equality ORs on {next(iter(all_columns))} read better as IN (...)")
+
+
+def check_correlated_select_list(scope: SelectScope, add):
+    """Scalar subqueries in the select list that reference the outer query (executed per row)."""
+    outer_aliases = set(scope.sources)
+    for projection in scope.select.expressions:
+        for inner in projection.find_all(exp.Select):
+            inner_clause = from_clause(inner)
+            inner_aliases = set()
+            if inner_clause:
+                inner_aliases.add(inner_clause.this.alias_or_name.lower())
+            for join in inner.args.get("joins") or []:
+                inner_aliases.add(join.this.alias_or_name.lower())
+            outer_refs = sorted({
+                column.sql() for column in inner.find_all(exp.Column)
+                if column.table and column.table.lower() in outer_aliases - inner_aliases
+            })
+            if outer_refs:
+                add(inner, "correlated_subquery_in_select", "warning",
+                    f"Correlated subquery in the select list runs once per row (references {', '.join(outer_refs)}); "
+                    f"rewrite as a join or grouped derived table")
+
+
+def check_unindexed_joins(scope: SelectScope, add):
+    """Join predicates whose columns on the joined table are not the leading column of any index."""
+    joins = scope.select.args.get("joins") or []
+    for join in joins:
+        on = join.args.get("on")
+        if on is None or not isinstance(join.this, exp.Table):
+            continue
+        joined_alias = join.this.alias_or_name.lower()
+        joined_table = scope.sources.get(joined_alias)
+        if joined_table is None:
+            continue
+
+        join_columns = []
+        for node in walk_scope(on):
+            if not isinstance(node, exp.EQ):
+                continue
+            sides = [node.this, node.expression]
+            if not all(isinstance(side, exp.Column) for side in sides):
+                continue
+            resolved = [scope.resolve(side) for side in sides]
+            if resolved[0][0] == resolved[1][0]:
+                continue
+            for side, (alias, _) in zip(sides, resolved):
+                if alias == joined_alias:
+                    join_columns.append(side)
+
+        if join_columns and not any(is_leading_index_column(joined_table, column.name) for column in join_columns):
+            names = ", ".join(column.name for column in join_columns)
+            add(join_columns[0], "join_on_unindexed_column", "warning",
+                f"Join into {joined_table['name']} on ({names}) has no index starting with these columns; "
+                f"each probe scans the table")
+
+
+def analyze_statement(sql: str, model: Dict[str, Any], dialect: str = None,
+                      wide_columns: int = WIDE_TABLE_COLUMNS) -> List[Dict[str, Any]]:
+    """Run all checks on one statement. Lines and columns are relative to the statement text."""
+    findings = []
+    tree = parse_one(sql, read=dialect)
+    if tree is None:
+        return findings
+
+    def add(node, rule, severity, message):
+        line, column = node_location(node)
+        findings.append({"line": line, "column": column, "rule": rule, "severity": severity, "message": message})
+
+    for select in tree.find_all(exp.Select):
+        scope = SelectScope(select, model)
+        check_non_sargable(scope, add)
+        check_cartesian(scope, add)
+        check_select_star(scope, add, wide_columns)
+        check_or_chains(scope, add)
+        check_correlated_select_list(scope, add)
+        check_unindexed_joins(scope, add)
+
+    return findings
+
+
+def analyze_file(sql_file: str, model: Dict[str, Any], dialect: str = None,
+                 wide_columns: int = WIDE_TABLE_COLUMNS) -> List[Dict[str, Any]]:
+    """Analyze every statement in a script; unparseable statements are reported as parse errors."""
+    findings = []
+    with open(sql_file, 'r', encoding='utf-8') as f:
+        for index, (start_line, statement, _) in enumerate(iter_sql_statements(f), 1):
+            # start_line is the first non-blank line; drop the blank lines before it
+            text = statement.lstrip()
+            try:
+                results = analyze_statement(text, model, dialect, wide_columns)
+            except Exception as e:
+                results = [{"line": 1, "column": 0, "rule": "parse_error", "severity": "error",
+                            "message": str(e).split('\n')[0]}]
+            for finding in results:
+                finding["line"] = start_line + finding["line"] - 1
+                finding["file"] = sql_file
+                finding["statement"] = index
+                findings.append(finding)
+    return findings
+
+
+_worker_state = {}
+
+
+def _init_worker(schema_file: str, dialect: str, wide_columns: int):
+    """Load the schema once per worker process."""
+    _worker_state["model"] = load_schema_model(schema_file)
+    _worker_state["dialect"] = dialect
+    _worker_state["wide_columns"] = wide_columns
+
+
+def _analyze_worker(sql_file: str) -> List[Dict[str, Any]]:
+    try:
+        return analyze_file(sql_file, _worker_state["model"], _worker_state["dialect"], _worker_state["wide_columns"])
+    except Exception as e:
+        return [{"file": sql_file, "line": 0, "column": 0, "statement": 0, "rule": "read_error",
+                 "severity": "error", "message": str(e)}]
+
+
+def analyze_paths(schema_file: str, sql_path: str, dialect: str = None, wide_columns: int = WIDE_TABLE_COLUMNS,
+                  workers: int = 0) -> List[Dict[str, Any]]:
+    """Analyze a file or a directory of *.sql files, in parallel for directories."""
+    if not os.path.isdir(sql_path):
+        return analyze_file(sql_path, load_schema_model(schema_file), dialect, wide_columns)
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    _, files = collect_batch_inputs(sql_path)
+    workers = workers if workers > 0 else (os.cpu_count() or 1)
+    workers = min(workers, max(1, len(files)))
+    findings = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(schema_file, dialect, wide_columns)) as pool:
+        for file_findings in pool.map(_analyze_worker, files, chunksize=max(1, len(files) // (workers * 8))):
+            findings.extend(file_findings)
+    return findings
+
+
+def main():
+    """Main entry point for the script."""
+    positional, options = split_cli_args(sys.argv[1:])
+    if len(positional) < 2:
+        print(json.dumps({"error": "Usage: sql_antipatterns.py <schema_ddl_or_mmd> <sql_file_or_dir> [dialect] [--format=json|text] [--wide-columns=N] [--workers=N]"}), file=sys.stderr)
+        sys.exit(1)
+
+    schema_file = positional[0]
+    sql_path = positional[1]
+    dialect = positional[2] if len(positional) > 2 and positional[2] else None
+
+    try:
+        findings = analyze_paths(
+            schema_file,
+            sql_path,
+            dialect,
+            wide_columns=int(options.get("wide-columns", str(WIDE_TABLE_COLUMNS))),
+            workers=int(options.get("workers", "0"))
+        )
+        findings.sort(key=lambda f: (f["file"], f["line"], f["column"], SEVERITY_ORDER[f["severity"]]))
+
+        if options.get("format", "json") == "text":
+            for finding in findings:
+                print(f"{finding['file']}:{finding['line']}:{finding['column']}: "
+                      f"{finding['severity']} [{finding['rule']}] {finding['message']}")
+        else:
+            print(json.dumps(findings, indent=2))
+
+    except FileNotFoundError as e:
+        print(json.dumps({"error": f"File not found: {e.filename}"}), file=sys.stderr)
+        sys.exit(1)
+    except Exception as e:
+        print(json.dumps({"error": str(e)}), file=sys.stderr)
+        sys.exit(1)
+
+    if any(finding["severity"] == "error" for finding in findings):
+        sys.exit(2)
+
+
+if __name__ == "__main__":
+    main()
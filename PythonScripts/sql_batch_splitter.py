@@ -0,0 +1,364 @@
+#!/usr/bin/env python3
+"""
+Transactional batch splitter for large generated SQL scripts.
+This script post-processes the output of mmd_to_sql.py, the diff generators or
+sql_dialect_translate.py into DB2 CLP units of work: statements are grouped
+into batches by row, statement and byte budgets with a COMMIT after each,
+DDL and utility commands get their own units, and a resume manifest records
+where every batch starts so an interrupted run can restart after the last
+committed batch.
+"""
+
+import sys
+import os
+import re
+import json
+import hashlib
+from typing import List, Dict, Any, Tuple
+
+from sql_dialect_translate import iter_sql_statements, split_cli_args
+
+
+MANIFEST_FORMAT_VERSION = 1
+
+# Default budgets per batch; a batch closes before the statement that would exceed one
+MAX_BATCH_ROWS = 10000
+MAX_BATCH_STATEMENTS = 1000
+MAX_BATCH_BYTES = 1024 * 1024
+
+DDL_KEYWORDS = {"CREATE", "ALTER", "DROP", "RENAME", "COMMENT", "GRANT", "REVOKE", "TRUNCATE", "LABEL", "DECLARE"}
+# CLP commands and procedures that commit on their own; each one is a unit of its own
+UTILITY_KEYWORDS = {"LOAD", "IMPORT", "EXPORT", "RUNSTATS", "REORG", "CALL", "BACKUP", "RESTORE", "INGEST"}
+# Session state that must be replayed before resuming
+SESSION_KEYWORDS = {"SET", "CONNECT"}
+TRANSACTION_KEYWORDS = {"COMMIT", "ROLLBACK"}
+
+_LEADING_COMMENTS_RE = re.compile(r'^(?:\s+|--[^\n]*(?:\n|$)|/\*.*?\*/)*', re.DOTALL)
+_FIRST_KEYWORD_RE = re.compile(r'([A-Za-z_]+)')
+_VALUES_RE = re.compile(r'\bVALUES\b', re.IGNORECASE)
+_SETTING_WORD_RE = re.compile(r'[A-Za-z_][A-Za-z0-9_]*|=|\S+')
+
+# Special-register spellings that set the same session state
+SETTING_ALIASES = {"CURRENT_SCHEMA": "SCHEMA", "CURRENT_PATH": "PATH", "FUNCTION PATH": "PATH", "SQLID": "SCHEMA"}
+
+
+def statement_body(statement: str) -> str:
+    """Statement text without leading blank lines and comments."""
+    return statement[_LEADING_COMMENTS_RE.match(statement).end():]
+
+
+def statement_kind(statement: str) -> str:
+    """Classify a statement as ddl, utility, session, transaction or dml by its first keyword."""
+    match = _FIRST_KEYWORD_RE.match(statement_body(statement))
+    keyword = match.group(1).upper() if match else ""
+    if keyword in DDL_KEYWORDS:
+        return "ddl"
+    if keyword in UTILITY_KEYWORDS:
+        return "utility"
+    if keyword in SESSION_KEYWORDS:
+        return "session"
+    if keyword in TRANSACTION_KEYWORDS:
+        return "transaction"
+    return "dml"
+
+
+def session_setting(statement: str) -> str:
+    """
+    The session state a SET statement changes ("SCHEMA", "PATH", ...), so a
+    later SET of the same register supersedes it; "CONNECT" for CONNECT.
+    """
+    words = _SETTING_WORD_RE.findall(statement_body(statement))
+    keyword = words[0].upper() if words else ""
+    if keyword != "SET":
+        return keyword
+    words = words[1:]
+    # SET <register> = value, or SET <register> value
+    name = words[:words.index("=")] if "=" in words else words[:-1]
+    name = [word.upper() for word in name]
+    if name and name[0] == "CURRENT":
+        name = name[1:]
+    setting = ' '.join(name) or ' '.join(words).upper()
+    return SETTING_ALIASES.get(setting, setting)
+
+
+def session_replay(preamble: List[Dict[str, Any]], next_batch: int) -> List[str]:
+    """
+    Session statements to replay before next_batch: the last one of each
+    setting since the last CONNECT, in the order they last ran.
+    """
+    latest = {}
+    for entry in preamble:
+        if entry["before_batch"] > next_batch:
+            break
+        setting = session_setting(entry["statement"])
+        if setting == "CONNECT":
+            latest = {}
+        latest.pop(setting, None)
+        latest[setting] = entry["statement"]
+    return list(latest.values())
+
+
+def count_insert_rows(statement: str) -> int:
+    """Rows in an INSERT ... VALUES (multi-row aware); 1 for anything else."""
+    statement = statement_body(statement)
+    match = _VALUES_RE.search(statement)
+    if not match or not statement.upper().startswith("INSERT"):
+        return 1
+    rows = 0
+    depth = 0
+    quote = None
+    for char in statement[match.end():]:
+        if quote:
+            if char == quote:
+                quote = None
+        elif char in ("'", '"'):
+            quote = char
+        elif char == '(':
+            if depth == 0:
+                rows += 1
+            depth += 1
+        elif char == ')':
+            depth -= 1
+    return max(rows, 1)
+
+
+def contains_terminator(statement: str, terminator: str) -> bool:
+    """True when the terminator occurs outside strings and comments, so CLP would split the statement."""
+    if terminator not in statement:
+        return False
+    return sum(1 for _ in iter_sql_statements(statement.splitlines(keepends=True), terminator)) > 1
+
+
+class BatchWriter:
+    """Streams batches into the output script and tracks their byte offsets for the manifest."""
+
+    def __init__(self, output_file: str, terminator: str, progress_table: str = None):
+        self.output_file = output_file
+        self.terminator = terminator
+        self.progress_table = progress_table
+        self.script_name = os.path.basename(output_file)
+        self.file = None
+        self.offset = 0
+        self.digest = hashlib.sha256()
+        self.batches = []
+
+    def __enter__(self):
+        self.file = open(self.output_file, 'w', encoding='utf-8', newline='\n')
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.file.close()
+
+    def write(self, text: str):
+        data = text.encode('utf-8')
+        self.file.write(text)
+        self.digest.update(data)
+        self.offset += len(data)
+
+    def write_header(self, source_file: str):
+        self.write(f"-- Batched from {os.path.basename(source_file)}; run with autocommit off, e.g.\n"
+                   f"--   db2 +c -td{self.terminator} -vf {self.script_name}\n")
+        if self.progress_table:
+            self.write(f"-- Progress is recorded in {self.progress_table}, which must exist:\n"
+                       f"--   CREATE TABLE {self.progress_table} (SCRIPT_NAME VARCHAR(255) NOT NULL, "
+                       f"BATCH_NO INTEGER NOT NULL, COMPLETED_AT TIMESTAMP NOT NULL)\n")
+        if self.terminator != ";":
+            self.write(f"--#SET TERMINATOR {self.terminator}\n")
+        self.write("\n")
+
+    def write_batch(self, kind: str, statements: List[Tuple[int, str]], rows: int):
+        number = len(self.batches) + 1
+        start = self.offset
+        last_line = statements[-1][0] + statements[-1][1].strip().count('\n')
+        self.write(f"-- batch {number}: {kind}, {len(statements)} statement(s), {rows} row(s), "
+                   f"lines {statements[0][0]}-{last_line}\n")
+        for _, statement in statements:
+            self.write(statement.strip() + self.terminator + "\n")
+        if self.progress_table:
+            self.write(f"INSERT INTO {self.progress_table} (SCRIPT_NAME, BATCH_NO, COMPLETED_AT) "
+                       f"VALUES ('{self.script_name}', {number}, CURRENT TIMESTAMP){self.terminator}\n")
+        self.write(f"COMMIT{self.terminator}\n\n")
+        self.batches.append({
+            "batch": number,
+            "kind": kind,
+            "offset": start,
+            "bytes": self.offset - start,
+            "first_line": statements[0][0],
+            "last_line": last_line,
+            "statements": len(statements),
+            "rows": rows
+        })
+
+
+def split_script(input_file: str, output_file: str, terminator: str = ";", max_rows: int = MAX_BATCH_ROWS,
+                 max_statements: int = MAX_BATCH_STATEMENTS, max_bytes: int = MAX_BATCH_BYTES,
+                 progress_table: str = None, input_terminator: str = ";") -> Dict[str, Any]:
+    """
+    Split a script into committed batches and write it with its resume manifest
+    (<output_file>.manifest.json). Statements are streamed; COMMIT/ROLLBACK in
+    the input are dropped because the batch boundaries replace them.
+    """
+    preamble = []
+    warnings = []
+    dropped = 0
+    with BatchWriter(output_file, terminator, progress_table) as writer:
+        writer.write_header(input_file)
+        pending = []
+        pending_kind = None
+        rows = 0
+        size = 0
+
+        def flush():
+            nonlocal pending, pending_kind, rows, size
+            if pending:
+                writer.write_batch(pending_kind, pending, rows)
+            pending, pending_kind, rows, size = [], None, 0, 0
+
+        with open(input_file, 'r', encoding='utf-8') as f:
+            for line_number, statement, _ in iter_sql_statements(f, input_terminator):
+                kind = statement_kind(statement)
+                if kind == "transaction":
+                    dropped += 1
+                    if statement_body(statement).upper().startswith("ROLLBACK"):
+                        warnings.append({"line": line_number, "warning": "ROLLBACK dropped; batches commit at their boundaries"})
+                    continue
+                if contains_terminator(statement, terminator):
+                    raise ValueError(f"Statement at line {line_number} contains the terminator '{terminator}'; "
+                                     f"choose another with --terminator")
+                if kind == "session":
+                    # Session statements run in place and are replayed on resume
+                    flush()
+                    preamble.append({"before_batch": len(writer.batches) + 1, "statement": statement_body(statement).strip()})
+                    writer.write(statement.strip() + terminator + "\n\n")
+                    continue
+
+                statement_rows = count_insert_rows(statement) if kind == "dml" else 0
+                statement_bytes = len(statement.encode('utf-8'))
+                unit_kind = "ddl" if kind == "ddl" else ("utility" if kind == "utility" else "dml")
+                if pending and (unit_kind != pending_kind or unit_kind == "utility"
+                                or len(pending) + 1 > max_statements
+                                or rows + statement_rows > max_rows
+                                or size + statement_bytes > max_bytes):
+                    flush()
+                pending.append((line_number, statement.lstrip('\n')))
+                pending_kind = unit_kind
+                rows += statement_rows
+                size += statement_bytes
+        flush()
+
+    manifest = {
+        "version": MANIFEST_FORMAT_VERSION,
+        "source": os.path.abspath(input_file),
+        "script": os.path.abspath(output_file),
+        "script_sha256": writer.digest.hexdigest(),
+        "script_bytes": writer.offset,
+        "terminator": terminator,
+        "progress_table": progress_table,
+        "budgets": {"rows": max_rows, "statements": max_statements, "bytes": max_bytes},
+        "preamble": preamble,
+        "batches": writer.batches
+    }
+    manifest_file = output_file + ".manifest.json"
+    with open(manifest_file, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+
+    return {
+        "script": output_file,
+        "manifest": manifest_file,
+        "batches": len(writer.batches),
+        "statements": sum(b["statements"] for b in writer.batches),
+        "rows": sum(b["rows"] for b in writer.batches),
+        "by_kind": {kind: sum(1 for b in writer.batches if b["kind"] == kind) for kind in ("ddl", "dml", "utility")},
+        "session_statements": len(preamble),
+        "dropped_transaction_statements": dropped,
+        "warnings": warnings
+    }
+
+
+def write_resume_script(manifest_file: str, last_committed: int, output_file: str = None) -> Dict[str, Any]:
+    """
+    Write a script that continues after batch last_committed: the session
+    state in effect before the next batch is replayed, then the original
+    script is copied from the offset of the next batch. The script must be unchanged since it was split.
+    """
+    with open(manifest_file, 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+    if manifest.get("version") != MANIFEST_FORMAT_VERSION:
+        raise ValueError(f"Unsupported manifest version: {manifest.get('version')}")
+
+    batches = manifest["batches"]
+    if last_committed >= len(batches):
+        return {"script": None, "remaining_batches": 0}
+    next_batch = batches[max(0, last_committed)]
+
+    digest = hashlib.sha256()
+    with open(manifest["script"], 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    if digest.hexdigest() != manifest["script_sha256"]:
+        raise ValueError(f"{manifest['script']} changed since the manifest was written; split it again")
+
+    terminator = manifest["terminator"]
+    base, extension = os.path.splitext(manifest["script"])
+    output_file = output_file or f"{base}.resume_{next_batch['batch']}{extension or '.sql'}"
+    with open(output_file, 'wb') as out:
+        header = f"-- Resume of {os.path.basename(manifest['script'])} from batch {next_batch['batch']}\n"
+        if terminator != ";":
+            header += f"--#SET TERMINATOR {terminator}\n"
+        header += ''.join(f"{statement}{terminator}\n"
+                          for statement in session_replay(manifest["preamble"], next_batch["batch"])) + "\n"
+        out.write(header.encode('utf-8'))
+        with open(manifest["script"], 'rb') as f:
+            f.seek(next_batch["offset"])
+            for block in iter(lambda: f.read(1024 * 1024), b''):
+                out.write(block)
+
+    return {
+        "script": output_file,
+        "first_batch": next_batch["batch"],
+        "remaining_batches": len(batches) - next_batch["batch"] + 1,
+        "first_line": next_batch["first_line"]
+    }
+
+
+def main():
+    """Main entry point for the script."""
+    positional, options = split_cli_args(sys.argv[1:])
+    if "resume-after" in options:
+        if len(positional) < 1:
+            print(json.dumps({"error": "Usage: sql_batch_splitter.py <manifest.json> --resume-after=N [--output=file]"}), file=sys.stderr)
+            sys.exit(1)
+    elif len(positional) < 2:
+        print(json.dumps({"error": "Usage: sql_batch_splitter.py <input.sql> <output.sql> [--terminator=@] [--input-terminator=;] "
+                                   "[--max-rows=N] [--max-statements=N] [--max-bytes=N] [--progress-table=SCHEMA.TABLE] | "
+                                   "<manifest.json> --resume-after=N [--output=file]"}), file=sys.stderr)
+        sys.exit(1)
+
+    try:
+        if "resume-after" in options:
+            result = write_resume_script(positional[0], int(options["resume-after"]), options.get("output"))
+        else:
+            result = split_script(
+                positional[0],
+                positional[1],
+                terminator=options.get("terminator", ";"),
+                max_rows=int(options.get("max-rows", str(MAX_BATCH_ROWS))),
+                max_statements=int(options.get("max-statements", str(MAX_BATCH_STATEMENTS))),
+                max_bytes=int(options.get("max-bytes", str(MAX_BATCH_BYTES))),
+                progress_table=options.get("progress-table"),
+                input_terminator=options.get("input-terminator", ";")
+            )
+            for warning in result.pop("warnings"):
+                print(json.dumps(warning), file=sys.stderr)
+        print(json.dumps(result, indent=2))
+
+    except FileNotFoundError as e:
+        print(json.dumps({"error": f"File not found: {e.filename}"}), file=sys.stderr)
+        sys.exit(1)
+    except Exception as e:
+        print(json.dumps({"error": str(e)}), file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,369 @@
+#!/usr/bin/env python3
+"""
+Cardinality and join-size estimator using SQLGlot and DB2 catalog statistics.
+This script loads SYSCAT.TABLES/COLUMNS exports (see syscat_stats.py), estimates
+the rows produced at each scan, filter, join and aggregation step of every
+SELECT in a SQL file, and flags statements whose intermediate results blow up.
+"""
+
+import sys
+import json
+from typing import List, Dict, Any
+
+try:
+    import sqlglot
+    from sqlglot import parse_one, exp
+except ImportError:
+    print(json.dumps({"error": "SQLGlot not installed. Please install with: pip install sqlglot"}), file=sys.stderr)
+    sys.exit(1)
+
+from syscat_stats import load_catalog_stats, CatalogStats
+from sql_antipatterns import from_clause, walk_scope, node_location
+from sql_dialect_translate import iter_sql_statements, split_cli_args
+
+
+# Rows assumed for tables without statistics
+DEFAULT_CARDINALITY = 1000
+
+# Textbook (System R) selectivities used when COLCARD is unknown
+DEFAULT_EQ_SELECTIVITY = 0.1
+DEFAULT_RANGE_SELECTIVITY = 1.0 / 3
+DEFAULT_BETWEEN_SELECTIVITY = 0.25
+DEFAULT_LIKE_SELECTIVITY = 0.1
+DEFAULT_NULL_SELECTIVITY = 0.04
+DEFAULT_OTHER_SELECTIVITY = 1.0 / 3
+
+# Flag a step above this many rows, or a join producing more than BLOWUP_FACTOR x its larger input
+MAX_INTERMEDIATE_ROWS = 10000000
+BLOWUP_FACTOR = 10.0
+
+
+class _Source:
+    """One FROM/JOIN source with the statistics the formulas need."""
+
+    def __init__(self, alias: str, name: str, rows: float, has_stats: bool):
+        self.alias = alias
+        self.name = name
+        self.rows = rows
+        self.has_stats = has_stats
+
+
+class CardinalityEstimator:
+    """Estimates step-by-step row counts for SELECT statements from catalog statistics."""
+
+    def __init__(self, catalog: CatalogStats, max_rows: float = MAX_INTERMEDIATE_ROWS,
+                 blowup_factor: float = BLOWUP_FACTOR):
+        self.catalog = catalog
+        self.max_rows = max_rows
+        self.blowup_factor = blowup_factor
+
+    def column_cardinality(self, source: _Source, column_name: str):
+        if source is None or source.name is None:
+            return None
+        colcard = self.catalog.column_cardinality(source.name, column_name)
+        return min(colcard, source.rows) if colcard else None
+
+    def _source_for(self, column: exp.Column, sources: Dict[str, _Source]) -> _Source:
+        qualifier = column.table.lower()
+        if qualifier:
+            return sources.get(qualifier)
+        if len(sources) == 1:
+            return next(iter(sources.values()))
+        owners = [s for s in sources.values()
+                  if s.name and self.catalog.column(s.name, column.name) is not None]
+        return owners[0] if len(owners) == 1 else None
+
+    def selectivity(self, condition, sources: Dict[str, _Source]) -> float:
+        """Selectivity of a predicate with the usual independence assumptions."""
+        condition = condition.unnest()
+        if isinstance(condition, exp.And):
+            result = 1.0
+            for term in condition.flatten():
+                result *= self.selectivity(term, sources)
+            return result
+        if isinstance(condition, exp.Or):
+            result = 0.0
+            for term in condition.flatten():
+                s = self.selectivity(term, sources)
+                result = result + s - result * s
+            return result
+        if isinstance(condition, exp.Not):
+            return 1.0 - self.selectivity(condition.this, sources)
+
+        column = condition.this if isinstance(condition.this, exp.Column) else None
+        if column is None and isinstance(condition.args.get("expression"), exp.Column):
+            column = condition.expression
+        colcard = self.column_cardinality(self._source_for(column, sources), column.name) if column is not None else None
+
+        if isinstance(condition, exp.EQ):
+            other = condition.expression if column is condition.this else condition.this
+            if isinstance(other, exp.Column):
+                other_card = self.column_cardinality(self._source_for(other, sources), other.name)
+                cards = [c for c in (colcard, other_card) if c]
+                return 1.0 / max(cards) if cards else DEFAULT_EQ_SELECTIVITY
+            return 1.0 / colcard if colcard else DEFAULT_EQ_SELECTIVITY
+        if isinstance(condition, exp.NEQ):
+            return 1.0 - (1.0 / colcard if colcard else DEFAULT_EQ_SELECTIVITY)
+        if isinstance(condition, exp.In):
+            if condition.args.get("query"):
+                return DEFAULT_OTHER_SELECTIVITY
+            per_value = 1.0 / colcard if colcard else DEFAULT_EQ_SELECTIVITY
+            return min(1.0, per_value * len(condition.expressions))
+        if isinstance(condition, exp.Is):
+            source = self._source_for(column, sources) if column is not None else None
+            stats = self.catalog.column(source.name, column.name) if source is not None and source.name else None
+            if stats and stats.get("NUMNULLS") is not None and source.rows:
+                return min(1.0, stats["NUMNULLS"] / source.rows)
+            return DEFAULT_NULL_SELECTIVITY
+        if isinstance(condition, (exp.GT, exp.GTE, exp.LT, exp.LTE)):
+            return DEFAULT_RANGE_SELECTIVITY
+        if isinstance(condition, exp.Between):
+            return DEFAULT_BETWEEN_SELECTIVITY
+        if isinstance(condition, (exp.Like, exp.ILike)):
+            return DEFAULT_LIKE_SELECTIVITY
+        if isinstance(condition, exp.Exists):
+            return 0.5
+        return DEFAULT_OTHER_SELECTIVITY
+
+    def _aliases_in(self, condition, sources: Dict[str, _Source]) -> set:
+        aliases = set()
+        for column in walk_scope(condition):
+            if isinstance(column, exp.Column):
+                source = self._source_for(column, sources)
+                if source is not None:
+                    aliases.add(source.alias)
+        return aliases
+
+    def _conjuncts(self, condition) -> List[exp.Expression]:
+        if condition is None:
+            return []
+        condition = condition.unnest()
+        return [t.unnest() for t in condition.flatten()] if isinstance(condition, exp.And) else [condition]
+
+    def _check(self, step: Dict[str, Any], inputs: List[float]):
+        if step["rows"] > self.max_rows:
+            step["flag"] = f"estimated {step['rows']:,.0f} rows exceeds {self.max_rows:,.0f}"
+        elif inputs and step["step"] == "join" and step["rows"] > self.blowup_factor * max(max(inputs), 1.0):
+            step["flag"] = f"join output is {step['rows'] / max(max(inputs), 1.0):,.0f}x its larger input"
+
+    def estimate(self, query, steps: List[Dict[str, Any]], ctes: Dict[str, _Source] = None) -> float:
+        """
+        Estimate the rows a query expression returns, appending its steps.
+        ctes maps the CTE names in scope to their estimated sources.
+        """
+        ctes = dict(ctes or {})
+        if isinstance(query, exp.Subquery):
+            return self.estimate(query.this, steps, ctes)
+        with_clause = query.args.get("with_") if isinstance(query, exp.Expression) else None
+        for cte in with_clause.expressions if with_clause is not None else []:
+            alias = cte.alias_or_name.lower()
+            inner_steps = []
+            rows = self.estimate(cte.this, inner_steps, ctes)
+            steps.extend(inner_steps)
+            steps.append({"step": "cte", "alias": alias, "rows": rows})
+            ctes[alias] = _Source(alias, None, rows, all(s.get("stats", True) for s in inner_steps))
+        if isinstance(query, exp.Union):
+            left = self.estimate(query.left, steps, ctes)
+            right = self.estimate(query.right, steps, ctes)
+            rows = left + right
+            steps.append({"step": "union", "rows": rows, "distinct": bool(query.args.get("distinct"))})
+            return rows
+        if isinstance(query, (exp.Intersect, exp.Except)):
+            left = self.estimate(query.left, steps, ctes)
+            self.estimate(query.right, steps, ctes)
+            steps.append({"step": query.key, "rows": left})
+            return left
+        if not isinstance(query, exp.Select):
+            return 1.0
+        return self._estimate_select(query, steps, ctes)
+
+    def _estimate_source(self, node, steps: List[Dict[str, Any]], ctes: Dict[str, _Source]) -> _Source:
+        alias = node.alias_or_name.lower()
+        if isinstance(node, exp.Table) and not node.db and node.name.lower() in ctes:
+            # A CTE reference reads the CTE's estimate, not a catalog table of the same name
+            cte = ctes[node.name.lower()]
+            steps.append({"step": "cte_scan", "alias": alias, "cte": cte.alias, "rows": cte.rows})
+            return _Source(alias, None, cte.rows, cte.has_stats)
+        if isinstance(node, exp.Table):
+            name = ".".join(part for part in (node.db, node.name) if part)
+            card = self.catalog.cardinality(name)
+            has_stats = card is not None
+            rows = float(card) if has_stats else float(DEFAULT_CARDINALITY)
+            line, _ = node_location(node)
+            steps.append({"step": "scan", "table": name, "alias": alias, "rows": rows,
+                          "stats": has_stats, "line": line})
+            return _Source(alias, name, rows, has_stats)
+        inner_steps = []
+        rows = self.estimate(node.this if isinstance(node, exp.Subquery) else node, inner_steps, ctes)
+        steps.extend(inner_steps)
+        steps.append({"step": "derived", "alias": alias, "rows": rows})
+        return _Source(alias, None, rows, all(s.get("stats", True) for s in inner_steps))
+
+    def _estimate_select(self, select: exp.Select, steps: List[Dict[str, Any]], ctes: Dict[str, _Source]) -> float:
+        clause = from_clause(select)
+        if clause is None:
+            return 1.0
+
+        nodes = [(clause.this, None)] + [(join.this, join) for join in select.args.get("joins") or []]
+        sources = {}
+        for node, _ in nodes:
+            source = self._estimate_source(node, steps, ctes)
+            sources[source.alias] = source
+
+        where = select.args.get("where")
+        pending = self._conjuncts(where.this if where is not None else None)
+        for _, join in nodes:
+            if join is not None:
+                pending.extend(self._conjuncts(join.args.get("on")))
+        pending = [(term, self._aliases_in(term, sources)) for term in pending]
+
+        # Local predicates filter each source before it is joined
+        for alias, source in sources.items():
+            local = [term for term, aliases in pending if aliases == {alias}]
+            if local:
+                selectivity = 1.0
+                for term in local:
+                    selectivity *= self.selectivity(term, sources)
+                source.rows = max(1.0, source.rows * selectivity)
+                steps.append({"step": "filter", "alias": alias, "selectivity": round(selectivity, 6),
+                              "rows": source.rows})
+        pending = [(term, aliases) for term, aliases in pending if len(aliases) > 1]
+
+        first = sources[nodes[0][0].alias_or_name.lower()]
+        joined = {first.alias}
+        rows = first.rows
+        for node, join in nodes[1:]:
+            source = sources[node.alias_or_name.lower()]
+            joined.add(source.alias)
+            applicable = [term for term, aliases in pending if aliases <= joined]
+            pending = [(term, aliases) for term, aliases in pending if not aliases <= joined]
+            selectivity = 1.0
+            for term in applicable:
+                selectivity *= self.selectivity(term, sources)
+            left_rows = rows
+            rows = left_rows * source.rows * selectivity
+            side = (join.args.get("side") or "").upper()
+            if side in ("LEFT", "FULL"):
+                rows = max(rows, left_rows)
+            if side in ("RIGHT", "FULL"):
+                rows = max(rows, source.rows)
+            rows = max(1.0, rows)
+            step = {"step": "join", "alias": source.alias, "kind": side or (join.args.get("kind") or "INNER").upper(),
+                    "predicates": len(applicable), "selectivity": round(selectivity, 9), "rows": rows}
+            if not applicable:
+                step["kind"] = "CROSS"
+            self._check(step, [left_rows, source.rows])
+            steps.append(step)
+
+        group = select.args.get("group")
+        if group is not None and group.expressions:
+            groups = 1.0
+            for node in group.expressions:
+                colcard = self.column_cardinality(self._source_for(node, sources), node.name) \
+                    if isinstance(node, exp.Column) else None
+                groups *= colcard if colcard else max(1.0, rows * DEFAULT_EQ_SELECTIVITY)
+            rows = max(1.0, min(rows, groups))
+            steps.append({"step": "group", "rows": rows})
+        elif any(isinstance(node, exp.AggFunc) for projection in select.expressions
+                 for node in walk_scope(projection)):
+            rows = 1.0
+            steps.append({"step": "aggregate", "rows": rows})
+
+        if select.args.get("having") is not None:
+            rows = max(1.0, rows * DEFAULT_OTHER_SELECTIVITY)
+            steps.append({"step": "having", "rows": rows})
+
+        limit = select.args.get("limit") or select.args.get("fetch")
+        count = limit.args.get("expression") or limit.args.get("count") if limit is not None else None
+        if isinstance(count, exp.Literal) and count.is_int:
+            rows = min(rows, float(count.this))
+            steps.append({"step": "limit", "rows": rows})
+
+        for step in steps:
+            if "flag" not in step and step["step"] != "join":
+                self._check(step, [])
+        return rows
+
+    def estimate_statement(self, sql: str, dialect: str = None) -> Dict[str, Any]:
+        """Estimate one statement; returns the final rows, the steps and any flags."""
+        tree = parse_one(sql, read=dialect)
+        query = tree
+        if isinstance(tree, (exp.Insert, exp.Create)):
+            query = tree.expression
+        steps = []
+        rows = self.estimate(query, steps) if query is not None else 0.0
+        for step in steps:
+            step["rows"] = round(step["rows"], 1)
+        flags = [step["flag"] for step in steps if "flag" in step]
+        return {
+            "rows": round(rows, 1),
+            "peak_rows": max((step["rows"] for step in steps), default=0.0),
+            "missing_stats": sorted({step["table"] for step in steps if step["step"] == "scan" and not step["stats"]}),
+            "flagged": bool(flags),
+            "flags": flags,
+            "steps": steps
+        }
+
+
+def estimate_file(sql_file: str, estimator: CardinalityEstimator, dialect: str = None) -> List[Dict[str, Any]]:
+    """Estimate every statement in a script."""
+    results = []
+    with open(sql_file, 'r', encoding='utf-8') as f:
+        for index, (line, statement, _) in enumerate(iter_sql_statements(f), 1):
+            result = {"statement": index, "line": line, "sql": ' '.join(statement.split())[:200]}
+            try:
+                result.update(estimator.estimate_statement(statement.strip(), dialect))
+            except Exception as e:
+                result["error"] = str(e).split('\n')[0]
+            results.append(result)
+    return results
+
+
+def main():
+    """Main entry point for the script."""
+    positional, options = split_cli_args(sys.argv[1:])
+    if len(positional) < 2:
+        print(json.dumps({"error": "Usage: sql_cardinality.py <syscat_export[,more_exports]> <sql_file> [dialect] [--max-rows=N] [--blowup=F] [--flagged-only] [--format=json|text]"}), file=sys.stderr)
+        sys.exit(1)
+
+    export_files = [path for path in positional[0].split(',') if path]
+    sql_file = positional[1]
+    dialect = positional[2] if len(positional) > 2 and positional[2] else None
+
+    try:
+        estimator = CardinalityEstimator(
+            load_catalog_stats(export_files),
+            max_rows=float(options.get("max-rows", str(MAX_INTERMEDIATE_ROWS))),
+            blowup_factor=float(options.get("blowup", str(BLOWUP_FACTOR)))
+        )
+        results = estimate_file(sql_file, estimator, dialect)
+        if "flagged-only" in options:
+            results = [result for result in results if result.get("flagged") or "error" in result]
+
+        if options.get("format", "json") == "text":
+            for result in results:
+                if "error" in result:
+                    print(f"{sql_file}:{result['line']}: error: {result['error']}")
+                    continue
+                status = "FLAGGED" if result["flagged"] else "ok"
+                print(f"{sql_file}:{result['line']}: {status} rows~{result['rows']:,.0f} peak~{result['peak_rows']:,.0f}  {result['sql'][:80]}")
+                for step in result["steps"]:
+                    label = step.get("table") or step.get("alias") or ""
+                    flag = f"  <-- {step['flag']}" if "flag" in step else ""
+                    print(f"    {step['step']:<9} {label:<30} {step['rows']:>16,.0f}{flag}")
+        else:
+            print(json.dumps(results, indent=2))
+
+    except FileNotFoundError as e:
+        print(json.dumps({"error": f"File not found: {e.filename}"}), file=sys.stderr)
+        sys.exit(1)
+    except Exception as e:
+        print(json.dumps({"error": str(e)}), file=sys.stderr)
+        sys.exit(1)
+
+    if any(result.get("flagged") for result in results):
+        sys.exit(2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,561 @@
+#!/usr/bin/env python3
+"""
+FK- and constraint-aware synthetic test data generator.
+This script reads a schema (DDL or Mermaid ERD, loaded through sql_to_mmd) and
+writes bulk-load files with the requested number of rows per table. Primary
+keys, UNIQUE keys and FK columns are pure functions of the row number, so every
+chunk of every table can be generated by a separate process without sharing
+parent data, and FK values always point at rows that exist. FK fan-out follows
+a Zipf distribution with a configurable exponent.
+"""
+
+import sys
+import os
+import re
+import json
+import math
+import time
+from typing import List, Dict, Any, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    print(json.dumps({"error": "NumPy not installed. Please install with: pip install numpy"}), file=sys.stderr)
+    sys.exit(1)
+
+from sql_to_mmd import load_schema_model, table_for
+from sql_dialect_translate import (BULK_LOAD_TARGETS, BULK_NULL_MARKER, format_db2_del_value,
+                                   format_copy_text_value, format_csv_value, split_cli_args)
+from fk_graph import FkGraph
+
+
+DEFAULT_ROWS = 1000
+CHUNK_ROWS = 1_000_000
+DEFAULT_NULL_RATE = 0.05
+# Distinct values per generated text column; drawn with replacement from a per-column pool
+STRING_POOL_SIZE = 1024
+
+BASE_DATE = np.datetime64('2015-01-01', 'D')
+DATE_SPAN_DAYS = 3653
+# Key carriers and FK digits stay below this so mixed-radix arithmetic fits in int64
+MAX_KEY_SPACE = 2 ** 62
+# Multiplier for scattering key digits and Zipf ranks; adjusted until coprime with the range
+SCATTER = 2654435761
+
+DATA_EXTENSIONS = {"db2": ".del", "postgres": ".tsv", "sqlite": ".csv"}
+FIELD_SEPARATORS = {"db2": ",", "postgres": "\t", "sqlite": ","}
+VALUE_FORMATTERS = {"db2": format_db2_del_value, "postgres": format_copy_text_value, "sqlite": format_csv_value}
+
+# (type names, kind, distinct key values the type can hold); None = derived from length/precision
+TYPE_KINDS = [
+    (("SMALLINT", "INT2", "TINYINT"), "int", 32767),
+    (("INTEGER", "INT", "INT4", "MEDIUMINT"), "int", 2 ** 31 - 1),
+    (("BIGINT", "INT8"), "int", 2 ** 63 - 1),
+    (("DECIMAL", "NUMERIC", "DEC", "NUMBER", "DECFLOAT"), "decimal", None),
+    (("REAL", "FLOAT", "DOUBLE", "DOUBLE PRECISION", "FLOAT4", "FLOAT8"), "float", 2 ** 53),
+    (("DATE",), "date", None),
+    (("TIMESTAMP", "DATETIME", "TIMESTAMPTZ"), "timestamp", None),
+    (("TIME",), "time", 86400),
+    (("BOOLEAN", "BOOL"), "bool", 2),
+    (("BLOB", "BINARY", "VARBINARY", "BYTEA", "VARCHAR FOR BIT DATA"), "binary", 0),
+]
+
+
+def column_spec(column: Dict[str, Any], nullable: bool) -> Dict[str, Any]:
+    """Classify a column type into a generator kind with its length, scale and key capacity."""
+    data_type = (column.get("data_type") or "VARCHAR").upper()
+    match = re.match(r'^\s*([A-Z_][A-Z0-9_ ]*?)\s*(?:\(([^)]*)\))?\s*(FOR BIT DATA)?\s*$', data_type)
+    base = match.group(1) if match else data_type
+    if match and match.group(3):
+        base += " FOR BIT DATA"
+    args = [int(arg) for arg in re.findall(r'\d+', match.group(2) or "")] if match else []
+
+    spec = {"name": column["name"], "kind": "string", "length": 50, "scale": 0, "nullable": nullable}
+    for names, kind, capacity in TYPE_KINDS:
+        if base in names:
+            spec["kind"] = kind
+            spec["capacity"] = capacity
+            break
+
+    if spec["kind"] == "decimal":
+        precision = args[0] if args else 15
+        spec["scale"] = args[1] if len(args) > 1 else 0
+        spec["length"] = precision
+        spec["capacity"] = 10 ** min(precision - spec["scale"], 18) - 1
+    elif spec["kind"] == "date":
+        spec["capacity"] = int((np.datetime64('9999-12-31', 'D') - BASE_DATE).astype(int))
+    elif spec["kind"] == "timestamp":
+        spec["capacity"] = int((np.datetime64('9999-12-31', 's') - BASE_DATE.astype('datetime64[s]')).astype(int))
+    elif spec["kind"] == "string":
+        spec["length"] = args[0] if args else 50
+        # Key text is the column prefix plus the decimal row number
+        digits = max(1, spec["length"] - len(key_prefix(spec)))
+        spec["capacity"] = 10 ** min(digits, 18) - 1
+    return spec
+
+
+def key_prefix(spec: Dict[str, Any]) -> str:
+    prefix = re.sub(r'[^A-Za-z0-9]', '', spec["name"]).upper()[:8]
+    return prefix[:max(0, spec["length"] - 4)]
+
+
+def scatter(values: np.ndarray, multiplier: int, space: int) -> np.ndarray:
+    """(values * multiplier) % space without int64 overflow."""
+    if values.size and int(values.max()) * multiplier >= 2 ** 63:
+        return (values.astype(object) * multiplier % space).astype(np.int64)
+    return values * multiplier % space
+
+
+def scatter_multiplier(space: int) -> int:
+    """A multiplier coprime with space, so (i * m) % space is a permutation of range(space)."""
+    multiplier = SCATTER % space if space > 1 else 1
+    while multiplier > 1 and math.gcd(multiplier, space) != 1:
+        multiplier -= 1
+    return max(1, multiplier)
+
+
+def parse_table_options(value: str, default, convert) -> Tuple[Any, Dict[str, Any]]:
+    """Parse '1000,orders=5000000,customers=20000' into a default and per-name overrides."""
+    overrides = {}
+    for item in (value or "").split(','):
+        item = item.strip()
+        if not item:
+            continue
+        name, sep, setting = item.rpartition('=')
+        if sep:
+            overrides[name.strip().lower()] = convert(setting)
+        else:
+            default = convert(setting)
+    return default, overrides
+
+
+def build_plan(model: Dict[str, Any], rows: str = None, skew: str = None,
+               null_rate: float = DEFAULT_NULL_RATE, seed: int = 0) -> Tuple[Dict[str, Any], List[str]]:
+    """
+    Work out how every column of every table is generated.
+    Each key (primary key, UNIQUE key, or a column set referenced by an FK) is
+    made injective over the row number: its FK columns and one non-FK "carrier"
+    column are digits of a mixed-radix number, scattered by a coprime multiplier
+    when FKs take part. Tables whose keys cannot hold the requested row count
+    are reduced, parents before children.
+    """
+    default_rows, row_overrides = parse_table_options(rows, DEFAULT_ROWS, int)
+    default_skew, skew_overrides = parse_table_options(skew, 0.0, float)
+    warnings = []
+
+    graph = FkGraph.from_model(model)
+    # Components are in reverse topological order; parents are planned first
+    order = [graph.names[node] for members in reversed(graph.components) for node in members]
+
+    # Column sets that must be unique: PK, UNIQUE keys and FK targets
+    key_sets = {}
+    for name in order:
+        entry = table_for(model, name)
+        key_sets[name.lower()] = []
+        for key in [entry["primary_keys"]] + entry["unique_keys"]:
+            if key and [c.lower() for c in key] not in key_sets[name.lower()]:
+                key_sets[name.lower()].append([c.lower() for c in key])
+    for edge in graph.edges:
+        target = [c.lower() for c in edge["parent_columns"]]
+        if target and target not in key_sets[edge["parent"].lower()]:
+            key_sets[edge["parent"].lower()].append(target)
+
+    plan = {"seed": seed, "null_rate": null_rate, "tables": {}, "order": [name.lower() for name in order]}
+    for table_no, name in enumerate(order):
+        entry = table_for(model, name)
+        table_key = name.lower()
+        pk = {c.lower() for c in entry["primary_keys"]}
+        specs = {}
+        for column_name in entry["column_order"]:
+            column = entry["columns"][column_name.lower()]
+            nullable = not (column.get("is_not_null") or column.get("is_primary_key") or column_name.lower() in pk)
+            specs[column_name.lower()] = column_spec(column, nullable)
+
+        fks = []
+        for fk in entry["foreign_keys"]:
+            parent = table_for(model, fk["to_table"].split('.')[-1])
+            parent_columns = fk["to_columns"] or (parent["primary_keys"] if parent else [])
+            if parent is None or len(parent_columns) != len(fk["from_columns"]):
+                warnings.append(f"{name}: FK to {fk['to_table']} skipped (referenced table or key not in schema)")
+                continue
+            columns = [c.lower() for c in fk["from_columns"]]
+            fks.append({
+                "parent": parent["name"].lower(),
+                "columns": columns,
+                "parent_columns": [c.lower() for c in parent_columns],
+                "nullable": all(specs[c]["nullable"] for c in columns if c in specs),
+                "skew": skew_overrides.get(f"{table_key}.{columns[0]}", skew_overrides.get(table_key, default_skew))
+            })
+
+        requested = row_overrides.get(table_key, default_rows)
+        table = {"name": entry["name"], "table_no": table_no, "rows": requested, "specs": specs,
+                 "columns": [c.lower() for c in entry["column_order"]], "keys": [], "fks": fks, "sources": {}}
+        plan["tables"][table_key] = table
+
+        fk_of = {}
+        for fk_no, fk in enumerate(fks):
+            for column in fk["columns"]:
+                fk_of.setdefault(column, fk_no)
+
+        for key_columns in key_sets[table_key]:
+            unclaimed = [c for c in key_columns if c in specs and c not in table["sources"]]
+            dims = []
+            for fk_no, fk in enumerate(fks):
+                if fk["columns"] and all(c in unclaimed and fk_of[c] == fk_no for c in fk["columns"]):
+                    parent_rows = plan["tables"].get(fk["parent"], {}).get("rows", default_rows)
+                    dims.append({"type": "fk", "fk": fk_no, "radix": max(1, parent_rows)})
+            candidates = [c for c in unclaimed if c not in fk_of and specs[c]["kind"] not in ("binary", "float")]
+            carrier = max(candidates, key=lambda c: specs[c]["capacity"], default=None)
+            if not dims and carrier is None:
+                warnings.append(f"{name}: cannot guarantee uniqueness of ({', '.join(key_columns)})")
+                continue
+
+            space = 1
+            for dim in dims:
+                dim["radix"] = max(1, min(dim["radix"], MAX_KEY_SPACE // space))
+                space *= dim["radix"]
+            if carrier is not None:
+                needed = max(1, -(-table["rows"] // space))
+                radix = max(1, min(needed, specs[carrier]["capacity"], MAX_KEY_SPACE // space))
+                dims.append({"type": "carrier", "column": carrier, "radix": radix})
+                space *= radix
+            if space < table["rows"]:
+                warnings.append(f"{name}: reduced from {table['rows']} to {space} rows; "
+                                f"({', '.join(key_columns)}) has no room for more distinct values")
+                table["rows"] = space
+
+            weight = space
+            for dim in dims:
+                weight //= dim["radix"]
+                dim["weight"] = weight
+            key = {"columns": key_columns, "dims": dims, "space": space,
+                   "multiplier": scatter_multiplier(space) if any(d["type"] == "fk" for d in dims) else 1}
+            key_no = len(table["keys"])
+            table["keys"].append(key)
+            for dim_no, dim in enumerate(dims):
+                for column in (fks[dim["fk"]]["columns"] if dim["type"] == "fk" else [dim["column"]]):
+                    table["sources"][column] = ("key", key_no, dim_no)
+
+        for fk_no, fk in enumerate(fks):
+            free = [c for c in fk["columns"] if c not in table["sources"]]
+            if len(free) != len(fk["columns"]):
+                if free:
+                    warnings.append(f"{name}: FK ({', '.join(fk['columns'])}) overlaps a key; "
+                                    f"referential integrity of ({', '.join(free)}) is not guaranteed")
+                continue
+            for column in fk["columns"]:
+                table["sources"].setdefault(column, ("fk", fk_no))
+
+        for column, spec in specs.items():
+            table["sources"].setdefault(column, ("random",))
+            if spec["kind"] == "binary" and not spec["nullable"]:
+                warnings.append(f"{name}.{column}: NOT NULL binary column is written as an empty value")
+
+    return plan, warnings
+
+
+def key_digits(key: Dict[str, Any], dim_no: int, rows: np.ndarray) -> np.ndarray:
+    """Digit dim_no of the (scattered) mixed-radix key value of each row."""
+    dim = key["dims"][dim_no]
+    if key["multiplier"] != 1:
+        rows = scatter(rows, key["multiplier"], key["space"])
+    return (rows // dim["weight"]) % dim["radix"]
+
+
+def key_text(plan: Dict[str, Any], table_key: str, column: str, rows: np.ndarray) -> List[str]:
+    """Text of a key column for the given row numbers; FK digits resolve through the parent's key."""
+    table = plan["tables"][table_key]
+    source = table["sources"][column]
+    if source[0] != "key":
+        raise ValueError(f"{table['name']}.{column} is not generated from the row number")
+    key = table["keys"][source[1]]
+    dim = key["dims"][source[2]]
+    digits = key_digits(key, source[2], rows)
+    if dim["type"] == "carrier":
+        return carrier_text(table["specs"][column], digits)
+    fk = table["fks"][dim["fk"]]
+    parent_column = fk["parent_columns"][fk["columns"].index(column)]
+    return key_text(plan, fk["parent"], parent_column, digits)
+
+
+def carrier_text(spec: Dict[str, Any], digits: np.ndarray) -> List[str]:
+    """Distinct text for distinct digits, in the column's type."""
+    kind = spec["kind"]
+    if kind == "int" or kind == "float":
+        return [str(v) for v in (digits + 1).tolist()]
+    if kind == "decimal":
+        suffix = "." + "0" * spec["scale"] if spec["scale"] else ""
+        return [f"{v}{suffix}" for v in (digits + 1).tolist()]
+    if kind == "date":
+        return (BASE_DATE + digits).astype(str).tolist()
+    if kind == "timestamp":
+        return [v.replace('T', ' ') for v in (BASE_DATE.astype('datetime64[s]') + digits).astype(str).tolist()]
+    if kind == "time":
+        return [f"{v // 3600:02d}:{v // 60 % 60:02d}:{v % 60:02d}" for v in digits.tolist()]
+    if kind == "bool":
+        return ["TRUE" if v else "FALSE" for v in digits.tolist()]
+    prefix = key_prefix(spec)
+    return [f"{prefix}{v}" for v in (digits + 1).tolist()]
+
+
+def zipf_rows(rng: np.random.Generator, count: int, population: int, skew: float) -> np.ndarray:
+    """
+    Draw row numbers in [0, population) with P(rank k) ~ 1/k^skew (0 = uniform).
+    Uses the inverse CDF of the continuous bounded power law, so no table of
+    population size is built; ranks are scattered so hot rows are not clustered.
+    """
+    u = rng.random(count)
+    if skew <= 0:
+        return np.minimum((u * population).astype(np.int64), population - 1)
+    if abs(skew - 1.0) < 1e-9:
+        x = np.power(float(population), u)
+    else:
+        power = 1.0 - skew
+        x = np.power((population ** power - 1.0) * u + 1.0, 1.0 / power)
+    ranks = np.clip(x.astype(np.int64) - 1, 0, population - 1)
+    return scatter(ranks, scatter_multiplier(population), population)
+
+
+def string_pool(spec: Dict[str, Any], seed: int) -> np.ndarray:
+    """Per-column pool of random words, identical in every chunk."""
+    rng = np.random.default_rng([seed, len(spec["name"]), sum(map(ord, spec["name"]))])
+    letters = np.array(list("ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789"))
+    longest = max(1, min(spec["length"], 24))
+    shortest = min(3, longest)
+    lengths = rng.integers(shortest, longest + 1, STRING_POOL_SIZE)
+    chars = rng.choice(letters, (STRING_POOL_SIZE, longest))
+    return np.array([''.join(row[:n]) for row, n in zip(chars.tolist(), lengths.tolist())], dtype=object)
+
+
+def random_text(spec: Dict[str, Any], rng: np.random.Generator, count: int, seed: int) -> List[str]:
+    kind = spec["kind"]
+    if kind == "int":
+        return [str(v) for v in rng.integers(0 if spec["capacity"] <= 32767 else 1,
+                                             min(spec["capacity"], 1_000_000) + 1, count).tolist()]
+    if kind == "decimal":
+        scale = spec["scale"]
+        digits = min(spec["length"] - scale, 7) + scale
+        values = rng.integers(0, 10 ** max(digits, 1), count).tolist()
+        if not scale:
+            return [str(v) for v in values]
+        factor = 10 ** scale
+        return [f"{v // factor}.{v % factor:0{scale}d}" for v in values]
+    if kind == "float":
+        return [repr(v) for v in np.round(rng.random(count) * 10000, 4).tolist()]
+    if kind == "date":
+        return (BASE_DATE + rng.integers(0, DATE_SPAN_DAYS, count)).astype(str).tolist()
+    if kind == "timestamp":
+        seconds = rng.integers(0, DATE_SPAN_DAYS * 86400, count)
+        return [v.replace('T', ' ') for v in (BASE_DATE.astype('datetime64[s]') + seconds).astype(str).tolist()]
+    if kind == "time":
+        return carrier_text(spec, rng.integers(0, 86400, count))
+    if kind == "bool":
+        return ["TRUE" if v else "FALSE" for v in (rng.random(count) < 0.5).tolist()]
+    if kind == "binary":
+        return [None if spec["nullable"] else ""] * count
+    return string_pool(spec, seed)[rng.integers(0, STRING_POOL_SIZE, count)].tolist()
+
+
+def generate_chunk(plan: Dict[str, Any], table_key: str, start: int, count: int, rng: np.random.Generator) -> List[List[str]]:
+    """Column-wise text values (None = NULL) for rows start .. start + count - 1."""
+    table = plan["tables"][table_key]
+    rows = np.arange(start, start + count, dtype=np.int64)
+    values = {}
+    for fk_no, fk in enumerate(table["fks"]):
+        if table["sources"][fk["columns"][0]] != ("fk", fk_no):
+            continue
+        parent_rows = plan["tables"][fk["parent"]]["rows"]
+        if parent_rows == 0:
+            for column in fk["columns"]:
+                values[column] = [None] * count
+            continue
+        parents = zipf_rows(rng, count, parent_rows, fk["skew"])
+        null_mask = (rng.random(count) < plan["null_rate"]).tolist() if fk["nullable"] else None
+        for column, parent_column in zip(fk["columns"], fk["parent_columns"]):
+            text = key_text(plan, fk["parent"], parent_column, parents)
+            if null_mask is not None:
+                text = [None if is_null else v for v, is_null in zip(text, null_mask)]
+            values[column] = text
+
+    for column in table["columns"]:
+        if column in values:
+            continue
+        spec = table["specs"][column]
+        if table["sources"][column][0] == "key":
+            values[column] = key_text(plan, table_key, column, rows)
+            continue
+        text = random_text(spec, rng, count, plan["seed"])
+        if spec["nullable"] and spec["kind"] != "binary":
+            null_mask = (rng.random(count) < plan["null_rate"]).tolist()
+            text = [None if is_null else v for v, is_null in zip(text, null_mask)]
+        values[column] = text
+    return [values[column] for column in table["columns"]]
+
+
+def format_column(spec: Dict[str, Any], values: List[str], target: str) -> List[str]:
+    """Render generated text as bulk-load fields; the value kinds follow the INSERT-to-bulk-load formatters."""
+    formatter = VALUE_FORMATTERS[target]
+    null = formatter("null", "")
+    if spec["kind"] == "bool":
+        true, false = formatter("bool", "TRUE"), formatter("bool", "FALSE")
+        return [null if v is None else (true if v == "TRUE" else false) for v in values]
+    if target == "db2" and spec["kind"] in ("string", "binary"):
+        # Generated text never contains the delimiter or quotes, so escaping is not needed
+        return [null if v is None else f'"{v}"' for v in values]
+    return [null if v is None else v for v in values]
+
+
+def data_file_name(table: Dict[str, Any], chunk_no: int, target: str) -> str:
+    base_name = re.sub(r'[^\w.]+', '_', table["name"]).strip('_') or "table"
+    return f"{base_name}_{chunk_no:04d}{DATA_EXTENSIONS[target]}"
+
+
+_worker_state = {}
+
+
+def _init_worker(plan: Dict[str, Any], target: str, output_dir: str):
+    _worker_state["plan"] = plan
+    _worker_state["target"] = target
+    _worker_state["output_dir"] = output_dir
+
+
+def _generate_worker(task: Tuple[str, int, int, int]) -> Tuple[str, int, str, int]:
+    table_key, chunk_no, start, count = task
+    plan, target = _worker_state["plan"], _worker_state["target"]
+    table = plan["tables"][table_key]
+    # Seeded per chunk, so output does not depend on the number of workers
+    rng = np.random.default_rng([plan["seed"], table["table_no"], chunk_no])
+    columns = generate_chunk(plan, table_key, start, count, rng)
+    fields = [format_column(table["specs"][name], values, target) for name, values in zip(table["columns"], columns)]
+
+    file_name = data_file_name(table, chunk_no, target)
+    with open(os.path.join(_worker_state["output_dir"], file_name), 'w', encoding='utf-8', newline='\n') as f:
+        if target == "sqlite":
+            f.write(','.join(table["specs"][name]["name"] for name in table["columns"]) + '\n')
+        separator = FIELD_SEPARATORS[target]
+        f.write('\n'.join(map(separator.join, zip(*fields))))
+        if count:
+            f.write('\n')
+    return table_key, chunk_no, file_name, count
+
+
+def write_load_script(plan: Dict[str, Any], target: str, output_dir: str, files: Dict[str, List[str]],
+                      db2_command: str = "LOAD") -> str:
+    """Load script in parent-before-child order, with SET INTEGRITY after DB2 LOAD."""
+    script_path = os.path.join(output_dir, BULK_LOAD_TARGETS[target]["script"])
+    with open(script_path, 'w', encoding='utf-8', newline='\n') as script:
+        for table_key in plan["order"]:
+            table = plan["tables"][table_key]
+            names = [table["specs"][c]["name"] for c in table["columns"]]
+            column_list = ', '.join(names)
+            for file_name in files.get(table_key, []):
+                if target == "db2":
+                    modifiers = 'MODIFIED BY CODEPAGE=1208 TIMESTAMPFORMAT="YYYY-MM-DD HH:MM:SS"'
+                    if db2_command == "IMPORT":
+                        script.write(f"IMPORT FROM '{file_name}' OF DEL {modifiers} COMMITCOUNT AUTOMATIC "
+                                     f"INSERT INTO {table['name']} ({column_list});\n")
+                    else:
+                        script.write(f"LOAD FROM '{file_name}' OF DEL {modifiers} "
+                                     f"INSERT INTO {table['name']} ({column_list}) NONRECOVERABLE;\n")
+                elif target == "postgres":
+                    script.write(f"\\copy {table['name']} ({column_list}) FROM '{file_name}'\n")
+                else:
+                    staging = f"_datagen_{os.path.splitext(file_name)[0]}"
+                    select_list = ', '.join(f"NULLIF(\"{name}\", '{BULK_NULL_MARKER}')" for name in names)
+                    script.write(f".import --csv '{file_name}' {staging}\n")
+                    script.write(f"INSERT INTO {table['name']} ({column_list}) SELECT {select_list} FROM {staging};\n")
+                    script.write(f"DROP TABLE {staging};\n")
+            script.write('\n')
+
+        if target == "db2" and db2_command != "IMPORT":
+            # LOAD leaves tables with FKs in set integrity pending state
+            checked = [plan["tables"][t]["name"] for t in plan["order"] if plan["tables"][t]["fks"]]
+            if checked:
+                script.write(f"SET INTEGRITY FOR {', '.join(checked)} IMMEDIATE CHECKED;\n")
+    return script_path
+
+
+def generate_data(model: Dict[str, Any], output_dir: str, target: str = "db2", rows: str = None,
+                  skew: str = None, null_rate: float = DEFAULT_NULL_RATE, seed: int = 0,
+                  workers: int = 0, chunk_rows: int = CHUNK_ROWS, db2_command: str = "LOAD") -> Dict[str, Any]:
+    """Plan the schema, generate all chunks in parallel and write the load script."""
+    if target not in DATA_EXTENSIONS:
+        raise ValueError(f"Unsupported bulk-load target: {target} (expected one of {', '.join(DATA_EXTENSIONS)})")
+    started = time.perf_counter()
+    plan, warnings = build_plan(model, rows, skew, null_rate, seed)
+    os.makedirs(output_dir, exist_ok=True)
+
+    tasks = []
+    for table_key in plan["order"]:
+        total = plan["tables"][table_key]["rows"]
+        for chunk_no, start in enumerate(range(0, total, chunk_rows), 1):
+            tasks.append((table_key, chunk_no, start, min(chunk_rows, total - start)))
+
+    files = {}
+    row_counts = {}
+    workers = workers if workers > 0 else (os.cpu_count() or 1)
+    workers = min(workers, max(1, len(tasks)))
+    if workers == 1:
+        _init_worker(plan, target, output_dir)
+        results = map(_generate_worker, tasks)
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+        pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                   initargs=(plan, target, output_dir))
+        results = pool.map(_generate_worker, tasks)
+    try:
+        for table_key, chunk_no, file_name, count in results:
+            files.setdefault(table_key, []).append(file_name)
+            row_counts[table_key] = row_counts.get(table_key, 0) + count
+    finally:
+        if workers > 1:
+            pool.shutdown()
+
+    script = write_load_script(plan, target, output_dir, files, db2_command.upper())
+    return {
+        "target": target,
+        "script": script,
+        "tables": {plan["tables"][t]["name"]: {"rows": row_counts.get(t, 0), "files": files.get(t, [])}
+                   for t in plan["order"]},
+        "rows": sum(row_counts.values()),
+        "seconds": round(time.perf_counter() - started, 3),
+        "warnings": warnings
+    }
+
+
+def main():
+    """Main entry point for the script."""
+    positional, options = split_cli_args(sys.argv[1:])
+    if len(positional) < 2:
+        print(json.dumps({"error": "Usage: sql_datagen.py <schema_ddl_or_mmd> <output_dir> [--target=db2|postgres|sqlite] "
+                                   "[--rows=N,table=N] [--skew=S,table.column=S] [--null-rate=0.05] [--seed=N] "
+                                   "[--workers=N] [--chunk-rows=N] [--db2-command=LOAD|IMPORT]"}), file=sys.stderr)
+        sys.exit(1)
+
+    try:
+        result = generate_data(
+            load_schema_model(positional[0]),
+            positional[1],
+            target=options.get("target", "db2"),
+            rows=options.get("rows"),
+            skew=options.get("skew"),
+            null_rate=float(options.get("null-rate", str(DEFAULT_NULL_RATE))),
+            seed=int(options.get("seed", "0")),
+            workers=int(options.get("workers", "0")),
+            chunk_rows=max(1, int(options.get("chunk-rows", str(CHUNK_ROWS)))),
+            db2_command=options.get("db2-command", "LOAD")
+        )
+        for warning in result.pop("warnings"):
+            print(json.dumps({"warning": warning}), file=sys.stderr)
+        print(json.dumps(result, indent=2))
+
+    except FileNotFoundError as e:
+        print(json.dumps({"error": f"File not found: {e.filename}"}), file=sys.stderr)
+        sys.exit(1)
+    except Exception as e:
+        print(json.dumps({"error": str(e)}), file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
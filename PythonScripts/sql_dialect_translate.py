@@ -2,49 +2,1669 @@
 """
 SQL dialect translator using SQLGlot.
 This script converts SQL from one dialect to another.
+
+Batch mode (--batch) translates a whole directory tree or manifest of scripts
+across a process pool, mirroring the input tree under the output directory and
+writing per-file status and timings to a JSONL summary.
+
+Bulk-load mode (--bulk-load) turns INSERT-based data scripts into native load
+artifacts: DB2 DEL files with LOAD/IMPORT commands, PostgreSQL COPY blocks or
+SQLite CSV files with .import.
+
+Optimize mode (--optimize) applies SQLGlot's semantic rewrite rules (predicate
+pushdown, subquery unnesting, constant folding, join elimination, column
+qualification, ...) and reports which rules fired on each statement. Without
+--optimize-report the report follows the SQL on stdout as comments, after an
+"-- ==== optimize report ====" line.
+
+Keyset mode (--keyset) rewrites OFFSET-paged queries into keyset ("seek")
+form: the next page is selected by the last row's ORDER BY values, with the
+primary key added as a tie-breaker, so a deep page costs the same as the first.
+
+Streaming mode (--stream) splits and translates arbitrarily large scripts one
+statement at a time, writing output as it goes and isolating failures per
+statement with their line numbers.
 """
 
 import sys
+import os
+import re
 import json
+import time
+from typing import List, Dict, Any, Tuple
 
 try:
     import sqlglot
-    from sqlglot import parse, transpile
+    from sqlglot import parse, transpile, exp, generator
+    from sqlglot.dialects.dialect import Dialect
 except ImportError:
     print(json.dumps({"error": "SQLGlot not installed. Please install with: pip install sqlglot"}), file=sys.stderr)
     sys.exit(1)
 
+from sql_parse_guard import ParseBudget, StatementSupervisor, guarded_call, record_diagnostic, skip_comment
+
+
+DB2_DIALECT = "db2"
+
+
+class Db2(Dialect):
+    """
+    Minimal DB2 dialect so "db2" can be used as a source or target name.
+    Parsing uses the ANSI defaults; generation emits FETCH FIRST and OFFSET ... ROWS.
+    DB2 clauses SQLGlot cannot parse (WITH UR, OPTIMIZE FOR, ...) are handled
+    by the hint mapping in translate_sql.
+    """
+
+    # DB2 sorts NULL above every value: last ascending, first descending
+    NULL_ORDERING = "nulls_are_large"
+
+    class Generator(generator.Generator):
+        LIMIT_FETCH = "FETCH"
+
+        def offset_sql(self, expression) -> str:
+            return f"{super().offset_sql(expression)} ROWS"
+
+
+# DB2 trailing clauses, stripped from the end of a statement before parsing
+_DB2_TRAILING_HINT_RES = [
+    ("isolation", re.compile(r'\s+WITH\s+(UR|CS|RS|RR)(?:\s+USE\s+AND\s+KEEP\s+(?:SHARE|UPDATE|EXCLUSIVE)\s+LOCKS)?\s*$', re.IGNORECASE)),
+    ("optimize_for", re.compile(r'\s+OPTIMIZE\s+FOR\s+(\d+)\s+ROWS?\s*$', re.IGNORECASE)),
+    ("read_only", re.compile(r'\s+FOR\s+(READ|FETCH)\s+ONLY\s*$', re.IGNORECASE)),
+]
+
+# SELECTIVITY n after a predicate; string literals are matched first and left alone
+_DB2_SELECTIVITY_RE = re.compile(r"'(?:[^']|'')*'|\s+SELECTIVITY\s+([0-9.]+(?:[eE][-+]?\d+)?)", re.IGNORECASE)
+
+_SET_ISOLATION_RE = re.compile(
+    r'^\s*SET\s+TRANSACTION\s+ISOLATION\s+LEVEL\s+(READ\s+UNCOMMITTED|READ\s+COMMITTED|REPEATABLE\s+READ|SERIALIZABLE)\s*$',
+    re.IGNORECASE
+)
+
+# DB2 isolation level -> ANSI isolation level
+DB2_ISOLATION_LEVELS = {
+    "UR": "READ UNCOMMITTED",
+    "CS": "READ COMMITTED",
+    "RS": "REPEATABLE READ",
+    "RR": "SERIALIZABLE"
+}
+
+# DB2 isolation level -> SQL Server table hint (statement-scoped like WITH UR)
+TSQL_ISOLATION_HINTS = {
+    "UR": "NOLOCK",
+    "CS": "READCOMMITTED",
+    "RS": "REPEATABLEREAD",
+    "RR": "SERIALIZABLE"
+}
+
+# SQLGlot's pretty generator indents table hints as if they were a list ("FROM t   WITH (NOLOCK)")
+_PADDED_TABLE_HINT_RE = re.compile(r'(?<=\S) {2,}(WITH \((?:NOLOCK|READCOMMITTED|REPEATABLEREAD|SERIALIZABLE)\))')
+
+# Isolation levels a target actually implements; others are mapped to the nearest stronger level
+TARGET_ISOLATION_LEVELS = {
+    "postgres": {"UR": "READ COMMITTED"},
+    "oracle": {"UR": "READ COMMITTED", "RS": "SERIALIZABLE"}
+}
+
+
+def extract_db2_hints(statement: str) -> Tuple[str, List[Dict[str, str]]]:
+    """
+    Strip DB2 performance and isolation clauses from a statement.
+    Returns the statement SQLGlot can parse and the hints that were removed.
+    """
+    hints = []
+    found = True
+    while found:
+        found = False
+        for kind, pattern in _DB2_TRAILING_HINT_RES:
+            match = pattern.search(statement)
+            if match:
+                hints.append({"kind": kind, "value": match.group(1).upper(), "clause": ' '.join(match.group(0).split())})
+                statement = statement[:match.start()]
+                found = True
+
+    def strip_selectivity(match):
+        if match.group(1) is None:
+            return match.group(0)
+        hints.append({"kind": "selectivity", "value": match.group(1), "clause": f"SELECTIVITY {match.group(1)}"})
+        return ""
+
+    statement = _DB2_SELECTIVITY_RE.sub(strip_selectivity, statement)
+    return statement, list(reversed(hints))
+
+
+def extract_target_db2_hints(tree) -> List[Dict[str, str]]:
+    """
+    Remove hints from a non-DB2 statement that have a DB2 equivalent:
+    SQL Server isolation table hints and OPTION (FAST n), Oracle FIRST_ROWS(n).
+    """
+    hints = []
+    tsql_to_db2 = {value: key for key, value in TSQL_ISOLATION_HINTS.items()}
+    tsql_to_db2.update({"READUNCOMMITTED": "UR", "HOLDLOCK": "RR"})
+
+    for table in tree.find_all(exp.Table):
+        kept = []
+        for table_hint in table.args.get("hints") or []:
+            names = [hint_name.name.upper() for hint_name in table_hint.expressions]
+            levels = [tsql_to_db2[name] for name in names if name in tsql_to_db2]
+            if levels and len(levels) == len(names):
+                hints.append({"kind": "isolation", "value": levels[0], "clause": f"WITH ({', '.join(names)})"})
+            else:
+                kept.append(table_hint)
+        table.set("hints", kept or None)
+
+    for select in tree.find_all(exp.Select):
+        kept = []
+        for option in select.args.get("options") or []:
+            if option.name.upper() == "FAST" and option.expression is not None:
+                hints.append({"kind": "optimize_for", "value": option.expression.name, "clause": f"OPTION (FAST {option.expression.name})"})
+            else:
+                kept.append(option)
+        select.set("options", kept or None)
+
+        hint = select.args.get("hint")
+        if hint:
+            kept_hints = []
+            for item in hint.expressions:
+                # Oracle keeps hint bodies as raw text; built trees use Anonymous functions
+                first_rows = re.match(r'^\s*FIRST_ROWS\s*\(\s*(\d+)\s*\)\s*$', item if isinstance(item, str) else item.sql(), re.IGNORECASE)
+                if first_rows:
+                    hints.append({"kind": "optimize_for", "value": first_rows.group(1), "clause": f"FIRST_ROWS({first_rows.group(1)})"})
+                else:
+                    kept_hints.append(item)
+            select.set("hint", exp.Hint(expressions=kept_hints) if kept_hints else None)
+
+    # Several tables hinted with the same level describe one statement-level isolation
+    unique = []
+    for hint in hints:
+        if hint not in unique:
+            unique.append(hint)
+    return unique
+
+
+def read_tables(tree) -> List[exp.Table]:
+    """
+    Tables a statement reads through FROM and JOIN, where a T-SQL table hint can
+    stand in for DB2's statement isolation. CTE references and the target of an
+    INSERT, UPDATE, DELETE or MERGE (which T-SQL does not allow NOLOCK on) are left out.
+    """
+    cte_names = {cte.alias_or_name.lower() for cte in tree.find_all(exp.CTE)}
+    target = tree.this if isinstance(tree, (exp.Insert, exp.Update, exp.Delete, exp.Merge)) else None
+    target_names = set()
+    if isinstance(target, exp.Table):
+        target_names = {target.name.lower(), target.alias_or_name.lower()}
+    tables = []
+    for table in tree.find_all(exp.Table):
+        if not isinstance(table.parent, (exp.From, exp.Join)) or table is target:
+            continue
+        if not table.db and table.name.lower() in cte_names:
+            continue
+        if isinstance(tree, (exp.Update, exp.Delete)) and table.alias_or_name.lower() in target_names:
+            # UPDATE t ... FROM t JOIN u: the FROM entry is the target itself
+            continue
+        tables.append(table)
+    return tables
+
+
+def apply_hints(tree, hints: List[Dict[str, str]], target_dialect: str, statement_index: int,
+                warnings: List[Dict[str, Any]]) -> Tuple[List[str], List[str], List[str]]:
+    """
+    Map DB2 hints onto the target. Tree-level equivalents are applied in place.
+    Returns separate statements to run first (SET TRANSACTION), comments to put
+    before the statement and clauses to append after it; a structured warning is
+    recorded for every hint that is not fully preserved.
+    """
+    setup = []
+    before = []
+    after = []
+    # DB2 requires FOR READ ONLY, OPTIMIZE FOR and WITH <isolation> in this order
+    clause_order = {"read_only": 0, "optimize_for": 1, "isolation": 2, "selectivity": 3}
+    hints = sorted(hints, key=lambda hint: clause_order[hint["kind"]])
+
+    def warn(hint, action, message):
+        warnings.append({
+            "statement": statement_index,
+            "hint": hint["clause"],
+            "target": target_dialect or "default",
+            "action": action,
+            "message": message
+        })
+
+    for hint in hints:
+        kind = hint["kind"]
+        value = hint["value"]
+
+        if target_dialect == DB2_DIALECT:
+            if kind == "read_only":
+                after.append("FOR READ ONLY")
+            elif kind == "optimize_for":
+                after.append(f"OPTIMIZE FOR {value} ROWS")
+            elif kind == "isolation":
+                after.append(f"WITH {value}")
+            else:
+                before.append(f"/* DB2 {hint['clause']} */")
+                warn(hint, "comment", "SELECTIVITY cannot be re-attached to its predicate; kept as a comment")
+            continue
+
+        if kind == "read_only":
+            # Plain SELECTs are read-only cursors on every target
+            continue
+
+        if kind == "isolation":
+            level = DB2_ISOLATION_LEVELS[value]
+            if target_dialect == "tsql":
+                for table in read_tables(tree):
+                    table.set("hints", [exp.WithTableHint(expressions=[exp.var(TSQL_ISOLATION_HINTS[value])])])
+            elif target_dialect in ("sqlite", None, ""):
+                before.append(f"/* DB2 {hint['clause']} */")
+                warn(hint, "comment", "Target has no statement-level isolation; kept as a comment")
+            else:
+                mapped = TARGET_ISOLATION_LEVELS.get(target_dialect, {}).get(value, level)
+                setup.append(f"SET TRANSACTION ISOLATION LEVEL {mapped}")
+                if mapped != level:
+                    warn(hint, "degraded", f"{level} is not supported; using {mapped}")
+                warn(hint, "transaction", "Isolation applies to the enclosing transaction, not only this statement")
+        elif kind == "optimize_for":
+            select = tree if isinstance(tree, exp.Select) else tree.find(exp.Select)
+            if target_dialect == "tsql" and select is not None:
+                select.set("options", [exp.QueryOption(this=exp.var("FAST"), expression=exp.Literal.number(value))])
+            elif target_dialect == "oracle" and select is not None:
+                select.set("hint", exp.Hint(expressions=[exp.Anonymous(this="FIRST_ROWS", expressions=[exp.Literal.number(value)])]))
+            else:
+                before.append(f"/* DB2 {hint['clause']} */")
+                warn(hint, "comment", "Target has no first-rows optimizer hint; kept as a cursor-hint comment")
+        elif kind == "selectivity":
+            before.append(f"/* DB2 {hint['clause']} */")
+            warn(hint, "comment", "Predicate selectivity overrides are DB2-specific; kept as a comment")
+
+    return setup, before, after
+
+
+def translate_with_hints(statement: str, source_dialect: str, target_dialect: str, statement_index: int,
+                         warnings: List[Dict[str, Any]]) -> List[str]:
+    """Translate one statement, carrying DB2 hints and isolation clauses across dialects."""
+    hints = []
+    if source_dialect == DB2_DIALECT:
+        statement, hints = extract_db2_hints(statement)
+    elif target_dialect == DB2_DIALECT:
+        isolation = _SET_ISOLATION_RE.match(statement)
+        if isolation:
+            level = ' '.join(isolation.group(1).upper().split())
+            db2_level = {ansi: db2 for db2, ansi in DB2_ISOLATION_LEVELS.items()}[level]
+            return [f"SET CURRENT ISOLATION = {db2_level}"]
+
+    translated = []
+    for tree in parse(statement, read=source_dialect):
+        if tree is None:
+            continue
+        tree_hints = hints
+        if target_dialect == DB2_DIALECT and source_dialect != DB2_DIALECT:
+            tree_hints = extract_target_db2_hints(tree)
+        setup, before, after = apply_hints(tree, tree_hints, target_dialect, statement_index, warnings)
+        sql = tree.sql(dialect=target_dialect, pretty=True)
+        if target_dialect == "tsql" and tree_hints:
+            sql = _PADDED_TABLE_HINT_RE.sub(r' \1', sql)
+        translated.extend(setup)
+        translated.append('\n'.join(before + [sql] + after))
+    return translated
+
+
+# Statement boundaries: quoted strings/identifiers and comments are matched first so
+# that a ';' inside them never terminates a statement
+_STATEMENT_TOKEN_RE = re.compile(r"'(?:[^']|'')*'|\"(?:[^\"]|\"\")*\"|--[^\n]*|/\*.*?\*/|;", re.DOTALL)
+
+# Single-row INSERT INTO <table> (<columns>) VALUES (<literals>)
+_INSERT_VALUES_RE = re.compile(
+    r'^\s*(INSERT\s+INTO\s+[\w.$#@"]+(?:\s*\.\s*[\w$#@"]+)*\s*\([^()]*\))\s*VALUES\s*\((.*)\)\s*$',
+    re.IGNORECASE | re.DOTALL
+)
+
+# One literal inside a VALUES tuple followed by ',' or the end of the tuple
+_VALUE_LITERAL_RE = re.compile(
+    r"\s*(?:"
+    r"(?P<null>NULL)"
+    r"|(?P<bool>TRUE|FALSE)"
+    r"|(?P<number>[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?)"
+    r"|(?P<typed>DATE|TIMESTAMP|TIME)\s*'(?P<typed_value>(?:[^']|'')*)'"
+    r"|'(?P<string>(?:[^']|'')*)'"
+    r")\s*(?P<end>,|$)",
+    re.IGNORECASE | re.DOTALL
+)
+
+# Minimum number of consecutive same-shape INSERTs before the fast path is used
+BULK_INSERT_MIN_RUN = 2
+
+# Upper bound on rows per multi-row VALUES statement (1 means no folding)
+MAX_VALUES_ROWS = {
+    "tsql": 1000,
+    "fabric": 1000,
+    "sqlite": 500,
+    "oracle": 1
+}
+
+_LITERAL_SENTINEL = "__sql_dialect_translate_literal__"
+
+
+def split_sql_statements(sql_content: str) -> List[str]:
+    """
+    Split a script into statement texts on ';', ignoring semicolons inside
+    string literals, quoted identifiers and comments. Terminators are dropped.
+    """
+    statements = []
+    start = 0
+    for match in _STATEMENT_TOKEN_RE.finditer(sql_content):
+        if match.group(0) == ';':
+            statements.append(sql_content[start:match.start()])
+            start = match.end()
+    statements.append(sql_content[start:])
+    return [stmt for stmt in statements if stmt.strip()]
+
+
+def canonical_insert_head(head: str) -> str:
+    """Canonical INSERT shape: whitespace collapsed and dropped around punctuation, keywords upper-cased."""
+    head = re.sub(r'\s*([(),.])\s*', r'\1', ' '.join(head.split()))
+    return 'INSERT INTO ' + head[len('INSERT INTO '):]
+
+
+def parse_insert_values(statement: str, source_escapes: List[str]):
+    """
+    Match a single-row INSERT whose VALUES are plain literals.
+    Returns (head, [(kind, value), ...]) or None when the statement needs the full parser.
+    """
+    match = _INSERT_VALUES_RE.match(statement)
+    if not match:
+        return None
+
+    head = canonical_insert_head(match.group(1))
+    body = match.group(2)
+    values = []
+    pos = 0
+    while pos < len(body):
+        literal = _VALUE_LITERAL_RE.match(body, pos)
+        if not literal:
+            return None
+        if literal.group('null') is not None:
+            values.append(("null", None))
+        elif literal.group('bool') is not None:
+            values.append(("bool", literal.group('bool').upper()))
+        elif literal.group('number') is not None:
+            values.append(("number", literal.group('number')))
+        elif literal.group('typed') is not None:
+            values.append(("typed:" + literal.group('typed').upper(), literal.group('typed_value').replace("''", "'")))
+        else:
+            value = literal.group('string')
+            if '\\' in source_escapes and '\\' in value:
+                return None
+            values.append(("string", value.replace("''", "'")))
+        pos = literal.end()
+        if literal.group('end') != ',':
+            break
+
+    if pos < len(body) or not values:
+        return None
+    return head, values
+
+
+class LiteralFormatter:
+    """
+    Renders literal values for a target dialect. Typed and boolean literals are
+    translated once through SQLGlot and then reused as templates.
+    """
+
+    def __init__(self, source_dialect: str, target_dialect: str):
+        self.source_dialect = source_dialect
+        self.target_dialect = target_dialect
+        dialect = Dialect.get_or_raise(target_dialect)
+        # Strings are escaped by the target's own generator, as the parser path does
+        self.generator = dialect.generator()
+        self.quote_start, self.quote_end = dialect.QUOTE_START, dialect.QUOTE_END
+        # Width past which the pretty generator puts each value of a row on its own line
+        self.text_width = dialect.generator(pretty=True).max_text_width
+        self.templates = {}
+
+    def quote(self, value: str) -> str:
+        return f"{self.quote_start}{self.generator.escape_str(value)}{self.quote_end}"
+
+    def template(self, kind: str) -> str:
+        if kind not in self.templates:
+            if kind == "bool:TRUE" or kind == "bool:FALSE":
+                sample = kind.split(':')[1]
+            else:
+                sample = f"{kind.split(':')[1]} '{_LITERAL_SENTINEL}'"
+            translated = transpile(f"SELECT {sample}", read=self.source_dialect, write=self.target_dialect)[0]
+            self.templates[kind] = translated[len("SELECT "):]
+        return self.templates[kind]
+
+    def format(self, kind: str, value: str) -> str:
+        if kind == "number":
+            return value
+        if kind == "string":
+            return self.quote(value)
+        if kind == "null":
+            return "NULL"
+        if kind == "bool":
+            return self.template(f"bool:{value}")
+        return self.template(kind).replace(f"'{_LITERAL_SENTINEL}'", self.quote(value))
+
+
+def translate_insert_head(head: str, source_dialect: str, target_dialect: str) -> str:
+    """
+    Translate 'INSERT INTO t (cols)' once per statement shape, in the parser's
+    pretty layout; None if it doesn't round-trip.
+    """
+    translated = transpile(f"{head} VALUES (NULL)", read=source_dialect, write=target_dialect, pretty=True)
+    if len(translated) != 1 or not translated[0].endswith("\nVALUES\n  (NULL)"):
+        return None
+    return translated[0][:-len("\nVALUES\n  (NULL)")]
+
+
+def format_values_row(values: List[str], text_width: int) -> str:
+    """One VALUES row laid out as the pretty generator does: inline, or one value per line when too wide."""
+    items = [f"{value}, " for value in values[:-1]] + values[-1:]
+    # The generator measures line breaks inside strings as its line-break sentinel
+    line_break = len(generator.Generator.SENTINEL_LINE_BREAK)
+    if sum(len(item) + item.count('\n') * (line_break - 1) for item in items) <= text_width:
+        return '(' + ''.join(items) + ')'
+    return '(\n' + '\n'.join(f"    {item.rstrip()}" for item in items) + '\n  )'
+
 
-def translate_sql(sql_content: str, source_dialect: str, target_dialect: str) -> str:
+def translate_insert_run(head: str, rows: List[List[Tuple[str, str]]], formatter: LiteralFormatter,
+                         fold_inserts: int) -> List[str]:
+    """
+    Render a run of same-shape INSERT rows, optionally folded into multi-row
+    VALUES, with the same layout the full parser produces.
+    """
+    rendered = [
+        format_values_row([formatter.format(kind, value) for kind, value in row], formatter.text_width)
+        for row in rows
+    ]
+    statements = []
+    for i in range(0, len(rendered), max(1, fold_inserts)):
+        batch = rendered[i:i + max(1, fold_inserts)]
+        statements.append(f"{head}\nVALUES\n  " + ',\n  '.join(batch))
+    return statements
+
+
+def translate_sql(sql_content: str, source_dialect: str, target_dialect: str,
+                  fast_inserts: bool = True, fold_inserts: int = 1,
+                  warnings: List[Dict[str, Any]] = None, budget: ParseBudget = None) -> str:
     """
     Translate SQL from source dialect to target dialect using SQLGlot.
+
+    Runs of structurally identical single-row INSERT ... VALUES statements skip
+    the parser: the INSERT shape is translated once and the literal values are
+    streamed through a dialect-aware formatter, in the same pretty layout the
+    parser emits. fold_inserts > 1 merges each run into multi-row VALUES
+    statements of up to that many rows.
+
+    When DB2 is the source or target, statements are translated one at a time so
+    that DB2 hints (WITH UR/CS/RS/RR, OPTIMIZE FOR n ROWS, FOR READ ONLY,
+    SELECTIVITY) map to their nearest target equivalent. Hints that cannot be
+    fully preserved are appended to warnings as structured entries.
+
+    With a ParseBudget, statements are parsed one at a time under its token,
+    depth and time limits; a statement over budget is passed through verbatim
+    behind a comment and recorded in warnings.
     """
+    hint_mode = DB2_DIALECT in (source_dialect, target_dialect)
+    if warnings is None:
+        warnings = []
+    supervisor = StatementSupervisor(budget) if budget else None
+
     try:
-        # Use SQLGlot's transpile function for dialect translation
-        # transpile returns a list of SQL strings
-        translated = transpile(
-            sql_content,
-            read=source_dialect,
-            write=target_dialect,
-            pretty=True
-        )
-        
+        if not fast_inserts and not hint_mode and supervisor is None:
+            return '\n\n'.join(_transpile(sql_content, source_dialect, target_dialect))
+
+        fold_inserts = max(1, min(fold_inserts, MAX_VALUES_ROWS.get(target_dialect or "", fold_inserts)))
+        source_escapes = Dialect.get_or_raise(source_dialect).tokenizer_class.STRING_ESCAPES
+        formatter = LiteralFormatter(source_dialect, target_dialect)
+        head_cache = {}
+
+        translated = []
+        pending = []  # statements that go through the full parser
+        run_head = None
+        run_rows = []
+
+        def flush_pending():
+            if not pending:
+                return
+            if supervisor:
+                for index, stmt in pending:
+                    translated.extend(translate_within_budget(supervisor, stmt, source_dialect, target_dialect, index, warnings))
+            elif hint_mode:
+                for index, stmt in pending:
+                    translated.extend(translate_with_hints(stmt, source_dialect, target_dialect, index, warnings))
+            else:
+                translated.extend(_transpile(';\n'.join(stmt for _, stmt in pending), source_dialect, target_dialect))
+            pending.clear()
+
+        def flush_run():
+            nonlocal run_head
+            if run_head is None:
+                return
+            head_sql = None
+            if len(run_rows) >= BULK_INSERT_MIN_RUN:
+                if run_head not in head_cache:
+                    head_cache[run_head] = translate_insert_head(run_head, source_dialect, target_dialect)
+                head_sql = head_cache[run_head]
+            if head_sql is None:
+                pending.extend((index, stmt) for index, stmt, _ in run_rows)
+            else:
+                flush_pending()
+                translated.extend(translate_insert_run(head_sql, [row for _, _, row in run_rows], formatter, fold_inserts))
+            run_head = None
+            run_rows.clear()
+
+        for index, statement in enumerate(split_sql_statements(sql_content), 1):
+            parsed = parse_insert_values(statement, source_escapes) if fast_inserts else None
+            if parsed is None:
+                flush_run()
+                pending.append((index, statement))
+                continue
+            head, row = parsed
+            if head != run_head:
+                flush_run()
+                run_head = head
+            run_rows.append((index, statement, row))
+
+        flush_run()
+        flush_pending()
+
         # Join all translated statements
         return '\n\n'.join(translated)
     except Exception as e:
         raise Exception(f"SQL dialect translation failed: {str(e)}")
+    finally:
+        if supervisor:
+            supervisor.close()
+
+
+def translate_statement(statement: str, source_dialect: str, target_dialect: str,
+                        statement_index: int) -> Tuple[List[str], List[Dict[str, Any]]]:
+    """Translate one statement through the full parser; runs in the parse worker under a budget."""
+    warnings = []
+    if DB2_DIALECT in (source_dialect, target_dialect):
+        return translate_with_hints(statement, source_dialect, target_dialect, statement_index, warnings), warnings
+    return _transpile(statement, source_dialect, target_dialect), warnings
+
+
+def translate_within_budget(supervisor: StatementSupervisor, statement: str, source_dialect: str, target_dialect: str,
+                            statement_index: int, warnings: List[Dict[str, Any]], line_number: int = None) -> List[str]:
+    """
+    Translate one statement under the supervisor's budget. A statement over
+    budget comes back verbatim behind a comment, with a diagnostic in warnings.
+    """
+    status, result = guarded_call(supervisor, translate_statement, statement, source_dialect, target_dialect, statement_index)
+    if status == "error":
+        raise Exception(result)
+    if status == "over_budget":
+        record_diagnostic(warnings, statement_index, statement, result, "passed through")
+        return [f"{skip_comment(statement_index, result, line_number)}\n{statement.strip()}"]
+    results, statement_warnings = result
+    warnings.extend(statement_warnings)
+    return results
+
+
+def _transpile(sql_content: str, source_dialect: str, target_dialect: str) -> List[str]:
+    """Full parse/generate path; transpile returns a list of SQL strings."""
+    return transpile(
+        sql_content,
+        read=source_dialect,
+        write=target_dialect,
+        pretty=True
+    )
+
+
+_STREAM_TOKEN_CACHE = {}
+
+# DB2 CLP directive that changes the statement terminator mid-script
+_SET_TERMINATOR_RE = re.compile(r'^\s*--#SET\s+TERMINATOR\s+(\S+)', re.IGNORECASE)
+
+
+def _stream_token_re(terminator: str):
+    """Regex for the next quote, comment start or terminator outside strings/comments."""
+    if terminator not in _STREAM_TOKEN_CACHE:
+        _STREAM_TOKEN_CACHE[terminator] = re.compile(r"'|\"|--|/\*|" + re.escape(terminator))
+    return _STREAM_TOKEN_CACHE[terminator]
+
+
+def iter_sql_statements(lines, terminator: str = ";"):
+    """
+    Split a stream of lines into statements without reading it all into memory.
+    Terminators inside string literals, quoted identifiers and comments are ignored,
+    and DB2 CLP '--#SET TERMINATOR x' lines switch the terminator.
+    Yields (line_number, statement, terminator) where line_number is the first line of the statement.
+    """
+    buffer = []
+    start_line = None
+    quote = None
+    in_block_comment = False
+
+    for line_number, line in enumerate(lines, 1):
+        if quote is None and not in_block_comment and not ''.join(buffer).strip():
+            directive = _SET_TERMINATOR_RE.match(line)
+            if directive:
+                terminator = directive.group(1)
+                buffer = []
+                continue
+
+        token_re = _stream_token_re(terminator)
+        segment_start = 0
+        pos = 0
+        while pos < len(line):
+            if in_block_comment:
+                end = line.find('*/', pos)
+                if end < 0:
+                    break
+                in_block_comment = False
+                pos = end + 2
+            elif quote:
+                end = line.find(quote, pos)
+                if end < 0:
+                    break
+                if line.startswith(quote, end + 1):
+                    pos = end + 2  # doubled quote is an escaped quote
+                else:
+                    quote = None
+                    pos = end + 1
+            else:
+                match = token_re.search(line, pos)
+                if not match:
+                    break
+                token = match.group(0)
+                if token == '--':
+                    break
+                if token == '/*':
+                    in_block_comment = True
+                    pos = match.end()
+                elif token in ("'", '"'):
+                    quote = token
+                    pos = match.end()
+                else:
+                    if start_line is None:
+                        start_line = line_number
+                    buffer.append(line[segment_start:match.start()])
+                    statement = ''.join(buffer)
+                    if statement.strip():
+                        yield start_line, statement, terminator
+                    buffer = []
+                    start_line = None
+                    segment_start = pos = match.end()
+
+        rest = line[segment_start:]
+        if rest.strip() and start_line is None:
+            start_line = line_number
+        if rest:
+            buffer.append(rest)
+
+    statement = ''.join(buffer)
+    if statement.strip():
+        yield start_line or 1, statement, terminator
+
+
+def translate_statement_stream(statements, source_dialect: str, target_dialect: str,
+                               warnings: List[Dict[str, Any]], errors: List[Dict[str, Any]],
+                               budget: ParseBudget = None):
+    """
+    Translate statements one at a time as they arrive from iter_sql_statements.
+    A statement that fails is passed through verbatim behind an error comment and
+    recorded in errors with its line number; translation continues with the next one.
+    A statement over the ParseBudget is passed through the same way, with its
+    diagnostic in warnings.
+    Yields (translated_sql, terminator).
+    """
+    source_escapes = Dialect.get_or_raise(source_dialect).tokenizer_class.STRING_ESCAPES
+    formatter = LiteralFormatter(source_dialect, target_dialect)
+    hint_mode = DB2_DIALECT in (source_dialect, target_dialect)
+    head_cache = {}
+    supervisor = StatementSupervisor(budget) if budget else None
+
+    try:
+        for index, (line_number, statement, terminator) in enumerate(statements, 1):
+            try:
+                parsed = parse_insert_values(statement, source_escapes)
+                if parsed:
+                    head, row = parsed
+                    if head not in head_cache:
+                        head_cache[head] = translate_insert_head(head, source_dialect, target_dialect)
+                    if head_cache[head]:
+                        yield translate_insert_run(head_cache[head], [row], formatter, 1)[0], terminator
+                        continue
+
+                first_warning = len(warnings)
+                if supervisor:
+                    results = translate_within_budget(supervisor, statement, source_dialect, target_dialect,
+                                                      index, warnings, line_number)
+                elif hint_mode:
+                    results = translate_with_hints(statement, source_dialect, target_dialect, index, warnings)
+                else:
+                    results = _transpile(statement, source_dialect, target_dialect)
+                for warning in warnings[first_warning:]:
+                    warning["line"] = line_number
+
+                for result in results:
+                    yield result, terminator
+            except Exception as e:
+                message = str(e).split('\n')[0]
+                errors.append({"statement": index, "line": line_number, "error": message})
+                yield f"/* Statement {index} (line {line_number}) not translated: {message.replace('*/', '* /')} */\n{statement.strip()}", terminator
+    finally:
+        if supervisor:
+            supervisor.close()
+
+
+def translate_stream(input_file: str, output_file: str, source_dialect: str, target_dialect: str,
+                     terminator: str = ";", budget: ParseBudget = None) -> Dict[str, Any]:
+    """
+    Translate a script of any size statement by statement with constant memory.
+    Output is written as each statement is translated; output_file '-' means stdout.
+    """
+    warnings = []
+    errors = []
+    count = 0
+    started = time.perf_counter()
+
+    with open(input_file, 'r', encoding='utf-8') as source:
+        output = sys.stdout if output_file == '-' else open(output_file, 'w', encoding='utf-8')
+        try:
+            statements = iter_sql_statements(source, terminator)
+            for translated_sql, statement_terminator in translate_statement_stream(statements, source_dialect, target_dialect, warnings, errors, budget):
+                output.write(f"{translated_sql}{statement_terminator}\n\n")
+                count += 1
+                if count % 1000 == 0:
+                    output.flush()
+        finally:
+            if output is not sys.stdout:
+                output.close()
+
+    return {
+        "statements": count,
+        "errors": errors,
+        "warnings": warnings,
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 3)
+    }
+
+
+def _optimizer_rules() -> Dict[str, Any]:
+    """Rewrite rules available to --optimize, in the order SQLGlot applies them."""
+    from sqlglot.optimizer.optimizer import RULES
+
+    # Rules that only annotate or re-quote the tree are not rewrites
+    skipped = {"quote_identifiers", "annotate_types", "canonicalize"}
+    return {rule.__name__: rule for rule in RULES if rule.__name__ not in skipped}
+
+
+def load_schema_from_ddl(ddl_file: str) -> Dict[str, Dict[str, str]]:
+    """Build a {table: {column: type}} schema for the optimizer from CREATE TABLE statements."""
+    from sql_to_mmd import parse_sql_to_tables
+
+    with open(ddl_file, 'r', encoding='utf-8') as f:
+        tables, _ = parse_sql_to_tables(f.read())
+    return {
+        table["name"]: {column["name"]: column["data_type"] for column in table["columns"]}
+        for table in tables
+    }
+
+
+def optimize_statement(statement, rule_names: List[str], dialect: str, schema: Dict[str, Dict[str, str]] = None):
+    """
+    Apply the named optimizer rules to one parsed statement.
+    qualify always runs first because the other rules depend on qualified columns.
+    Returns the rewritten expression and the names of the rules that changed it.
+    """
+    import inspect
+
+    rules = _optimizer_rules()
+    unknown = [name for name in rule_names if name not in rules]
+    if unknown:
+        raise ValueError(f"Unknown optimizer rule(s): {', '.join(unknown)} (available: {', '.join(rules)})")
+
+    ordered = [name for name in rules if name in rule_names or name == "qualify"]
+    settings = {
+        "dialect": dialect,
+        "schema": schema,
+        "identify": False,
+        "quote_identifiers": False,
+        "validate_qualify_columns": False
+    }
+
+    fired = []
+    expression = statement.copy()
+    for name in ordered:
+        rule = rules[name]
+        parameters = inspect.signature(rule).parameters
+        kwargs = {key: value for key, value in settings.items() if key in parameters and value is not None}
+        before = expression.sql(dialect=dialect)
+        expression = rule(expression, **kwargs)
+        if expression.sql(dialect=dialect) != before:
+            fired.append(name)
+    return expression, fired
+
+
+def optimize_sql(sql_content: str, source_dialect: str, target_dialect: str,
+                 rule_names: List[str] = None, schema: Dict[str, Dict[str, str]] = None) -> Tuple[str, List[Dict[str, Any]]]:
+    """
+    Translate SQL with semantic rewrites applied to every statement.
+    A statement whose rewrite fails is translated unchanged and the error is reported.
+    Returns the translated SQL and a per-statement report of fired rules with before/after SQL.
+    """
+    if rule_names is None:
+        rule_names = list(_optimizer_rules())
+
+    try:
+        statements = parse(sql_content, read=source_dialect)
+    except Exception as e:
+        raise Exception(f"SQL dialect translation failed: {str(e)}")
+
+    translated = []
+    report = []
+    for i, statement in enumerate(statements, 1):
+        if statement is None:
+            continue
+        entry = {
+            "statement": i,
+            "rules_fired": [],
+            "before": statement.sql(dialect=target_dialect, pretty=True),
+            "after": None,
+            "error": None
+        }
+        optimized = statement
+        if isinstance(statement, exp.Query):
+            try:
+                optimized, entry["rules_fired"] = optimize_statement(statement, rule_names, source_dialect, schema)
+            except ValueError:
+                raise
+            except Exception as e:
+                entry["error"] = str(e)
+        entry["after"] = optimized.sql(dialect=target_dialect, pretty=True)
+        translated.append(entry["after"])
+        report.append(entry)
+
+    return '\n\n'.join(translated), report
+
+
+# Dialects whose optimizers turn a row-value comparison (a, b) > (x, y) into an index seek
+ROW_VALUE_SEEK_DIALECTS = ("postgres", "sqlite")
+
+# Prefix of the parameters that carry the previous page's last key values
+KEYSET_PARAMETER_PREFIX = "last_"
+
+# Targets whose parameters are positional ($1, $2, ...); the report lists each name's position
+POSITIONAL_PARAMETER_DIALECTS = ("postgres", "redshift")
+
+
+def _keyset_parameter(name: str, dialect: str, position: int):
+    """
+    Parameter in the target dialect's style: @name for T-SQL, $n for the
+    PostgreSQL family (which has no named parameters in SQL), :name otherwise.
+    """
+    if dialect == "tsql":
+        return exp.Parameter(this=exp.var(name))
+    if dialect in POSITIONAL_PARAMETER_DIALECTS:
+        return exp.Parameter(this=exp.var(str(position)))
+    return exp.Placeholder(this=name)
+
+
+def keyset_rewrite(select, model: Dict[str, Any], dialect: str = None) -> Dict[str, Any]:
+    """
+    Rewrite one OFFSET-paged SELECT into keyset form.
+    The ORDER BY columns are extended with the primary key (or a NOT NULL unique
+    key) of the first FROM table unless they already contain one, and become the
+    seek key. Returns the first-page and next-page queries, the parameters the
+    next page binds from the previous page's last row, and notes.
+    Raises ValueError when the query cannot be keyset-paged.
+    """
+    from sql_to_mmd import table_for
+    from sql_antipatterns import from_clause
+
+    if not isinstance(select, exp.Select):
+        raise ValueError("only a plain SELECT can be keyset-paged (not a set operation)")
+    order = select.args.get("order")
+    if select.args.get("offset") is None:
+        raise ValueError("no OFFSET to replace")
+    if order is None:
+        raise ValueError("OFFSET paging without ORDER BY has no stable order to seek on")
+    source = from_clause(select)
+    driving = source.this if source is not None else None
+    if not isinstance(driving, exp.Table):
+        raise ValueError("the FROM clause must start with a table")
+    table = table_for(model, driving.name)
+    if table is None:
+        raise ValueError(f"table {driving.name} is not in the schema")
+    qualifier = driving.alias_or_name if driving.alias or select.args.get("joins") else None
+
+    def driving_column(column):
+        if column.table and column.table.lower() != driving.alias_or_name.lower():
+            return None
+        return table["columns"].get(column.name.lower())
+
+    # ORDER BY on a select-list alias seeks on the aliased column
+    aliases = {projection.alias.lower(): projection.this for projection in select.expressions
+               if isinstance(projection, exp.Alias)}
+    keys = []
+    order_by = []
+    for ordered in order.expressions:
+        node = ordered.this
+        if isinstance(node, exp.Column) and not node.table and node.name.lower() in aliases:
+            node = aliases[node.name.lower()]
+        if not isinstance(node, exp.Column):
+            raise ValueError(f"ORDER BY {ordered.this.sql(dialect=dialect)} is not a column, so there is no value to seek from")
+        keys.append((node.copy(), bool(ordered.args.get("desc"))))
+        order_by.append(ordered.copy())
+
+    notes = []
+    not_null = {name.lower() for name in table["primary_keys"]}
+    not_null.update(name for name, column in table["columns"].items() if column.get("is_not_null"))
+    unique_keys = [table["primary_keys"]] + [key for key in table["unique_keys"]
+                                             if all(name.lower() in not_null for name in key)]
+    unique_keys = [key for key in unique_keys if key]
+    ordered_names = {column["name"].lower() for column in (driving_column(node) for node, _ in keys) if column}
+    if not any({name.lower() for name in key} <= ordered_names for key in unique_keys):
+        if not unique_keys:
+            raise ValueError(f"{table['name']} has no primary key or NOT NULL unique key to break ties on")
+        tie_breakers = [name for name in unique_keys[0] if name.lower() not in ordered_names]
+        keys.extend((exp.column(name, table=qualifier), False) for name in tie_breakers)
+        # Key columns are never NULL, so they take the target's default NULL ordering
+        null_ordering = Dialect.get_or_raise(dialect).NULL_ORDERING
+        order_by.extend(exp.Ordered(this=exp.column(name, table=qualifier), desc=False,
+                                    nulls_first=null_ordering == "nulls_are_small")
+                        for name in tie_breakers)
+        notes.append(f"ORDER BY extended with {', '.join(tie_breakers)} so every row has a unique position")
+
+    for node, _ in keys:
+        column = driving_column(node)
+        if column is not None and column["name"].lower() not in not_null:
+            notes.append(f"{column['name']} is nullable: rows where it is NULL are not reached by the seek predicate")
+
+    # The last row of a page has to carry every key value
+    projections = select.expressions
+    if not any(isinstance(p, exp.Star) or (isinstance(p, exp.Column) and isinstance(p.this, exp.Star))
+               for p in projections):
+        projected = {p.name.lower() for p in projections if isinstance(p, exp.Column)}
+        projected.update(p.this.name.lower() for p in projections
+                         if isinstance(p, exp.Alias) and isinstance(p.this, exp.Column))
+        missing = [node for node, _ in keys if node.name.lower() not in projected]
+        if missing:
+            projections = projections + [node.copy() for node in missing]
+            notes.append(f"{', '.join(node.name for node in missing)} added to the select list for the next page's parameters")
+
+    parameters = []
+    used_names = set()
+    for node, desc in keys:
+        name = f"{KEYSET_PARAMETER_PREFIX}{node.name.lower()}"
+        suffix = 2
+        while name in used_names:
+            name = f"{KEYSET_PARAMETER_PREFIX}{node.name.lower()}_{suffix}"
+            suffix += 1
+        used_names.add(name)
+        parameters.append({"name": name, "column": node.sql(dialect=dialect), "descending": desc})
+        if dialect in POSITIONAL_PARAMETER_DIALECTS:
+            parameters[-1]["position"] = len(parameters)
+    values = [_keyset_parameter(parameter["name"], dialect, position)
+              for position, parameter in enumerate(parameters, 1)]
+
+    first_page = select.copy()
+    first_page.set("offset", None)
+    first_page.set("expressions", [p.copy() for p in projections])
+    first_page.set("order", exp.Order(expressions=order_by))
+
+    directions = {desc for _, desc in keys}
+    if dialect in ROW_VALUE_SEEK_DIALECTS and len(keys) > 1 and len(directions) == 1:
+        comparison = exp.LT if keys[0][1] else exp.GT
+        predicate = comparison(this=exp.Tuple(expressions=[node.copy() for node, _ in keys]),
+                               expression=exp.Tuple(expressions=[value.copy() for value in values]))
+    else:
+        # a > :a OR (a = :a AND b > :b) OR ..., with < for descending columns
+        terms = []
+        for i, (node, desc) in enumerate(keys):
+            conjuncts = [exp.EQ(this=keys[j][0].copy(), expression=values[j].copy()) for j in range(i)]
+            conjuncts.append((exp.LT if desc else exp.GT)(this=node.copy(), expression=values[i].copy()))
+            terms.append(exp.and_(*conjuncts))
+        predicate = exp.or_(*terms)
+        if len(keys) > 1:
+            # A plain bound on the leading column lets the optimizer start the index scan at the last key
+            lead, lead_desc = keys[0]
+            bound = (exp.LTE if lead_desc else exp.GTE)(this=lead.copy(), expression=values[0].copy())
+            predicate = exp.and_(bound, exp.paren(predicate))
+
+    next_page = first_page.copy().where(predicate)
+    return {"first_page": first_page, "next_page": next_page, "parameters": parameters, "notes": notes}
+
+
+def keyset_sql(sql_content: str, source_dialect: str, target_dialect: str,
+               model: Dict[str, Any]) -> Tuple[str, List[Dict[str, Any]]]:
+    """
+    Translate SQL with every OFFSET-paged SELECT rewritten into keyset form.
+    Each rewritten statement is emitted as a first-page query followed by the
+    next-page query; statements that cannot be rewritten are translated
+    unchanged with the reason in the report (same shape as optimize_sql's).
+    """
+    try:
+        statements = parse(sql_content, read=source_dialect)
+    except Exception as e:
+        raise Exception(f"SQL dialect translation failed: {str(e)}")
+
+    translated = []
+    report = []
+    for i, statement in enumerate(statements, 1):
+        if statement is None:
+            continue
+        entry = {
+            "statement": i,
+            "rules_fired": [],
+            "before": statement.sql(dialect=target_dialect, pretty=True),
+            "after": None,
+            "error": None,
+            "parameters": [],
+            "notes": []
+        }
+        if isinstance(statement, exp.Query) and statement.args.get("offset") is not None:
+            try:
+                rewrite = keyset_rewrite(statement, model, target_dialect)
+                entry["rules_fired"] = ["keyset"]
+                entry["parameters"] = rewrite["parameters"]
+                entry["notes"] = rewrite["notes"]
+                bind = ", ".join((f"${parameter['position']} = " if "position" in parameter else "") + parameter["name"]
+                                 for parameter in rewrite["parameters"])
+                entry["after"] = (
+                    ''.join(f"-- note: {note}\n" for note in rewrite["notes"]) +
+                    f"-- first page\n{rewrite['first_page'].sql(dialect=target_dialect, pretty=True)};\n"
+                    f"-- next pages: bind {bind} from the last row of the previous page\n"
+                    f"{rewrite['next_page'].sql(dialect=target_dialect, pretty=True)}"
+                )
+            except ValueError as e:
+                entry["error"] = str(e)
+        if entry["after"] is None:
+            entry["after"] = entry["before"]
+        translated.append(entry["after"])
+        report.append(entry)
+
+    return ';\n\n'.join(translated) + ';', report
+
+
+# First line of the optimize report when it is appended to the translated SQL on stdout
+OPTIMIZE_REPORT_DELIMITER = "-- ==== optimize report ===="
+
+
+def format_side_by_side(report: List[Dict[str, Any]], width: int = 60) -> str:
+    """Render the optimize report as before/after columns per statement."""
+    lines = []
+    for entry in report:
+        lines.append(f"Statement {entry['statement']} - rules fired: {', '.join(entry['rules_fired']) or 'none'}")
+        if entry["error"]:
+            lines.append(f"Optimization skipped: {entry['error']}")
+        lines.append(f"{'BEFORE'.ljust(width)} | AFTER")
+        lines.append(f"{'-' * width}-+-{'-' * width}")
+        before_lines = entry["before"].split('\n')
+        after_lines = entry["after"].split('\n')
+        for j in range(max(len(before_lines), len(after_lines))):
+            left = before_lines[j] if j < len(before_lines) else ""
+            right = after_lines[j] if j < len(after_lines) else ""
+            lines.append(f"{left[:width].ljust(width)} | {right}")
+        lines.append("=" * (width * 2 + 3))
+        lines.append("")
+    return '\n'.join(lines)
+
+
+# Bulk-load targets: data file extension and the client that runs the load script
+BULK_LOAD_TARGETS = {
+    "db2": {"extension": ".del", "script": "load.db2"},
+    "postgres": {"extension": None, "script": "load.psql"},
+    "sqlite": {"extension": ".csv", "script": "load.sqlite"}
+}
+
+# NULL marker for formats without a native NULL field (PostgreSQL COPY text, SQLite CSV staging)
+BULK_NULL_MARKER = "\\N"
+
+_DB2_TIMESTAMP_RE = re.compile(r'^(\d{4}-\d{2}-\d{2})[ T-](\d{2})[:.](\d{2})[:.](\d{2})(?:\.(\d{1,12}))?$')
+
+
+def format_db2_del_value(kind: str, value: str) -> str:
+    """Render one literal as a DB2 DEL field (empty field = NULL, strings in '"')."""
+    if kind == "null":
+        return ""
+    if kind == "string":
+        return '"' + value.replace('"', '""') + '"'
+    if kind == "bool":
+        return "1" if value == "TRUE" else "0"
+    if kind == "number":
+        if 'e' in value.lower():
+            # DEL numeric fields for DECIMAL columns must be plain digits
+            from decimal import Decimal
+            return format(Decimal(value), 'f')
+        return value.lstrip('+')
+    if kind == "typed:TIMESTAMP":
+        match = _DB2_TIMESTAMP_RE.match(value.strip())
+        if match:
+            date_part, hours, minutes, seconds, fraction = match.groups()
+            return f"{date_part}-{hours}.{minutes}.{seconds}.{(fraction or '').ljust(6, '0')}"
+    return value
+
+
+def format_copy_text_value(kind: str, value: str) -> str:
+    """Render one literal as a PostgreSQL COPY text-format field."""
+    if kind == "null":
+        return BULK_NULL_MARKER
+    if kind == "bool":
+        return "t" if value == "TRUE" else "f"
+    if kind == "string":
+        return (value.replace('\\', '\\\\').replace('\t', '\\t')
+                .replace('\n', '\\n').replace('\r', '\\r'))
+    return value.lstrip('+') if kind == "number" else value
+
+
+def format_csv_value(kind: str, value: str) -> str:
+    """Render one literal for SQLite CSV import (NULLs use the staging marker)."""
+    if kind == "null":
+        return BULK_NULL_MARKER
+    if kind == "bool":
+        return "1" if value == "TRUE" else "0"
+    return value
+
+
+def split_insert_head(head: str) -> Tuple[str, List[str]]:
+    """Split 'INSERT INTO t (a, b)' into the table and its column list."""
+    match = re.match(r'^INSERT\s+INTO\s+(.+?)\s*\((.*)\)\s*$', head, re.IGNORECASE | re.DOTALL)
+    table = match.group(1).strip()
+    columns = [col.strip() for col in match.group(2).split(',') if col.strip()]
+    return table, columns
+
+
+def extract_insert_rows(statement: str, source_dialect: str, source_escapes: List[str]):
+    """
+    Get (head, rows) for an INSERT whose VALUES are all literals.
+    Uses the regex fast path first and falls back to the SQLGlot parser, which
+    also accepts multi-row VALUES. Returns None when the statement must stay SQL.
+    """
+    parsed = parse_insert_values(statement, source_escapes)
+    if parsed:
+        return parsed[0], [parsed[1]]
+
+    try:
+        tree = parse(statement, read=source_dialect)[0]
+    except Exception:
+        return None
+    if not isinstance(tree, exp.Insert) or not isinstance(tree.expression, exp.Values):
+        return None
+    if not isinstance(tree.this, exp.Schema) or not tree.this.expressions:
+        return None
+
+    rows = []
+    for row in tree.expression.expressions:
+        values = []
+        for value in row.expressions:
+            if isinstance(value, exp.Null):
+                values.append(("null", None))
+            elif isinstance(value, exp.Boolean):
+                values.append(("bool", "TRUE" if value.this else "FALSE"))
+            elif isinstance(value, exp.Literal):
+                values.append(("string" if value.is_string else "number", value.this))
+            elif isinstance(value, exp.Neg) and isinstance(value.this, exp.Literal) and value.this.is_number:
+                values.append(("number", "-" + value.this.this))
+            elif isinstance(value, exp.Cast) and isinstance(value.this, exp.Literal) and value.this.is_string \
+                    and value.to.this in (exp.DataType.Type.DATE, exp.DataType.Type.TIMESTAMP, exp.DataType.Type.TIME):
+                values.append(("typed:" + value.to.this.value, value.this.this))
+            else:
+                return None
+        rows.append(values)
+
+    table_sql = tree.this.this.sql(dialect=source_dialect)
+    columns_sql = ', '.join(col.sql(dialect=source_dialect) for col in tree.this.expressions)
+    return canonical_insert_head(f"INSERT INTO {table_sql} ({columns_sql})"), rows
+
+
+class BulkLoadWriter:
+    """
+    Writes INSERT runs as native bulk-load artifacts plus a load script that
+    keeps every other statement in its original position.
+
+    db2:      <table>_<n>.del (DEL format) and a LOAD or IMPORT command per file
+    postgres: COPY ... FROM STDIN blocks inline in the psql script
+    sqlite:   <table>_<n>.csv, staged with .import and copied with NULLIF
+    """
+
+    def __init__(self, output_dir: str, source_dialect: str, target: str, db2_command: str = "LOAD"):
+        if target not in BULK_LOAD_TARGETS:
+            raise ValueError(f"Unsupported bulk-load target: {target} (expected one of {', '.join(BULK_LOAD_TARGETS)})")
+        self.output_dir = output_dir
+        self.source_dialect = source_dialect
+        self.target = target
+        self.sql_dialect = target
+        self.db2_command = db2_command.upper()
+        self.script = None
+        self.files = []
+        self.rows_written = 0
+        self.sql_statements = 0
+        self.head_cache = {}
+        self.file_counter = 0
+
+    def __enter__(self):
+        os.makedirs(self.output_dir, exist_ok=True)
+        script_path = os.path.join(self.output_dir, BULK_LOAD_TARGETS[self.target]["script"])
+        self.script = open(script_path, 'w', encoding='utf-8', newline='\n')
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.script.close()
+
+    def write_sql(self, statements: List[str]):
+        """Translate and append statements that stay as SQL."""
+        if not statements:
+            return
+        for stmt in _transpile(';\n'.join(statements), self.source_dialect, self.sql_dialect):
+            self.script.write(stmt + ';\n\n')
+            self.sql_statements += 1
+
+    def write_run(self, head: str, rows: List[List[Tuple[str, str]]]):
+        """Write one run of same-shape INSERT rows as a bulk-load unit."""
+        if head not in self.head_cache:
+            translated = translate_insert_head(head, self.source_dialect, self.sql_dialect)
+            self.head_cache[head] = split_insert_head(translated or head)
+        table, columns = self.head_cache[head]
+        column_list = ', '.join(columns)
+
+        if self.target == "postgres":
+            self.script.write(f"COPY {table} ({column_list}) FROM STDIN;\n")
+            for row in rows:
+                self.script.write('\t'.join(format_copy_text_value(kind, value) for kind, value in row) + '\n')
+            self.script.write("\\.\n\n")
+        else:
+            self.file_counter += 1
+            base_name = re.sub(r'[^\w.]+', '_', table).strip('_') or "table"
+            file_name = f"{base_name}_{self.file_counter:03d}{BULK_LOAD_TARGETS[self.target]['extension']}"
+            data_path = os.path.join(self.output_dir, file_name)
+            if self.target == "db2":
+                self._write_db2(data_path, file_name, table, column_list, rows)
+            else:
+                self._write_sqlite(data_path, file_name, table, columns, rows)
+            self.files.append(data_path)
+
+        self.rows_written += len(rows)
+
+    def _write_db2(self, data_path: str, file_name: str, table: str, column_list: str, rows):
+        with open(data_path, 'w', encoding='utf-8', newline='\n') as f:
+            for row in rows:
+                f.write(','.join(format_db2_del_value(kind, value) for kind, value in row) + '\n')
+        # DELPRIORITYCHAR lets string fields contain embedded newlines
+        modifiers = "MODIFIED BY CODEPAGE=1208 DELPRIORITYCHAR"
+        if self.db2_command == "IMPORT":
+            self.script.write(f"IMPORT FROM '{file_name}' OF DEL {modifiers} COMMITCOUNT AUTOMATIC "
+                              f"INSERT INTO {table} ({column_list});\n\n")
+        else:
+            self.script.write(f"LOAD FROM '{file_name}' OF DEL {modifiers} "
+                              f"INSERT INTO {table} ({column_list}) NONRECOVERABLE;\n\n")
+
+    def _write_sqlite(self, data_path: str, file_name: str, table: str, columns: List[str], rows):
+        import csv
+
+        header = [col.strip('"`[]') for col in columns]
+        with open(data_path, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.writer(f, lineterminator='\n')
+            writer.writerow(header)
+            for row in rows:
+                writer.writerow([format_csv_value(kind, value) for kind, value in row])
+        # .import creates the staging table from the header row; every column arrives as TEXT
+        staging = f"_bulk_{os.path.splitext(file_name)[0]}"
+        select_list = ', '.join(f"NULLIF(\"{col}\", '{BULK_NULL_MARKER}')" for col in header)
+        self.script.write(f".import --csv '{file_name}' {staging}\n")
+        self.script.write(f"INSERT INTO {table} ({', '.join(columns)}) SELECT {select_list} FROM {staging};\n")
+        self.script.write(f"DROP TABLE {staging};\n\n")
+
+
+def convert_to_bulk_load(sql_content: str, source_dialect: str, target: str, output_dir: str,
+                         db2_command: str = "LOAD") -> Dict[str, Any]:
+    """
+    Convert an INSERT-based data script into native bulk-load artifacts.
+    Consecutive literal INSERTs into the same table and columns become one load
+    unit; all other statements are translated and kept in order in the load script.
+    """
+    try:
+        source_escapes = Dialect.get_or_raise(source_dialect).tokenizer_class.STRING_ESCAPES
+        with BulkLoadWriter(output_dir, source_dialect, target, db2_command) as writer:
+            pending = []
+            run_head = None
+            run_rows = []
+
+            for statement in split_sql_statements(sql_content):
+                extracted = extract_insert_rows(statement, source_dialect, source_escapes)
+                if extracted is None:
+                    if run_head is not None:
+                        writer.write_run(run_head, run_rows)
+                        run_head, run_rows = None, []
+                    pending.append(statement)
+                    continue
+
+                head, rows = extracted
+                if head != run_head:
+                    if run_head is not None:
+                        writer.write_run(run_head, run_rows)
+                    writer.write_sql(pending)
+                    pending = []
+                    run_head, run_rows = head, []
+                run_rows.extend(rows)
+
+            if run_head is not None:
+                writer.write_run(run_head, run_rows)
+            writer.write_sql(pending)
+
+            return {
+                "target": target,
+                "script": writer.script.name,
+                "data_files": writer.files,
+                "rows": writer.rows_written,
+                "sql_statements": writer.sql_statements
+            }
+    except Exception as e:
+        raise Exception(f"Bulk-load conversion failed: {str(e)}")
+
+
+def split_cli_args(argv: List[str]) -> Tuple[List[str], Dict[str, str]]:
+    """
+    Split command line arguments into positional arguments and --options.
+    Options are given as --name or --name=value; bare flags map to "true".
+    """
+    positional = []
+    options = {}
+    for arg in argv:
+        if arg.startswith('--') and len(arg) > 2:
+            name, _, value = arg[2:].partition('=')
+            options[name] = value if value else "true"
+        else:
+            positional.append(arg)
+    return positional, options
+
+
+def collect_batch_inputs(input_path: str, pattern: str = "*.sql") -> Tuple[str, List[str]]:
+    """
+    Collect the SQL files for a batch run.
+    input_path is either a directory (searched recursively with pattern) or a
+    manifest file listing one path per line (relative paths are resolved
+    against the manifest's directory, blank lines and # comments are skipped).
+    Returns the root used for mirroring output paths and the sorted file list.
+    """
+    import fnmatch
+
+    if os.path.isdir(input_path):
+        root = os.path.abspath(input_path)
+        files = []
+        for dir_path, dir_names, file_names in os.walk(root):
+            dir_names.sort()
+            for file_name in file_names:
+                if fnmatch.fnmatch(file_name.lower(), pattern.lower()):
+                    files.append(os.path.join(dir_path, file_name))
+        return root, sorted(files)
+
+    root = os.path.dirname(os.path.abspath(input_path))
+    files = []
+    with open(input_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            entry = line.strip()
+            if not entry or entry.startswith('#'):
+                continue
+            if not os.path.isabs(entry):
+                entry = os.path.join(root, entry)
+            files.append(os.path.abspath(entry))
+    return root, files
+
+
+def translate_file(task: Tuple[str, str, str, str, str, Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Translate a single file for batch mode and write it to its mirrored output path.
+    Runs inside a worker process; never raises, so one bad file cannot stop the batch.
+    """
+    sql_file, root, output_root, source_dialect, target_dialect, translate_options = task
+    relative_path = os.path.relpath(sql_file, root)
+    output_file = os.path.join(output_root, relative_path)
+    started = time.perf_counter()
+    result = {
+        "file": relative_path,
+        "output": output_file,
+        "status": "ok",
+        "error": None
+    }
+
+    try:
+        with open(sql_file, 'r', encoding='utf-8') as f:
+            sql_content = f.read()
+
+        warnings = []
+        translated_sql = translate_sql(sql_content, source_dialect, target_dialect, warnings=warnings, **translate_options)
+
+        os.makedirs(os.path.dirname(output_file) or '.', exist_ok=True)
+        with open(output_file, 'w', encoding='utf-8') as f:
+            f.write(translated_sql)
+            f.write('\n')
+
+        result["input_bytes"] = os.path.getsize(sql_file)
+        result["output_bytes"] = os.path.getsize(output_file)
+        result["warnings"] = warnings
+    except Exception as e:
+        result["status"] = "error"
+        result["error"] = str(e)
+
+    result["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 3)
+    return result
+
+
+def translate_files(tasks: List[Tuple[str, str, str, str, str, Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """Translate a chunk of batch tasks in one worker call."""
+    return [translate_file(task) for task in tasks]
+
+
+def crashed_file_result(task: Tuple[str, str, str, str, str, Dict[str, Any]]) -> Dict[str, Any]:
+    """Summary entry for a file whose worker process died while translating it."""
+    sql_file, root, output_root = task[:3]
+    relative_path = os.path.relpath(sql_file, root)
+    return {
+        "file": relative_path,
+        "output": os.path.join(output_root, relative_path),
+        "status": "error",
+        "error": "Worker process crashed while translating this file",
+        "elapsed_ms": None
+    }
+
+
+def translate_batch(input_path: str, output_root: str, source_dialect: str, target_dialect: str,
+                    workers: int = 0, summary_file: str = None, pattern: str = "*.sql",
+                    translate_options: Dict[str, Any] = None) -> Dict[str, Any]:
+    """
+    Translate every file in a directory or manifest across a process pool.
+    Output files mirror the input tree under output_root. One JSON line per file
+    (status and timing) is written to summary_file as results arrive.
+
+    A worker that crashes (segfault, out-of-memory kill) breaks the pool and
+    every chunk still in it. The pool is recreated and those files are retried
+    one per task; a file caught in a crash twice is translated alone in its own
+    worker, so a crash there is its own and it is recorded as failed.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+    from concurrent.futures.process import BrokenProcessPool
+
+    root, files = collect_batch_inputs(input_path, pattern)
+    output_root = os.path.abspath(output_root)
+    if summary_file is None:
+        summary_file = os.path.join(output_root, "translation_summary.jsonl")
+
+    workers = workers if workers and workers > 0 else (os.cpu_count() or 1)
+    workers = min(workers, max(1, len(files)))
+    translate_options = translate_options or {}
+    tasks = [(sql_file, root, output_root, source_dialect, target_dialect, translate_options) for sql_file in files]
+
+    started = time.perf_counter()
+    succeeded = 0
+    failed = 0
+
+    os.makedirs(output_root, exist_ok=True)
+    os.makedirs(os.path.dirname(os.path.abspath(summary_file)), exist_ok=True)
+    with open(summary_file, 'w', encoding='utf-8') as summary:
+        def record(result: Dict[str, Any]):
+            nonlocal succeeded, failed
+            if result["status"] == "ok":
+                succeeded += 1
+            else:
+                failed += 1
+            summary.write(json.dumps(result) + '\n')
+
+        # Small files dominate typical script trees; chunking keeps IPC overhead low
+        chunk_size = max(1, len(tasks) // (workers * 8))
+        chunks = [list(range(i, min(i + chunk_size, len(tasks)))) for i in range(0, len(tasks), chunk_size)]
+        crashes = [0] * len(tasks)
+        while chunks:
+            retry = []
+            shared = []
+            for chunk in chunks:
+                if len(chunk) == 1 and crashes[chunk[0]] >= 2:
+                    # Alone in its own worker: a crash now is this file's
+                    with ProcessPoolExecutor(max_workers=1) as pool:
+                        try:
+                            record(pool.submit(translate_file, tasks[chunk[0]]).result())
+                        except BrokenProcessPool:
+                            record(crashed_file_result(tasks[chunk[0]]))
+                else:
+                    shared.append(chunk)
+            if shared:
+                with ProcessPoolExecutor(max_workers=workers) as pool:
+                    futures = [(chunk, pool.submit(translate_files, [tasks[i] for i in chunk])) for chunk in shared]
+                    for chunk, future in futures:
+                        try:
+                            for result in future.result():
+                                record(result)
+                        except BrokenProcessPool:
+                            for i in chunk:
+                                crashes[i] += 1
+                                retry.append([i])
+            chunks = retry
+
+    return {
+        "files": len(files),
+        "succeeded": succeeded,
+        "failed": failed,
+        "workers": workers,
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 3),
+        "summary_file": os.path.abspath(summary_file)
+    }
+
+
+def translate_options_from_cli(options: Dict[str, str]) -> Dict[str, Any]:
+    """Map command line --options to translate_sql keyword arguments."""
+    return {
+        "fast_inserts": "no-fast-inserts" not in options,
+        "fold_inserts": int(options.get("fold-inserts", "1")),
+        "budget": ParseBudget.from_cli(options)
+    }
+
+
+def batch_main(positional: List[str], options: Dict[str, str]):
+    """Entry point for --batch mode."""
+    if len(positional) < 4:
+        print(json.dumps({"error": "Usage: sql_dialect_translate.py --batch <input_dir_or_manifest> <output_dir> <source_dialect> <target_dialect> [--workers=N] [--summary=file.jsonl] [--pattern=*.sql]"}), file=sys.stderr)
+        sys.exit(1)
+
+    input_path = positional[0]
+    output_root = positional[1]
+    source_dialect = positional[2] if positional[2] else None
+    target_dialect = positional[3] if positional[3] else None
+
+    if not os.path.exists(input_path):
+        print(json.dumps({"error": f"File not found: {input_path}"}), file=sys.stderr)
+        sys.exit(1)
+
+    try:
+        report = translate_batch(
+            input_path,
+            output_root,
+            source_dialect,
+            target_dialect,
+            workers=int(options.get("workers", "0")),
+            summary_file=options.get("summary"),
+            pattern=options.get("pattern", "*.sql"),
+            translate_options=translate_options_from_cli(options)
+        )
+    except Exception as e:
+        print(json.dumps({"error": str(e)}), file=sys.stderr)
+        sys.exit(1)
+
+    print(json.dumps(report))
+    if report["failed"]:
+        sys.exit(2)
+
+
+def stream_main(positional: List[str], options: Dict[str, str]):
+    """Entry point for --stream mode."""
+    if len(positional) < 4:
+        print(json.dumps({"error": "Usage: sql_dialect_translate.py --stream <sql_file> <source_dialect> <target_dialect> <output_file|-> [--terminator=;] [--statement-timeout=S] [--max-tokens=N] [--max-depth=N]"}), file=sys.stderr)
+        sys.exit(1)
+
+    sql_file = positional[0]
+    source_dialect = positional[1] if positional[1] else None
+    target_dialect = positional[2] if positional[2] else None
+    output_file = positional[3]
+
+    try:
+        report = translate_stream(sql_file, output_file, source_dialect, target_dialect,
+                                  terminator=options.get("terminator", ";"), budget=ParseBudget.from_cli(options))
+    except FileNotFoundError:
+        print(json.dumps({"error": f"File not found: {sql_file}"}), file=sys.stderr)
+        sys.exit(1)
+    except Exception as e:
+        print(json.dumps({"error": str(e)}), file=sys.stderr)
+        sys.exit(1)
+
+    # Keep stdout clean when it carries the translated SQL
+    print(json.dumps(report), file=sys.stderr if output_file == '-' else sys.stdout)
+    if report["errors"]:
+        sys.exit(2)
+
+
+def bulk_load_main(positional: List[str], options: Dict[str, str]):
+    """Entry point for --bulk-load mode."""
+    if len(positional) < 4:
+        print(json.dumps({"error": "Usage: sql_dialect_translate.py --bulk-load <sql_file> <source_dialect> <db2|postgres|sqlite> <output_dir> [--db2-command=LOAD|IMPORT]"}), file=sys.stderr)
+        sys.exit(1)
+
+    sql_file = positional[0]
+    source_dialect = positional[1] if positional[1] else None
+
+    try:
+        with open(sql_file, 'r', encoding='utf-8') as f:
+            sql_content = f.read()
+
+        report = convert_to_bulk_load(
+            sql_content,
+            source_dialect,
+            positional[2].lower(),
+            positional[3],
+            db2_command=options.get("db2-command", "LOAD")
+        )
+        print(json.dumps(report))
+    except FileNotFoundError:
+        print(json.dumps({"error": f"File not found: {sql_file}"}), file=sys.stderr)
+        sys.exit(1)
+    except Exception as e:
+        print(json.dumps({"error": str(e)}), file=sys.stderr)
+        sys.exit(1)
 
 
 def main():
     """Main entry point for the script."""
-    if len(sys.argv) < 4:
-        print(json.dumps({"error": "Usage: sql_dialect_translate.py <sql_file> <source_dialect> <target_dialect> [ast_output_file]"}), file=sys.stderr)
+    positional, options = split_cli_args(sys.argv[1:])
+    if "batch" in options:
+        batch_main(positional, options)
+        return
+    if "bulk-load" in options:
+        bulk_load_main(positional, options)
+        return
+    if "stream" in options:
+        stream_main(positional, options)
+        return
+
+    if len(positional) < 3:
+        print(json.dumps({"error": "Usage: sql_dialect_translate.py <sql_file> <source_dialect> <target_dialect> [ast_output_file] [--fold-inserts=N] [--no-fast-inserts] [--optimize [--rules=a,b] [--schema=ddl.sql] [--optimize-report=file]] [--keyset --schema=ddl_or_mmd [--keyset-report=file]] [--statement-timeout=S] [--max-tokens=N] [--max-depth=N]\n       sql_dialect_translate.py --batch <input_dir_or_manifest> <output_dir> <source_dialect> <target_dialect> [--workers=N]"}), file=sys.stderr)
         sys.exit(1)
     
-    sql_file = sys.argv[1]
-    source_dialect = sys.argv[2] if sys.argv[2] else None  # Empty string becomes None for SQLGlot
-    target_dialect = sys.argv[3] if sys.argv[3] else None  # Empty string becomes None for SQLGlot
-    ast_output_file = sys.argv[4] if len(sys.argv) > 4 else None
+    sql_file = positional[0]
+    source_dialect = positional[1] if positional[1] else None  # Empty string becomes None for SQLGlot
+    target_dialect = positional[2] if positional[2] else None  # Empty string becomes None for SQLGlot
+    ast_output_file = positional[3] if len(positional) > 3 else None
     
     try:
         # Read SQL file
@@ -98,7 +1718,45 @@ def main():
                     f.write(f"AST Export Error: {str(e)}\n")
         
         # Translate SQL
-        translated_sql = translate_sql(sql_content, source_dialect, target_dialect)
+        if "optimize" in options:
+            rule_names = options["rules"].split(',') if options.get("rules") else None
+            schema = load_schema_from_ddl(options["schema"]) if options.get("schema") else None
+            translated_sql, report = optimize_sql(sql_content, source_dialect, target_dialect, rule_names, schema)
+
+            report_file = options.get("optimize-report")
+            if report_file:
+                with open(report_file, 'w', encoding='utf-8') as f:
+                    if report_file.lower().endswith('.json'):
+                        json.dump(report, f, indent=2)
+                    else:
+                        f.write(format_side_by_side(report))
+            else:
+                # After the SQL as comments, so stdout stays runnable and stderr carries only JSON
+                translated_sql += "\n\n" + OPTIMIZE_REPORT_DELIMITER + "\n" + '\n'.join(
+                    f"-- {line}".rstrip() for line in format_side_by_side(report).split('\n'))
+        elif "keyset" in options:
+            if not options.get("schema"):
+                raise ValueError("--keyset needs --schema=<ddl_or_mmd> for the primary and unique keys")
+            from sql_to_mmd import load_schema_model
+
+            translated_sql, report = keyset_sql(sql_content, source_dialect, target_dialect,
+                                                load_schema_model(options["schema"]))
+
+            report_file = options.get("keyset-report")
+            if report_file:
+                with open(report_file, 'w', encoding='utf-8') as f:
+                    if report_file.lower().endswith('.json'):
+                        json.dump(report, f, indent=2)
+                    else:
+                        f.write(format_side_by_side(report))
+            for entry in report:
+                if entry["error"]:
+                    print(json.dumps({"warning": f"statement {entry['statement']}: {entry['error']}"}), file=sys.stderr)
+        else:
+            warnings = []
+            translated_sql = translate_sql(sql_content, source_dialect, target_dialect, warnings=warnings, **translate_options_from_cli(options))
+            for warning in warnings:
+                print(json.dumps({"warning": warning}), file=sys.stderr)
         
         # Output result
         print(translated_sql)
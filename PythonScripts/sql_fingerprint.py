@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+"""
+Query fingerprinting and workload aggregation using SQLGlot.
+This script reads a query log, reduces every statement to a canonical
+fingerprint (literals and IN-lists replaced by placeholders, whitespace and
+identifier case normalized) and reports the heaviest query shapes.
+"""
+
+import sys
+import os
+import re
+import csv
+import json
+import hashlib
+from collections import OrderedDict
+from typing import List, Dict, Any, Tuple
+
+try:
+    import sqlglot
+    from sqlglot import parse_one, exp
+    from sqlglot.optimizer.normalize_identifiers import normalize_identifiers
+except ImportError:
+    print(json.dumps({"error": "SQLGlot not installed. Please install with: pip install sqlglot"}), file=sys.stderr)
+    sys.exit(1)
+
+from sql_dialect_translate import iter_sql_statements, split_cli_args
+
+
+# Column names recognised in CSV/JSONL query logs (DB2 MON_GET_PKG_CACHE_STMT and common exports)
+SQL_FIELDS = ["STMT_TEXT", "SQL", "SQL_TEXT", "QUERY", "STATEMENT", "STMT"]
+DURATION_FIELDS = ["TOTAL_ACT_TIME", "DURATION_MS", "ELAPSED_MS", "DURATION", "ELAPSED", "TIME_MS"]
+COUNT_FIELDS = ["NUM_EXECUTIONS", "EXECUTIONS", "NUM_EXEC", "COUNT", "CALLS"]
+
+# Cheap pre-normalization used as the parse cache key
+_PRE_NORMALIZE_RES = [
+    (re.compile(r"'(?:[^']|'')*'"), "?"),
+    (re.compile(r"(?<![\w$#@])[-+]?\d+(?:\.\d*)?(?:[eE][-+]?\d+)?"), "?"),
+    # Only IN-lists collapse, as in fingerprint_statement; VALUES rows keep their arity
+    (re.compile(r"\b(IN\s*)\(\s*\?(?:\s*,\s*\?)*\s*\)", re.IGNORECASE), r"\1(?)"),
+    (re.compile(r"\s+"), " "),
+]
+
+# Quoted identifiers keep their case; everything else is upper-cased
+_QUOTED_IDENTIFIER_RE = re.compile(r'("(?:[^"]|"")*")')
+
+# Upper bound on cached raw-shape -> fingerprint entries
+PARSE_CACHE_SIZE = 50000
+
+# Upper bound on distinct fingerprints kept while aggregating
+MAX_FINGERPRINTS = 100000
+
+
+def pre_normalize(sql: str) -> str:
+    """Regex-only normalization; also the fallback fingerprint for unparseable statements."""
+    text = sql.strip().rstrip(';')
+    for pattern, replacement in _PRE_NORMALIZE_RES:
+        text = pattern.sub(replacement, text)
+    parts = _QUOTED_IDENTIFIER_RE.split(text.strip())
+    return ''.join(part if i % 2 else part.upper() for i, part in enumerate(parts))
+
+
+def fingerprint_statement(sql: str, dialect: str = None) -> Tuple[str, List[str]]:
+    """
+    Build the canonical fingerprint for one statement.
+    Returns the fingerprint text and the tables it touches.
+    """
+    try:
+        tree = parse_one(sql, read=dialect)
+    except Exception:
+        return pre_normalize(sql), []
+    if tree is None:
+        return pre_normalize(sql), []
+
+    tree = normalize_identifiers(tree, dialect=dialect)
+
+    # IN-lists of any length collapse to a single placeholder
+    for in_expr in list(tree.find_all(exp.In)):
+        values = in_expr.expressions
+        if values and all(isinstance(value, (exp.Literal, exp.Null, exp.Placeholder, exp.Neg)) for value in values):
+            in_expr.set("expressions", [exp.Placeholder()])
+
+    def replace_literal(node):
+        if isinstance(node, exp.Neg) and isinstance(node.this, exp.Literal):
+            return exp.Placeholder()
+        if isinstance(node, exp.Literal):
+            return exp.Placeholder()
+        return node
+
+    tree = tree.transform(replace_literal)
+
+    cte_names = {cte.alias_or_name.lower() for cte in tree.find_all(exp.CTE)}
+    tables = sorted({
+        ".".join(part for part in (table.db, table.name) if part)
+        for table in tree.find_all(exp.Table)
+        if table.name and table.name.lower() not in cte_names
+    })
+    return tree.sql(dialect=dialect), tables
+
+
+def fingerprint_id(fingerprint: str) -> str:
+    """Short stable id for a fingerprint."""
+    return hashlib.sha1(fingerprint.encode('utf-8')).hexdigest()[:16]
+
+
+def _pick_field(record: Dict[str, Any], candidates: List[str]):
+    """Case-insensitive lookup of the first matching field."""
+    for key, value in record.items():
+        if key and key.strip().upper() in candidates and value not in (None, ""):
+            return value
+    return None
+
+
+def _to_float(value, default: float) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def iter_log_records(log_file: str, counts: Dict[str, int] = None):
+    """
+    Stream (sql, executions, total_duration_ms) records from a query log.
+    .jsonl/.ndjson and .csv/.tsv logs use the SQL/duration/count fields above
+    (duration is the total for the record); .sql files are split into statements;
+    any other file is read as one statement per line.
+    Truncated or malformed JSON lines are skipped and counted in
+    counts["malformed_records"].
+    """
+    if counts is None:
+        counts = {}
+    counts.setdefault("malformed_records", 0)
+    extension = os.path.splitext(log_file)[1].lower()
+    with open(log_file, 'r', encoding='utf-8-sig', newline='' if extension in ('.csv', '.tsv') else None) as f:
+        if extension in ('.jsonl', '.ndjson'):
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    record = None
+                if not isinstance(record, dict):
+                    counts["malformed_records"] += 1
+                    continue
+                sql = _pick_field(record, SQL_FIELDS)
+                if sql:
+                    yield (sql, _to_float(_pick_field(record, COUNT_FIELDS), 1.0),
+                           _to_float(_pick_field(record, DURATION_FIELDS), 0.0))
+        elif extension in ('.csv', '.tsv'):
+            reader = csv.DictReader(f, delimiter='\t' if extension == '.tsv' else ',')
+            for record in reader:
+                sql = _pick_field(record, SQL_FIELDS)
+                if sql:
+                    yield (sql, _to_float(_pick_field(record, COUNT_FIELDS), 1.0),
+                           _to_float(_pick_field(record, DURATION_FIELDS), 0.0))
+        elif extension == '.sql':
+            for _, statement, _ in iter_sql_statements(f):
+                yield statement, 1.0, 0.0
+        else:
+            for line in f:
+                if line.strip():
+                    yield line, 1.0, 0.0
+
+
+class WorkloadAggregator:
+    """
+    Aggregates executions and durations per fingerprint with bounded memory.
+    Parsed shapes are cached by their regex pre-normalization, so repeated
+    statements cost a regex pass instead of a parse. When the number of distinct
+    fingerprints exceeds max_fingerprints, the lighter half is evicted (counted
+    in 'evicted'), so very long tails are approximate.
+    """
+
+    def __init__(self, dialect: str = None, max_fingerprints: int = MAX_FINGERPRINTS,
+                 cache_size: int = PARSE_CACHE_SIZE):
+        self.dialect = dialect
+        self.max_fingerprints = max_fingerprints
+        self.cache_size = cache_size
+        self.cache = OrderedDict()
+        self.stats = {}
+        self.records = 0
+        self.evicted = 0
+
+    def add(self, sql: str, executions: float = 1.0, total_ms: float = 0.0):
+        self.records += 1
+        key = pre_normalize(sql)
+        cached = self.cache.get(key)
+        if cached is None:
+            fingerprint, tables = fingerprint_statement(sql, self.dialect)
+            cached = (fingerprint_id(fingerprint), fingerprint, tables)
+            self.cache[key] = cached
+            if len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+        else:
+            self.cache.move_to_end(key)
+
+        fp_id, fingerprint, tables = cached
+        entry = self.stats.get(fp_id)
+        if entry is None:
+            entry = {
+                "fingerprint_id": fp_id,
+                "fingerprint": fingerprint,
+                "executions": 0.0,
+                "total_ms": 0.0,
+                "max_ms": 0.0,
+                "tables": tables,
+                "sample": ' '.join(sql.split())[:500]
+            }
+            # Evict before inserting, so the new entry (still at zero) survives
+            if len(self.stats) >= self.max_fingerprints:
+                self._evict()
+            self.stats[fp_id] = entry
+
+        entry["executions"] += executions
+        entry["total_ms"] += total_ms
+        per_execution = total_ms / executions if executions else total_ms
+        if per_execution > entry["max_ms"]:
+            entry["max_ms"] = per_execution
+
+    def _evict(self):
+        ranked = sorted(self.stats.values(), key=lambda e: (e["total_ms"], e["executions"]), reverse=True)
+        keep = ranked[:self.max_fingerprints // 2]
+        self.evicted += len(ranked) - len(keep)
+        self.stats = {entry["fingerprint_id"]: entry for entry in keep}
+
+    def top(self, n: int = 20, sort: str = "total") -> List[Dict[str, Any]]:
+        """Return the n heaviest fingerprints sorted by total time, executions or mean time."""
+        results = []
+        for entry in self.stats.values():
+            result = dict(entry)
+            result["mean_ms"] = result["total_ms"] / result["executions"] if result["executions"] else 0.0
+            results.append(result)
+
+        sort_keys = {
+            "total": lambda e: (e["total_ms"], e["executions"]),
+            "count": lambda e: (e["executions"], e["total_ms"]),
+            "mean": lambda e: (e["mean_ms"], e["executions"])
+        }
+        if sort not in sort_keys:
+            raise ValueError(f"Unknown sort key: {sort} (expected total, count or mean)")
+        results.sort(key=sort_keys[sort], reverse=True)
+
+        grand_total = sum(e["total_ms"] for e in results) or 1.0
+        for rank, result in enumerate(results[:n], 1):
+            result["rank"] = rank
+            result["pct_total_time"] = round(100.0 * result["total_ms"] / grand_total, 2)
+            for field in ("executions", "total_ms", "mean_ms", "max_ms"):
+                result[field] = round(result[field], 3)
+        return results[:n]
+
+
+def write_report(results: List[Dict[str, Any]], output, output_format: str, summary: Dict[str, Any]):
+    """Write the top fingerprints as JSON (with summary) or CSV."""
+    if output_format == "csv":
+        fields = ["rank", "fingerprint_id", "executions", "total_ms", "mean_ms", "max_ms",
+                  "pct_total_time", "tables", "fingerprint", "sample"]
+        writer = csv.DictWriter(output, fieldnames=fields, extrasaction='ignore', lineterminator='\n')
+        writer.writeheader()
+        for result in results:
+            row = dict(result)
+            row["tables"] = ' '.join(result["tables"])
+            writer.writerow(row)
+    else:
+        json.dump({"summary": summary, "fingerprints": results}, output, indent=2)
+        output.write('\n')
+
+
+def main():
+    """Main entry point for the script."""
+    positional, options = split_cli_args(sys.argv[1:])
+    if len(positional) < 1:
+        print(json.dumps({"error": "Usage: sql_fingerprint.py <log_file> [dialect] [--top=N] [--sort=total|count|mean] [--format=json|csv] [--output=file]"}), file=sys.stderr)
+        sys.exit(1)
+
+    log_file = positional[0]
+    dialect = positional[1] if len(positional) > 1 and positional[1] else None
+    output_format = options.get("format", "json").lower()
+    output_file = options.get("output")
+
+    try:
+        aggregator = WorkloadAggregator(dialect)
+        counts = {}
+        for sql, executions, total_ms in iter_log_records(log_file, counts):
+            aggregator.add(sql, executions, total_ms)
+
+        results = aggregator.top(int(options.get("top", "20")), options.get("sort", "total"))
+        summary = {
+            "records": aggregator.records,
+            "fingerprints": len(aggregator.stats),
+            "evicted": aggregator.evicted,
+            "malformed_records": counts["malformed_records"]
+        }
+
+        if output_file:
+            with open(output_file, 'w', encoding='utf-8', newline='') as f:
+                write_report(results, f, output_format, summary)
+        else:
+            write_report(results, sys.stdout, output_format, summary)
+
+    except FileNotFoundError:
+        print(json.dumps({"error": f"File not found: {log_file}"}), file=sys.stderr)
+        sys.exit(1)
+    except Exception as e:
+        print(json.dumps({"error": str(e)}), file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,434 @@
+#!/usr/bin/env python3
+"""
+Workload-driven composite index advisor using SQLGlot.
+This script reads a schema (DDL or Mermaid ERD) and a query workload, extracts
+the filter, join, GROUP BY and ORDER BY columns each query uses per table, and
+recommends composite indexes as CREATE INDEX DDL ranked by an estimated benefit.
+Candidates already provided by the prefix of an existing index are left out.
+"""
+
+import sys
+import json
+import hashlib
+from typing import List, Dict, Any, Tuple
+
+try:
+    import sqlglot
+    from sqlglot import parse_one, exp
+except ImportError:
+    print(json.dumps({"error": "SQLGlot not installed. Please install with: pip install sqlglot"}), file=sys.stderr)
+    sys.exit(1)
+
+from sql_to_mmd import load_schema_model
+from sql_antipatterns import SelectScope, from_clause, walk_scope
+from sql_fingerprint import iter_log_records, pre_normalize
+from sql_dialect_translate import split_cli_args
+
+
+# Widest index the advisor will propose (key plus covering columns)
+MAX_INDEX_COLUMNS = 6
+
+# DB2 identifier length limit for index names
+MAX_INDEX_NAME_LENGTH = 128
+
+# Benefit weights per column role, multiplied by the query weight
+EQUALITY_WEIGHT = 4.0
+JOIN_WEIGHT = 3.0
+RANGE_WEIGHT = 2.0
+SORT_WEIGHT = 2.0
+COVERING_WEIGHT = 1.5
+
+
+class TableAccess:
+    """Columns one query uses on one table, grouped by role."""
+
+    def __init__(self, table: Dict[str, Any]):
+        self.table = table
+        self.equality = []
+        self.joins = []
+        self.ranges = []
+        self.group_by = []
+        self.order_by = []
+        self.referenced = set()
+
+    @staticmethod
+    def _add(target: list, column: str):
+        if column not in target:
+            target.append(column)
+
+
+def _column_owner(scope: SelectScope, column: exp.Column) -> Tuple[str, Dict[str, Any]]:
+    alias, table = scope.resolve(column)
+    if table is None or column.name.lower() not in table["columns"]:
+        return None, None
+    return alias, table
+
+
+def _is_value(node) -> bool:
+    """Literal, parameter or other expression that does not reference a column."""
+    if node is None:
+        return False
+    if isinstance(node, (exp.Subquery, exp.Select)):
+        return True
+    return not any(isinstance(child, exp.Column) for child in walk_scope(node))
+
+
+def _conjuncts(condition) -> List[exp.Expression]:
+    """Top-level AND terms of a condition (OR branches are not index-driving)."""
+    if condition is None:
+        return []
+    condition = condition.unnest()
+    if isinstance(condition, exp.And):
+        return [term.unnest() for term in condition.flatten()]
+    return [condition]
+
+
+def collect_accesses(select: exp.Select, model: Dict[str, Any]) -> Dict[str, TableAccess]:
+    """Extract per-alias column roles from one SELECT."""
+    scope = SelectScope(select, model)
+    accesses = {alias: TableAccess(table) for alias, table in scope.sources.items() if table is not None}
+    if not accesses:
+        return accesses
+
+    def access_for(column):
+        alias, table = _column_owner(scope, column)
+        return (accesses.get(alias), table["columns"][column.name.lower()]["name"]) if table else (None, None)
+
+    for column in walk_scope(select):
+        if isinstance(column, exp.Column):
+            access, name = access_for(column)
+            if access is not None:
+                access.referenced.add(name)
+    for projection in select.expressions:
+        if isinstance(projection, exp.Star):
+            for access in accesses.values():
+                access.referenced.update(access.table["column_order"])
+        elif isinstance(projection, exp.Column) and isinstance(projection.this, exp.Star):
+            access = accesses.get(projection.table.lower())
+            if access is not None:
+                access.referenced.update(access.table["column_order"])
+
+    conditions = []
+    where = select.args.get("where")
+    if where is not None:
+        conditions.extend(_conjuncts(where.this))
+    for join in select.args.get("joins") or []:
+        conditions.extend(_conjuncts(join.args.get("on")))
+
+    for term in conditions:
+        if isinstance(term, exp.EQ) and all(isinstance(side, exp.Column) for side in (term.this, term.expression)):
+            owners = [access_for(side) for side in (term.this, term.expression)]
+            if owners[0][0] is not None and owners[0][0] is owners[1][0]:
+                continue
+            for access, name in owners:
+                if access is not None:
+                    TableAccess._add(access.joins, name)
+            continue
+
+        column = term.this if isinstance(term.this, exp.Column) else None
+        other = term.args.get("expression")
+        if column is None and isinstance(term, (exp.EQ, exp.GT, exp.GTE, exp.LT, exp.LTE)) \
+                and isinstance(term.expression, exp.Column):
+            column, other = term.expression, term.this
+        if column is None:
+            continue
+        access, name = access_for(column)
+        if access is None:
+            continue
+
+        if isinstance(term, exp.EQ) and _is_value(other):
+            TableAccess._add(access.equality, name)
+        elif isinstance(term, exp.Is) or (isinstance(term, exp.In) and not term.args.get("query") and
+                                          all(_is_value(value) for value in term.expressions)):
+            TableAccess._add(access.equality, name)
+        elif isinstance(term, (exp.GT, exp.GTE, exp.LT, exp.LTE)) and _is_value(other):
+            TableAccess._add(access.ranges, name)
+        elif isinstance(term, exp.Between):
+            TableAccess._add(access.ranges, name)
+        elif isinstance(term, exp.Like) and isinstance(other, exp.Literal) and other.this[:1] not in ("%", "_", ""):
+            TableAccess._add(access.ranges, name)
+
+    group = select.args.get("group")
+    for node in (group.expressions if group else []):
+        if isinstance(node, exp.Column):
+            access, name = access_for(node)
+            if access is not None:
+                TableAccess._add(access.group_by, name)
+
+    order = select.args.get("order")
+    for ordered in (order.expressions if order else []):
+        node = ordered.this
+        if not isinstance(node, exp.Column):
+            # ORDER BY on an expression cannot be satisfied by an index on one table
+            for access in accesses.values():
+                access.order_by = None
+            break
+        access, name = access_for(node)
+        if access is None:
+            continue
+        if access.order_by is not None:
+            access.order_by.append((name, bool(ordered.args.get("desc"))))
+        for other_access in accesses.values():
+            if other_access is not access:
+                other_access.order_by = None
+
+    return accesses
+
+
+def build_candidate(access: TableAccess, weight: float, equality_rank: Dict[str, int],
+                    max_columns: int = MAX_INDEX_COLUMNS) -> Dict[str, Any]:
+    """
+    Order one query's columns on one table into an index key:
+    equality columns first, then join columns, then ORDER BY (or GROUP BY) columns
+    so the sort can be skipped, then one range column, then the remaining
+    referenced columns when they fit, which makes the index covering.
+    """
+    key = []
+    directions = {}
+    benefit = 0.0
+
+    def add_key(name):
+        if name not in key and len(key) < max_columns:
+            key.append(name)
+            return True
+        return False
+
+    point = sorted(set(access.equality), key=lambda name: (-equality_rank.get(name, 0), name.lower()))
+    point += sorted(set(access.joins) - set(point), key=lambda name: (-equality_rank.get(name, 0), name.lower()))
+    for name in point:
+        if add_key(name):
+            benefit += EQUALITY_WEIGHT if name in access.equality else JOIN_WEIGHT
+
+    sort_columns = [(name, desc) for name, desc in access.order_by or [] if name not in key]
+    avoids_sort = False
+    if access.order_by and sort_columns and len(key) + len(sort_columns) <= max_columns:
+        for name, desc in sort_columns:
+            add_key(name)
+            directions[name] = desc
+        avoids_sort = True
+    elif access.group_by and len(key) + len(access.group_by) <= max_columns:
+        group_columns = [name for name in access.group_by if name not in key]
+        for name in group_columns:
+            add_key(name)
+        avoids_sort = bool(group_columns)
+    if avoids_sort:
+        benefit += SORT_WEIGHT
+
+    ranges = [name for name in access.ranges if name not in key]
+    if ranges and not avoids_sort and add_key(ranges[0]):
+        benefit += RANGE_WEIGHT
+
+    if not key:
+        return None
+
+    # Covering only pays off when the index is narrower than the table itself
+    extra = sorted(access.referenced - set(key), key=lambda name: access.table["column_order"].index(name))
+    width = len(key) + len(extra)
+    covering = width <= max_columns and (not extra or width < len(access.table["columns"]))
+    if covering and extra:
+        benefit += COVERING_WEIGHT
+
+    return {
+        "table": access.table["name"],
+        "key": key,
+        "point_columns": [name for name in point if name in key],
+        "columns": key + extra if covering else list(key),
+        "referenced": access.referenced,
+        "directions": directions,
+        "covering": covering,
+        "avoids_sort": avoids_sort,
+        "benefit": benefit * weight
+    }
+
+
+def _is_prefix(prefix: List[str], columns: List[str]) -> bool:
+    return len(prefix) <= len(columns) and [c.lower() for c in prefix] == [c.lower() for c in columns[:len(prefix)]]
+
+
+def existing_index_for(table: Dict[str, Any], candidate: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Existing index that already provides the candidate's key: either its leading
+    columns match the key, or it is a unique index fully bound by the candidate's
+    equality and join columns (a single-row lookup needs nothing better).
+    """
+    point = {name.lower() for name in candidate["point_columns"]}
+    for index in table["indexes"]:
+        if _is_prefix(candidate["key"], index["columns"]):
+            return index
+        if index.get("is_unique") and index["columns"] and {c.lower() for c in index["columns"]} <= point:
+            return index
+    return None
+
+
+def recommend_indexes(model: Dict[str, Any], workload: List[Tuple[str, float]], dialect: str = None,
+                      max_columns: int = MAX_INDEX_COLUMNS) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    """
+    Recommend indexes for a weighted workload of (sql, weight) pairs.
+    Returns the recommendations (highest benefit first) and a summary.
+    """
+    queries = []
+    errors = []
+    for number, (sql, weight) in enumerate(workload, 1):
+        try:
+            tree = parse_one(sql, read=dialect)
+        except Exception as e:
+            errors.append({"query": number, "error": str(e).split('\n')[0]})
+            continue
+        if tree is None:
+            continue
+        for select in tree.find_all(exp.Select):
+            if from_clause(select) is None:
+                continue
+            for access in collect_accesses(select, model).values():
+                queries.append((number, weight, access))
+
+    # Equality columns used by many queries go first so their indexes share prefixes
+    equality_rank = {}
+    for _, weight, access in queries:
+        for name in access.equality + access.joins:
+            equality_rank[name] = equality_rank.get(name, 0) + weight
+
+    candidates = {}
+    covered = []
+    for number, weight, access in queries:
+        candidate = build_candidate(access, weight, equality_rank, max_columns)
+        if candidate is None:
+            continue
+        existing = existing_index_for(access.table, candidate)
+        if existing is not None:
+            covered.append({"query": number, "table": candidate["table"],
+                            "columns": candidate["key"], "existing_index": existing["name"]})
+            continue
+        signature = (candidate["table"].lower(), tuple(c.lower() for c in candidate["columns"]))
+        merged = candidates.get(signature)
+        if merged is None:
+            candidate["queries"] = [number]
+            candidate["covering_queries"] = [number] if candidate["covering"] else []
+            candidates[signature] = candidate
+        else:
+            merged["benefit"] += candidate["benefit"]
+            merged["queries"].append(number)
+            if candidate["covering"]:
+                merged["covering_queries"].append(number)
+            merged["directions"].update(candidate["directions"])
+
+    # A candidate whose key is a prefix of a wider one is served by the wider index
+    ordered = sorted(candidates.values(), key=lambda c: (len(c["columns"]), c["benefit"]), reverse=True)
+    recommendations = []
+    for candidate in ordered:
+        wider = next((r for r in recommendations
+                      if r["table"].lower() == candidate["table"].lower()
+                      and _is_prefix(candidate["key"], r["columns"])
+                      and all(r["directions"].get(name, False) == desc
+                              for name, desc in candidate["directions"].items())), None)
+        if wider is not None:
+            wider["benefit"] += candidate["benefit"]
+            wider["queries"].extend(candidate["queries"])
+            if candidate["referenced"] <= set(wider["columns"]):
+                wider["covering_queries"].extend(candidate["queries"])
+            continue
+        recommendations.append(candidate)
+
+    for recommendation in recommendations:
+        recommendation["name"] = index_name(recommendation["table"], recommendation["columns"])
+        recommendation["benefit"] = round(recommendation["benefit"], 2)
+        recommendation["queries"] = sorted(set(recommendation["queries"]))
+        recommendation["covering_queries"] = sorted(set(recommendation["covering_queries"]))
+        recommendation["ddl"] = generate_create_index(recommendation)
+        for internal in ("covering", "key", "point_columns", "referenced"):
+            del recommendation[internal]
+    recommendations.sort(key=lambda r: (-r["benefit"], r["name"]))
+
+    summary = {
+        "queries": len(workload),
+        "table_accesses": len(queries),
+        "recommendations": len(recommendations),
+        "already_indexed": covered,
+        "errors": errors
+    }
+    return recommendations, summary
+
+
+def index_name(table: str, columns: List[str]) -> str:
+    """IX_<table>_<columns>, shortened with a hash suffix when it exceeds the DB2 limit."""
+    name = f"IX_{table}_{'_'.join(columns)}".upper()
+    if len(name) > MAX_INDEX_NAME_LENGTH:
+        digest = hashlib.sha1(name.encode('utf-8')).hexdigest()[:8].upper()
+        name = f"{name[:MAX_INDEX_NAME_LENGTH - 9]}_{digest}"
+    return name
+
+
+def generate_create_index(recommendation: Dict[str, Any]) -> str:
+    """Generate CREATE INDEX DDL for a recommendation."""
+    columns = ", ".join(
+        f"{name} DESC" if recommendation["directions"].get(name) else name
+        for name in recommendation["columns"]
+    )
+    return f"CREATE INDEX {recommendation['name']} ON {recommendation['table']} ({columns});"
+
+
+def load_workload(workload_file: str) -> List[Tuple[str, float]]:
+    """
+    Read a workload with sql_fingerprint's log reader and merge repeats of the
+    same statement shape, so each shape is parsed once with its total weight.
+    """
+    shapes = {}
+    for sql, executions, _ in iter_log_records(workload_file):
+        key = pre_normalize(sql)
+        if key in shapes:
+            shapes[key][1] += executions
+        else:
+            shapes[key] = [sql, executions]
+    return [(sql, weight) for sql, weight in shapes.values()]
+
+
+def main():
+    """Main entry point for the script."""
+    positional, options = split_cli_args(sys.argv[1:])
+    if len(positional) < 2:
+        print(json.dumps({"error": "Usage: sql_index_advisor.py <schema_ddl_or_mmd> <workload_file> [dialect] [--top=N] [--max-columns=N] [--format=sql|json]"}), file=sys.stderr)
+        sys.exit(1)
+
+    schema_file = positional[0]
+    workload_file = positional[1]
+    dialect = positional[2] if len(positional) > 2 and positional[2] else None
+
+    try:
+        model = load_schema_model(schema_file)
+        workload = load_workload(workload_file)
+        recommendations, summary = recommend_indexes(
+            model, workload, dialect, int(options.get("max-columns", str(MAX_INDEX_COLUMNS)))
+        )
+        if "top" in options:
+            recommendations = recommendations[:int(options["top"])]
+
+        if options.get("format", "sql") == "json":
+            print(json.dumps({"summary": summary, "recommendations": recommendations}, indent=2))
+        else:
+            print(f"-- Index recommendations for {workload_file} ({summary['queries']} distinct queries)")
+            for recommendation in recommendations:
+                notes = [f"benefit {recommendation['benefit']}",
+                         f"queries {', '.join(str(q) for q in recommendation['queries'])}"]
+                if recommendation["covering_queries"]:
+                    notes.append(f"covers {', '.join(str(q) for q in recommendation['covering_queries'])}")
+                if recommendation["avoids_sort"]:
+                    notes.append("avoids sort")
+                print(f"-- {'; '.join(notes)}")
+                print(recommendation["ddl"])
+            for entry in summary["already_indexed"]:
+                print(f"-- query {entry['query']}: ({', '.join(entry['columns'])}) on {entry['table']} "
+                      f"already provided by {entry['existing_index']}")
+
+        for error in summary["errors"]:
+            print(json.dumps({"warning": error}), file=sys.stderr)
+
+    except FileNotFoundError as e:
+        print(json.dumps({"error": f"File not found: {e.filename}"}), file=sys.stderr)
+        sys.exit(1)
+    except Exception as e:
+        print(json.dumps({"error": str(e)}), file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,341 @@
+#!/usr/bin/env python3
+"""
+Redundant and overlapping index detector.
+This script reads the indexes of a schema (DDL or Mermaid ERD, loaded through
+sql_to_mmd) and reports exact duplicates, indexes whose columns are a leading
+prefix of another index, unique indexes whose uniqueness a primary key or
+unique constraint already enforces and, with a query workload, indexes no
+query can use. Each finding that is safe to act on comes with a DROP INDEX
+statement and the space it frees: NLEAF from a SYSCAT.INDEXES export when
+available, otherwise an estimate from CARD and the key width.
+"""
+
+import sys
+import json
+import math
+from typing import List, Dict, Any, Tuple
+
+try:
+    import sqlglot
+    from sqlglot import parse_one, exp
+except ImportError:
+    print(json.dumps({"error": "SQLGlot not installed. Please install with: pip install sqlglot"}), file=sys.stderr)
+    sys.exit(1)
+
+from sql_to_mmd import load_schema_model
+from syscat_stats import load_catalog_stats, CatalogStats
+from sql_type_model import parse_type, lob_bytes
+from sql_antipatterns import from_clause
+from sql_index_advisor import collect_accesses, load_workload
+from sql_dialect_translate import split_cli_args
+
+
+DEFAULT_PAGE_SIZE = 4096
+
+# Index leaf entry overhead beyond the key (RID plus slot and flags), and the
+# share of a leaf page filled at CREATE INDEX time (PCTFREE 10)
+ENTRY_OVERHEAD_BYTES = 11
+LEAF_FILL = 0.9
+
+# Stored key bytes per type when there is no AVGCOLLEN; varying-length types
+# are assumed half full
+FIXED_TYPE_BYTES = {
+    "SMALLINT": 2, "INTEGER": 4, "INT": 4, "BIGINT": 8, "REAL": 4, "FLOAT": 8, "DOUBLE": 8,
+    "DOUBLE PRECISION": 8, "DATE": 4, "TIME": 3, "TIMESTAMP": 10, "DATETIME": 10,
+    "BOOLEAN": 1, "BOOL": 1, "DECFLOAT": 16, "UUID": 16
+}
+DEFAULT_COLUMN_BYTES = 8
+
+# Findings in the order they are checked; an index gets at most one
+FINDING_KINDS = ("duplicate", "implied_unique", "prefix", "unused")
+
+# DB2 gives a key constraint an existing unique index on its columns (SQL0598W) and skips creating one
+# that matches the constraint's index (SQL0605W); either way DROP INDEX fails with SQL0669N
+CONSTRAINT_OWNED_NOTE = ("the constraint owns this index on DB2 (adopted, or never created as a separate index): "
+                         "DROP INDEX fails with SQL0669N; it goes away only with ALTER TABLE ... DROP of the constraint")
+
+
+def _lower(columns: List[str]) -> List[str]:
+    return [name.lower() for name in columns]
+
+
+def _is_strict_prefix(prefix: List[str], columns: List[str]) -> bool:
+    return len(prefix) < len(columns) and _lower(prefix) == _lower(columns[:len(prefix)])
+
+
+def column_bytes(table: Dict[str, Any], column_name: str, catalog: CatalogStats = None) -> float:
+    """Average stored bytes of one key column: AVGCOLLEN when collected, else from the column type."""
+    if catalog is not None:
+        stats = catalog.column(table["name"], column_name)
+        if stats and stats.get("AVGCOLLEN"):
+            return stats["AVGCOLLEN"]
+
+    column = table["columns"].get(column_name.lower())
+    spec = parse_type(column.get("sql_type") or column.get("data_type")) if column else None
+    if spec is None:
+        return DEFAULT_COLUMN_BYTES
+    if spec["base"] in FIXED_TYPE_BYTES:
+        return FIXED_TYPE_BYTES[spec["base"]]
+    if spec["base"] in ("DECIMAL", "NUMERIC", "DEC"):
+        precision = int(spec["args"][0]) if spec["args"] and spec["args"][0].isdigit() else 5
+        return precision // 2 + 1
+    if spec["args"] and spec["args"][0][:1].isdigit():
+        length = lob_bytes(spec)
+        varying = "VAR" in spec["base"] or "VARYING" in spec["base"]
+        return length / 2 + 2 if varying else length
+    return DEFAULT_COLUMN_BYTES
+
+
+def index_size(table: Dict[str, Any], index: Dict[str, Any], catalog: CatalogStats = None,
+               page_size: int = DEFAULT_PAGE_SIZE) -> Tuple[int, str]:
+    """
+    Leaf-page bytes of an index and where the figure comes from: 'NLEAF' from
+    the catalog, 'estimate' from CARD and the key width, or (None, None).
+    """
+    if catalog is None:
+        return None, None
+    for entry in catalog.table_indexes(table["name"]):
+        if (entry.get("INDNAME") or "").lower() == index["name"].lower() and entry.get("NLEAF") is not None:
+            return int(entry["NLEAF"] * page_size), "NLEAF"
+
+    card = catalog.cardinality(table["name"])
+    if card is None:
+        return None, None
+    key_bytes = sum(column_bytes(table, name, catalog) for name in index["columns"])
+    leaf_pages = math.ceil(card * (key_bytes + ENTRY_OVERHEAD_BYTES) / (page_size * LEAF_FILL))
+    return int(leaf_pages * page_size), "estimate"
+
+
+def index_usage(model: Dict[str, Any], workload: List[Tuple[str, float]], dialect: str = None
+                ) -> Tuple[Dict[Tuple[str, str], List[int]], List[Dict[str, Any]]]:
+    """
+    Queries that can use each index, keyed by (table, index name) in lower case.
+    An index is usable when its leading column is filtered, joined, grouped or
+    sorted on, or when it holds every column the query reads from its table.
+    UPDATE and DELETE statements count through their WHERE clause.
+    """
+    usage = {}
+    errors = []
+    for number, (sql, _) in enumerate(workload, 1):
+        try:
+            tree = parse_one(sql, read=dialect)
+        except Exception as e:
+            errors.append({"query": number, "error": str(e).split('\n')[0]})
+            continue
+        if tree is None:
+            continue
+
+        selects = [select for select in tree.find_all(exp.Select) if from_clause(select) is not None]
+        if isinstance(tree, (exp.Update, exp.Delete)) and tree.args.get("where") is not None \
+                and isinstance(tree.this, exp.Table):
+            selects.append(sqlglot.select("*").from_(tree.this.copy()).where(tree.args["where"].this.copy()))
+
+        for select in selects:
+            for access in collect_accesses(select, model).values():
+                leading = set(_lower(access.equality + access.joins + access.ranges + access.group_by))
+                if access.order_by:
+                    leading.add(access.order_by[0][0].lower())
+                referenced = set(_lower(list(access.referenced)))
+                for index in access.table["indexes"]:
+                    columns = _lower(index["columns"])
+                    if columns[0] in leading or (referenced and referenced <= set(columns)):
+                        key = (access.table["name"].lower(), index["name"].lower())
+                        if number not in usage.setdefault(key, []):
+                            usage[key].append(number)
+    return usage, errors
+
+
+def _supports_foreign_key(table: Dict[str, Any], index: Dict[str, Any]) -> Dict[str, Any]:
+    """Foreign key whose columns lead the index (the index serves its RI checks on parent deletes)."""
+    for fk in table["foreign_keys"]:
+        columns = fk.get("from_columns") or []
+        if columns and {name.lower() for name in columns} == set(_lower(index["columns"][:len(columns)])):
+            return fk
+    return None
+
+
+def find_redundant_indexes(model: Dict[str, Any], catalog: CatalogStats = None,
+                           workload: List[Tuple[str, float]] = None, dialect: str = None,
+                           page_size: int = DEFAULT_PAGE_SIZE) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    """
+    Find duplicate, prefix-redundant, key-implied and (with a workload) unused
+    indexes. Indexes that back a primary key or unique constraint are only ever
+    kept. Returns the findings and a summary.
+    """
+    usage, errors = index_usage(model, workload, dialect) if workload is not None else ({}, [])
+
+    findings = []
+    for table in model["tables"].values():
+        indexes = table["indexes"]
+        keys = [index for index in indexes if index.get("is_implicit")]
+        flagged = set()
+
+        def add(index, kind, reason, kept=None, drop=True, notes=None):
+            flagged.add(index["name"].lower())
+            findings.append({
+                "table": table["name"],
+                "index": index["name"],
+                "columns": index["columns"],
+                "is_unique": bool(index.get("is_unique")),
+                "kind": kind,
+                "reason": reason,
+                "kept_index": kept["name"] if kept else None,
+                "drop": drop,
+                "notes": notes or []
+            })
+
+        # Exact duplicates: keep a constraint index, else a unique one, else the first declared
+        by_columns = {}
+        for index in indexes:
+            by_columns.setdefault(tuple(_lower(index["columns"])), []).append(index)
+        for group in by_columns.values():
+            if len(group) < 2:
+                continue
+            kept = min(group, key=lambda ix: (not ix.get("is_implicit"), not ix.get("is_unique"), indexes.index(ix)))
+            for index in group:
+                if index is kept or index.get("is_implicit"):
+                    continue
+                if kept.get("is_implicit") and index.get("is_unique"):
+                    add(index, "duplicate", f"same columns as {kept['name']}", kept, drop=False,
+                        notes=[CONSTRAINT_OWNED_NOTE])
+                else:
+                    add(index, "duplicate", f"same columns as {kept['name']}", kept)
+
+        # Unique indexes whose uniqueness a primary key or unique constraint already enforces
+        for index in indexes:
+            if index.get("is_implicit") or not index.get("is_unique") or index["name"].lower() in flagged:
+                continue
+            columns = set(_lower(index["columns"]))
+            key = next((k for k in keys if set(_lower(k["columns"])) <= columns), None)
+            if key is None:
+                continue
+            used_by = usage.get((table["name"].lower(), index["name"].lower()))
+            same_set = set(_lower(key["columns"])) == columns
+            kind_of_key = "primary key" if key.get("is_primary_key") else "unique constraint"
+            if same_set:
+                reason = f"same columns as the {kind_of_key} {key['name']} in a different order"
+            else:
+                reason = f"uniqueness already enforced by the {kind_of_key} {key['name']} on a subset of its columns"
+            notes = []
+            if workload is None:
+                notes.append("no workload supplied: drop only if no query needs this column order"
+                             if same_set else "could be recreated as a non-unique index")
+            elif used_by:
+                notes.append(f"used by queries {', '.join(str(q) for q in used_by)}: "
+                             + ("keep it or recreate it as non-unique" if not same_set else "keep it for its column order"))
+            if same_set:
+                # The constraint adopts a unique index on its column set in any order
+                add(index, "implied_unique", reason, key, drop=False, notes=[CONSTRAINT_OWNED_NOTE])
+                continue
+            add(index, "implied_unique", reason, key, drop=workload is not None and not used_by, notes=notes)
+
+        # Non-unique indexes whose columns lead a wider index
+        for index in indexes:
+            if index.get("is_implicit") or index.get("is_unique") or index["name"].lower() in flagged:
+                continue
+            wider = [other for other in indexes
+                     if other is not index and _is_strict_prefix(index["columns"], other["columns"])
+                     and other["name"].lower() not in flagged]
+            if wider:
+                kept = max(wider, key=lambda ix: (len(ix["columns"]), bool(ix.get("is_implicit"))))
+                add(index, "prefix", f"leading prefix of {kept['name']} ({', '.join(kept['columns'])})", kept)
+
+        # Indexes no workload query can use; unique indexes still enforce a rule
+        if workload is not None:
+            for index in indexes:
+                if index.get("is_implicit") or index.get("is_unique") or index["name"].lower() in flagged:
+                    continue
+                if usage.get((table["name"].lower(), index["name"].lower())):
+                    continue
+                fk = _supports_foreign_key(table, index)
+                if fk is not None:
+                    add(index, "unused", "no workload query uses it", drop=False,
+                        notes=[f"supports the foreign key to {fk['to_table']}: parent deletes and key updates "
+                               f"would scan {table['name']} without it"])
+                else:
+                    add(index, "unused", "no workload query uses it")
+
+    index_by_name = {(table["name"].lower(), index["name"].lower()): (table, index)
+                     for table in model["tables"].values() for index in table["indexes"]}
+    for finding in findings:
+        table, index = index_by_name[(finding["table"].lower(), finding["index"].lower())]
+        finding["estimated_bytes"], finding["size_source"] = index_size(table, index, catalog, page_size)
+        finding["used_by"] = usage.get((finding["table"].lower(), finding["index"].lower()), [])
+        finding["ddl"] = f"DROP INDEX {finding['index']};" if finding["drop"] else None
+    findings.sort(key=lambda f: (FINDING_KINDS.index(f["kind"]), f["table"].lower(), f["index"].lower()))
+
+    dropped = [f for f in findings if f["drop"]]
+    summary = {
+        "tables": len(model["tables"]),
+        "indexes": sum(1 for t in model["tables"].values() for ix in t["indexes"] if not ix.get("is_implicit")),
+        "findings": len(findings),
+        "drop_suggestions": len(dropped),
+        "estimated_bytes_saved": sum(f["estimated_bytes"] or 0 for f in dropped),
+        "by_kind": {kind: sum(1 for f in findings if f["kind"] == kind) for kind in FINDING_KINDS},
+        "workload_queries": len(workload) if workload is not None else None,
+        "errors": errors
+    }
+    return findings, summary
+
+
+def format_bytes(size: int) -> str:
+    for unit in ("bytes", "KB", "MB", "GB"):
+        if size < 1024 or unit == "GB":
+            return f"{size:,} {unit}" if unit == "bytes" else f"{size:,.1f} {unit}"
+        size /= 1024.0
+
+
+def main():
+    """Main entry point for the script."""
+    positional, options = split_cli_args(sys.argv[1:])
+    if len(positional) < 1:
+        print(json.dumps({"error": "Usage: sql_index_redundancy.py <schema_ddl_or_mmd> [dialect] [--stats=syscat_export[,more]] [--workload=file] [--page-size=N] [--format=sql|json]"}), file=sys.stderr)
+        sys.exit(1)
+
+    schema_file = positional[0]
+    dialect = positional[1] if len(positional) > 1 and positional[1] else None
+
+    try:
+        catalog = None
+        if options.get("stats"):
+            catalog = load_catalog_stats([path for path in options["stats"].split(',') if path])
+        findings, summary = find_redundant_indexes(
+            load_schema_model(schema_file),
+            catalog,
+            load_workload(options["workload"]) if options.get("workload") else None,
+            dialect,
+            int(options.get("page-size", str(DEFAULT_PAGE_SIZE)))
+        )
+
+        if options.get("format", "sql") == "json":
+            print(json.dumps({"summary": summary, "findings": findings}, indent=2))
+        else:
+            print(f"-- Redundant index report for {schema_file}: {summary['findings']} findings, "
+                  f"{summary['drop_suggestions']} DROP suggestions")
+            for finding in findings:
+                size = ""
+                if finding["estimated_bytes"] is not None:
+                    source = "NLEAF" if finding["size_source"] == "NLEAF" else "estimated"
+                    size = f"; frees ~{format_bytes(finding['estimated_bytes'])} ({source})"
+                print(f"\n-- {finding['kind']}: {finding['table']}.{finding['index']} "
+                      f"({', '.join(finding['columns'])}) - {finding['reason']}{size}")
+                for note in finding["notes"]:
+                    print(f"--   note: {note}")
+                if finding["ddl"]:
+                    print(finding["ddl"])
+            if summary["estimated_bytes_saved"]:
+                print(f"\n-- Total space freed by the DROP suggestions: ~{format_bytes(summary['estimated_bytes_saved'])}")
+
+        for error in summary["errors"]:
+            print(json.dumps({"warning": error}), file=sys.stderr)
+
+    except FileNotFoundError as e:
+        print(json.dumps({"error": f"File not found: {e.filename}"}), file=sys.stderr)
+        sys.exit(1)
+    except Exception as e:
+        print(json.dumps({"error": str(e)}), file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
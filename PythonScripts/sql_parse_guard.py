@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+Per-statement parse budget for the SQLGlot-based converters.
+A single generated statement with thousands of CASE branches or an enormous
+IN list can keep sqlglot.parse or transpile busy for minutes. A ParseBudget
+limits each statement's token count and nesting depth, which a cheap scan
+checks before parsing, and its parse time, which a StatementSupervisor enforces
+by running the parse in a worker process and replacing the worker when a
+statement overruns. Statements over budget come back as structured diagnostics,
+and the caller skips them or passes them through verbatim. Worst-case latency
+is then bounded by the statement count times the time limit.
+"""
+
+import re
+import sys
+import time
+import importlib
+import multiprocessing
+from typing import List, Dict, Any, Tuple, Callable, Optional
+
+
+# Words and punctuation a statement is measured in: quoted text, comments,
+# words/numbers and single punctuation characters each count as one token
+_MEASURE_TOKEN_RE = re.compile(
+    r"'(?:[^']|'')*'?|\"(?:[^\"]|\"\")*\"?|--[^\n]*|/\*.*?(?:\*/|$)|[A-Za-z_][A-Za-z0-9_$#@]*|\d+(?:\.\d*)?|\S",
+    re.DOTALL
+)
+
+# Seconds a fresh worker gets to import the job's module before its first job
+WORKER_START_SECONDS = 30.0
+
+
+class ParseBudget:
+    """Per-statement limits; None disables a limit."""
+
+    def __init__(self, max_seconds: float = None, max_tokens: int = None, max_depth: int = None):
+        self.max_seconds = max_seconds
+        self.max_tokens = max_tokens
+        self.max_depth = max_depth
+
+    @classmethod
+    def from_cli(cls, options: Dict[str, str]) -> Optional["ParseBudget"]:
+        """Budget from --statement-timeout=S, --max-tokens=N and --max-depth=N; None when none is given."""
+        if not any(name in options for name in ("statement-timeout", "max-tokens", "max-depth")):
+            return None
+        return cls(
+            max_seconds=float(options["statement-timeout"]) if "statement-timeout" in options else None,
+            max_tokens=int(options["max-tokens"]) if "max-tokens" in options else None,
+            max_depth=int(options["max-depth"]) if "max-depth" in options else None
+        )
+
+
+def measure_statement(statement: str, max_tokens: int = None, max_depth: int = None) -> Tuple[int, int]:
+    """
+    Token count and nesting depth (parentheses plus CASE ... END) of a statement.
+    The scan stops as soon as a limit is exceeded, so measuring a pathological
+    statement costs no more than the limits themselves.
+    """
+    tokens = 0
+    depth = 0
+    case_depth = 0
+    max_seen = 0
+    for match in _MEASURE_TOKEN_RE.finditer(statement):
+        token = match.group(0)
+        first = token[0]
+        if token.startswith('--') or token.startswith('/*'):
+            continue
+        if first == '(':
+            depth += 1
+        elif first == ')':
+            depth = max(depth - 1, 0)
+        elif first.isalpha() or first == '_':
+            word = token.upper()
+            if word == "CASE":
+                depth += 1
+                case_depth += 1
+            elif word == "END" and case_depth:
+                depth -= 1
+                case_depth -= 1
+        tokens += 1
+        max_seen = max(max_seen, depth)
+        if (max_tokens is not None and tokens > max_tokens) or (max_depth is not None and max_seen > max_depth):
+            break
+    return tokens, max_seen
+
+
+def check_statement(statement: str, budget: ParseBudget) -> Optional[Dict[str, Any]]:
+    """Diagnostic for a statement over the token or depth limit, else None."""
+    tokens, depth = measure_statement(statement, budget.max_tokens, budget.max_depth)
+    if budget.max_tokens is not None and tokens > budget.max_tokens:
+        return {"reason": "tokens", "limit": budget.max_tokens,
+                "message": f"more than {budget.max_tokens} tokens"}
+    if budget.max_depth is not None and depth > budget.max_depth:
+        return {"reason": "depth", "limit": budget.max_depth,
+                "message": f"nesting deeper than {budget.max_depth} levels"}
+    return None
+
+
+def _import_module(name: str) -> bool:
+    importlib.import_module(name)
+    return True
+
+
+def _recursion_diagnostic() -> Dict[str, Any]:
+    return {"reason": "depth", "limit": sys.getrecursionlimit(),
+            "message": "nesting exceeded the parser's recursion limit"}
+
+
+def _worker_loop(connection):
+    """Worker process: run (function, args) jobs until told to stop."""
+    while True:
+        try:
+            job = connection.recv()
+        except EOFError:
+            return
+        if job is None:
+            return
+        function, args = job
+        try:
+            connection.send(("ok", function(*args)))
+        except RecursionError:
+            connection.send(("over_budget", _recursion_diagnostic()))
+        except Exception as e:
+            connection.send(("error", str(e)))
+
+
+class StatementSupervisor:
+    """
+    Runs one job at a time in a worker process and enforces the time budget:
+    a job that overruns has its worker killed and replaced. The worker starts
+    on first use and is reused across statements.
+    Functions and results must be picklable (module-level functions, plain data).
+    """
+
+    def __init__(self, budget: ParseBudget):
+        self.budget = budget
+        self.process = None
+        self.connection = None
+        self.restarts = 0
+
+    def _start(self, module: str):
+        context = multiprocessing.get_context()
+        self.connection, child = context.Pipe()
+        self.process = context.Process(target=_worker_loop, args=(child,), daemon=True)
+        self.process.start()
+        child.close()
+        # Import outside the budget, so the first statement is timed like the rest
+        self.connection.send((_import_module, (module,)))
+        if not self.connection.poll(WORKER_START_SECONDS):
+            self._stop(kill=True)
+            raise RuntimeError(f"Parse worker did not start within {WORKER_START_SECONDS}s")
+        self.connection.recv()
+
+    def _stop(self, kill: bool = False):
+        if self.process is None:
+            return
+        if kill:
+            self.process.kill()
+        else:
+            try:
+                self.connection.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+        self.process.join(5)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.connection.close()
+        self.process = None
+        self.connection = None
+
+    def run(self, function: Callable, *args) -> Tuple[str, Any]:
+        """
+        Run function(*args) under the time budget. Returns ("ok", result),
+        ("error", message) for an exception in the job, or ("over_budget",
+        diagnostic) when it ran out of time or recursion depth.
+        Without a time limit the job runs in-process.
+        """
+        if self.budget.max_seconds is None:
+            try:
+                return "ok", function(*args)
+            except RecursionError:
+                return "over_budget", _recursion_diagnostic()
+            except Exception as e:
+                return "error", str(e)
+
+        if self.process is None:
+            self._start(function.__module__)
+        started = time.perf_counter()
+        try:
+            self.connection.send((function, args))
+            if self.connection.poll(self.budget.max_seconds):
+                return self.connection.recv()
+        except (EOFError, BrokenPipeError, OSError):
+            self._stop(kill=True)
+            self.restarts += 1
+            return "error", "parse worker exited unexpectedly"
+
+        self._stop(kill=True)
+        self.restarts += 1
+        return "over_budget", {"reason": "timeout", "limit": self.budget.max_seconds,
+                           "elapsed_ms": round((time.perf_counter() - started) * 1000, 3),
+                           "message": f"parse exceeded {self.budget.max_seconds}s"}
+
+    def close(self):
+        self._stop()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def guarded_call(supervisor: StatementSupervisor, function: Callable, statement: str, *args) -> Tuple[str, Any]:
+    """
+    Check statement against the token and depth limits, then run
+    function(statement, *args) under the time limit. Returns the same
+    (status, value) pairs as StatementSupervisor.run; statements rejected
+    before parsing are "over_budget" too.
+    """
+    diagnostic = check_statement(statement, supervisor.budget)
+    if diagnostic:
+        return "over_budget", diagnostic
+    return supervisor.run(function, statement, *args)
+
+
+def skip_comment(index: int, diagnostic: Dict[str, Any], line: int = None) -> str:
+    """SQL comment that marks a statement passed through untranslated because it was over budget."""
+    where = f"Statement {index}" + (f" (line {line})" if line else "")
+    return f"/* {where} over parse budget ({diagnostic['message']}); passed through verbatim */"
+
+
+def record_diagnostic(diagnostics: List[Dict[str, Any]], index: int, statement: str,
+                      diagnostic: Dict[str, Any], action: str) -> Dict[str, Any]:
+    """Record a structured diagnostic for an over-budget statement and return it."""
+    entry = {
+        "statement": index,
+        "reason": diagnostic["reason"],
+        "limit": diagnostic["limit"],
+        "action": action,
+        "message": diagnostic["message"],
+        "preview": ' '.join(statement.split())[:80]
+    }
+    if "elapsed_ms" in diagnostic:
+        entry["elapsed_ms"] = diagnostic["elapsed_ms"]
+    diagnostics.append(entry)
+    return entry
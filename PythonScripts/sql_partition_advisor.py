@@ -0,0 +1,457 @@
+#!/usr/bin/env python3
+"""
+Range-partitioning and MDC advisor for large DB2 tables.
+This script combines the schema model (DDL or Mermaid ERD, loaded through
+sql_to_mmd) with SYSCAT statistics (see syscat_stats.py) and, optionally, a
+query workload. For every large table it recommends a range partitioning key
+with ranges, and multidimensional clustering (ORGANIZE BY DIMENSIONS) columns
+sized so each cell fills whole blocks, and emits the DB2 statements that
+rebuild the table online with SYSPROC.ADMIN_MOVE_TABLE.
+"""
+
+import sys
+import re
+import json
+import math
+from datetime import date
+from typing import List, Dict, Any, Tuple
+
+try:
+    import sqlglot
+    from sqlglot import parse_one, exp
+except ImportError:
+    print(json.dumps({"error": "SQLGlot not installed. Please install with: pip install sqlglot"}), file=sys.stderr)
+    sys.exit(1)
+
+from sql_to_mmd import load_schema_model
+from syscat_stats import load_catalog_stats, CatalogStats
+from sql_antipatterns import from_clause
+from sql_index_advisor import collect_accesses, load_workload
+from sql_dialect_translate import split_cli_args
+
+
+# Tables below this CARD are left alone
+MIN_TABLE_ROWS = 1000000
+
+# Range partitions should hold at least this many rows, and a table no more than MAX_PARTITIONS
+MIN_PARTITION_ROWS = 500000
+MAX_PARTITIONS = 1000
+
+# Partition intervals from finest to coarsest: (label for EVERY, months, days)
+DATE_INTERVALS = [("1 DAY", 0, 1), ("7 DAYS", 0, 7), ("1 MONTH", 1, 0), ("3 MONTHS", 3, 0), ("1 YEAR", 12, 0)]
+
+# Years of data assumed for a date column without HIGH2KEY/LOW2KEY
+DEFAULT_HISTORY_YEARS = 5
+
+# MDC: DB2 default extent size in pages, blocks a cell should fill, and most dimensions proposed
+EXTENT_PAGES = 32
+MIN_CELL_BLOCKS = 2.0
+MAX_DIMENSIONS = 3
+DEFAULT_PAGE_SIZE = 4096
+
+# Workload weights per column role, multiplied by the query weight
+RANGE_WEIGHT = 3.0
+EQUALITY_WEIGHT = 2.0
+GROUP_WEIGHT = 1.0
+JOIN_WEIGHT = 1.0
+# FK columns are clustered on even without a workload: joins and deletes go by parent
+FK_WEIGHT = 1.0
+
+DATE_TYPES = ("DATE", "TIMESTAMP", "DATETIME")
+
+# Catalog names DB2 accepts unquoted in SQL text
+_ORDINARY_IDENTIFIER_RE = re.compile(r'^[A-Z_][A-Z0-9_$#@]*$')
+INTEGER_TYPES = ("SMALLINT", "INTEGER", "INT", "BIGINT")
+# Types DB2 does not allow as MDC dimensions
+NON_DIMENSION_TYPES = ("BLOB", "CLOB", "DBCLOB", "XML", "LONG VARCHAR", "LONG VARGRAPHIC")
+
+_DATE_RE = re.compile(r'(\d{4})-(\d{2})-(\d{2})')
+
+
+def base_type(column: Dict[str, Any]) -> str:
+    return re.sub(r'\(.*$', '', (column.get("data_type") or "").upper()).strip()
+
+
+def parse_date_stat(value) -> date:
+    """Date from a HIGH2KEY/LOW2KEY value such as '2024-03-31' or '2024-03-31-12.00.00.000000'."""
+    match = _DATE_RE.search(str(value or ""))
+    if not match:
+        return None
+    try:
+        return date(int(match.group(1)), int(match.group(2)), int(match.group(3)))
+    except ValueError:
+        return None
+
+
+def parse_number_stat(value) -> float:
+    try:
+        return float(str(value).strip("' "))
+    except (TypeError, ValueError):
+        return None
+
+
+def add_months(day: date, months: int) -> date:
+    month = day.month - 1 + months
+    return date(day.year + month // 12, month % 12 + 1, 1)
+
+
+def period_start(day: date, months: int) -> date:
+    """First day of the month/quarter/year containing day."""
+    if months >= 12:
+        return date(day.year, 1, 1)
+    return date(day.year, (day.month - 1) // months * months + 1, 1)
+
+
+def collect_column_usage(model: Dict[str, Any], workload: List[Tuple[str, float]],
+                         dialect: str = None) -> Tuple[Dict[str, Dict[str, Dict[str, float]]], List[Dict[str, Any]]]:
+    """Per table and column, the workload weight of range, equality, GROUP BY and join use."""
+    usage = {}
+    errors = []
+    for number, (sql, weight) in enumerate(workload, 1):
+        try:
+            tree = parse_one(sql, read=dialect)
+        except Exception as e:
+            errors.append({"query": number, "error": str(e).split('\n')[0]})
+            continue
+        if tree is None:
+            continue
+        for select in tree.find_all(exp.Select):
+            if from_clause(select) is None:
+                continue
+            for access in collect_accesses(select, model).values():
+                columns = usage.setdefault(access.table["name"].lower(), {})
+                for role, names in (("range", access.ranges), ("equality", access.equality),
+                                    ("group", access.group_by), ("join", access.joins)):
+                    for name in names:
+                        entry = columns.setdefault(name.lower(), {"range": 0.0, "equality": 0.0, "group": 0.0, "join": 0.0})
+                        entry[role] += weight
+    return usage, errors
+
+
+class TableProfile:
+    """Size figures for one table, from SYSCAT.TABLES with fallbacks."""
+
+    def __init__(self, table: Dict[str, Any], stats: Dict[str, Any], catalog: CatalogStats):
+        self.table = table
+        self.name = table["name"]
+        self.schema = (stats.get("TABSCHEMA") or "").strip()
+        # The name as stored in the catalog, which DB2 procedures match case-sensitively
+        self.catalog_name = (stats.get("TABNAME") or "").strip() or self.name.upper()
+        self.rows = stats["CARD"] or 0
+        row_size = stats.get("AVGROWSIZE") or sum(
+            (catalog.column(self.name, c) or {}).get("AVGCOLLEN") or 8 for c in table["column_order"])
+        self.pages = stats.get("NPAGES") or max(1, math.ceil(self.rows * row_size / DEFAULT_PAGE_SIZE))
+        self.catalog = catalog
+
+    @property
+    def qualified_name(self) -> str:
+        return f"{self.schema}.{self.name}" if self.schema else self.name
+
+    @property
+    def sql_name(self) -> str:
+        """Qualified name for DB2 statements, quoted where the catalog name is not an ordinary identifier."""
+        parts = [self.schema, self.catalog_name] if self.schema else [self.catalog_name]
+        return ".".join(part if _ORDINARY_IDENTIFIER_RE.match(part) else '"' + part.replace('"', '""') + '"'
+                        for part in parts)
+
+    def column_stats(self, column_name: str) -> Dict[str, Any]:
+        return self.catalog.column(self.qualified_name, column_name) or {}
+
+
+def date_range(profile: TableProfile, column_name: str, today: date = None) -> Tuple[date, date, bool]:
+    """Low and high dates from LOW2KEY/HIGH2KEY, else DEFAULT_HISTORY_YEARS up to today (assumed)."""
+    stats = profile.column_stats(column_name)
+    low, high = parse_date_stat(stats.get("LOW2KEY")), parse_date_stat(stats.get("HIGH2KEY"))
+    if low and high and low <= high:
+        return low, high, False
+    today = today or date.today()
+    return date(today.year - DEFAULT_HISTORY_YEARS, 1, 1), today, True
+
+
+def count_periods(low: date, high: date, months: int, days: int) -> int:
+    if days:
+        return (high - low).days // days + 1
+    start = period_start(low, months)
+    return ((high.year - start.year) * 12 + high.month - start.month) // months + 1
+
+
+def recommend_range_partitioning(profile: TableProfile, usage: Dict[str, Dict[str, float]],
+                                 today: date = None) -> Dict[str, Any]:
+    """
+    Pick the range partitioning column and interval.
+    Date/timestamp columns are preferred (roll-in/roll-out by period), ranked by
+    workload range predicates, then NOT NULL, then fewer NULLs; integer columns
+    qualify only when the workload filters them by range and they have enough
+    distinct values to fill the partitions. The interval is the finest one
+    giving at least MIN_PARTITION_ROWS rows per partition.
+    """
+    target_partitions = max(1, min(MAX_PARTITIONS, int(profile.rows // MIN_PARTITION_ROWS)))
+    candidates = []
+    for column_name in profile.table["column_order"]:
+        column = profile.table["columns"][column_name.lower()]
+        kind = base_type(column)
+        range_use = usage.get(column_name.lower(), {}).get("range", 0.0)
+        stats = profile.column_stats(column_name)
+        if kind in INTEGER_TYPES and (range_use <= 0 or column.get("is_primary_key")
+                                      or (stats.get("COLCARD") or 0) < target_partitions):
+            continue
+        if kind in DATE_TYPES or kind in INTEGER_TYPES:
+            numnulls = stats.get("NUMNULLS") or 0
+            score = range_use * RANGE_WEIGHT + (1.0 if kind in DATE_TYPES else 0.0)
+            candidates.append((score, bool(column.get("is_not_null")), -numnulls, column["name"], kind))
+    if not candidates:
+        return None
+    candidates.sort(key=lambda c: (c[0], c[1], c[2]), reverse=True)
+    score, _, _, column_name, kind = candidates[0]
+
+    if kind in DATE_TYPES:
+        low, high, assumed = date_range(profile, column_name, today)
+        for every, months, days in DATE_INTERVALS:
+            partitions = count_periods(low, high, months, days)
+            if partitions <= MAX_PARTITIONS and profile.rows / partitions >= MIN_PARTITION_ROWS:
+                break
+        start = period_start(low, months) if months else low
+        end = add_months(period_start(high, months), months) if months else high
+        if months:
+            end = date.fromordinal(end.toordinal() - 1)
+        if kind == "DATE":
+            bounds = (f"'{start.isoformat()}'", f"'{end.isoformat()}'")
+        else:
+            bounds = (f"'{start.isoformat()}-00.00.00.000000'", f"'{end.isoformat()}-23.59.59.999999'")
+        range_info = {"low": start.isoformat(), "high": end.isoformat(), "assumed": assumed}
+    else:
+        stats = profile.column_stats(column_name)
+        low, high = parse_number_stat(stats.get("LOW2KEY")), parse_number_stat(stats.get("HIGH2KEY"))
+        if low is None or high is None or high < low:
+            return None
+        step = max(1, math.ceil((high - low + 1) / target_partitions))
+        partitions = math.ceil((high - low + 1) / step)
+        every = str(step)
+        bounds = (str(int(low)), str(int(low) + partitions * step - 1))
+        range_info = {"low": int(low), "high": int(high), "assumed": False}
+
+    clause = f"PARTITION BY RANGE ({column_name}) (STARTING {bounds[0]} ENDING {bounds[1]} EVERY {every})"
+    notes = []
+    if range_info["assumed"]:
+        notes.append("no LOW2KEY/HIGH2KEY statistics; range assumed, adjust STARTING/ENDING")
+    pk = [c.lower() for c in profile.table["primary_keys"]]
+    if pk and column_name.lower() not in pk:
+        notes.append("primary key does not contain the partitioning column, so its index stays nonpartitioned")
+    return {
+        "column": column_name,
+        "every": every,
+        "partitions": partitions,
+        "rows_per_partition": round(profile.rows / partitions),
+        "range": range_info,
+        "workload_weight": round(usage.get(column_name.lower(), {}).get("range", 0.0), 2),
+        "clause": clause,
+        "notes": notes
+    }
+
+
+def dimension_candidates(profile: TableProfile, usage: Dict[str, Dict[str, float]],
+                         partition_column: str = None, today: date = None) -> List[Dict[str, Any]]:
+    """
+    Columns worth clustering on, with their cardinality. Low-cardinality
+    columns qualify directly; a date column too fine-grained to be a dimension
+    is offered rolled up to months as a generated column.
+    """
+    fk_columns = {c.lower() for fk in profile.table["foreign_keys"] for c in fk["from_columns"]}
+    candidates = []
+    for column_name in profile.table["column_order"]:
+        column = profile.table["columns"][column_name.lower()]
+        kind = base_type(column)
+        if kind in NON_DIMENSION_TYPES or column.get("is_primary_key") \
+                or column_name.lower() == (partition_column or "").lower():
+            continue
+        use = usage.get(column_name.lower(), {})
+        score = (use.get("equality", 0.0) * EQUALITY_WEIGHT + use.get("range", 0.0) * RANGE_WEIGHT
+                 + use.get("group", 0.0) * GROUP_WEIGHT + use.get("join", 0.0) * JOIN_WEIGHT)
+        if column_name.lower() in fk_columns:
+            score += FK_WEIGHT
+        if score <= 0:
+            continue
+        cardinality = profile.column_stats(column_name).get("COLCARD")
+        if kind in DATE_TYPES:
+            low, high, _ = date_range(profile, column_name, today)
+            months = count_periods(low, high, 1, 0)
+            if cardinality is None or cardinality > months:
+                expression = f"INTEGER({column['name']}) / 100" if kind == "DATE" else f"INTEGER(DATE({column['name']})) / 100"
+                candidates.append({"column": f"{column['name']}_MONTH", "source": column["name"], "cardinality": months,
+                                   "score": score, "generated": expression})
+                continue
+        if cardinality is None:
+            if kind in ("BOOLEAN", "BOOL"):
+                cardinality = 2
+            else:
+                continue
+        candidates.append({"column": column["name"], "source": column["name"], "cardinality": cardinality,
+                           "score": score, "generated": None})
+    candidates.sort(key=lambda c: (-c["score"], c["cardinality"], c["column"].lower()))
+    return candidates
+
+
+def recommend_mdc(profile: TableProfile, usage: Dict[str, Dict[str, float]], partitions: int = 1,
+                  extent_pages: int = EXTENT_PAGES, max_dimensions: int = MAX_DIMENSIONS,
+                  partition_column: str = None, today: date = None) -> Dict[str, Any]:
+    """
+    Greedily add the best-scoring dimensions while every cell still fills
+    MIN_CELL_BLOCKS blocks. Cells are counted per range partition, assuming
+    independent columns (the product of COLCARDs, capped by the row count).
+    """
+    pages_per_partition = profile.pages / max(1, partitions)
+    rows_per_partition = profile.rows / max(1, partitions)
+    min_cell_pages = MIN_CELL_BLOCKS * extent_pages
+    chosen = []
+    cells = 1
+    for candidate in dimension_candidates(profile, usage, partition_column, today):
+        if len(chosen) >= max_dimensions:
+            break
+        trial = min(rows_per_partition, cells * candidate["cardinality"])
+        if pages_per_partition / trial < min_cell_pages:
+            continue
+        chosen.append(candidate)
+        cells = trial
+    if not chosen:
+        return None
+
+    pages_per_cell = pages_per_partition / cells
+    # The last block of every cell is half empty on average
+    wasted_pages = cells * max(1, partitions) * extent_pages / 2
+    return {
+        "dimensions": [c["column"] for c in chosen],
+        "generated_columns": [{"column": c["column"], "expression": c["generated"], "source": c["source"]}
+                              for c in chosen if c["generated"]],
+        "cardinalities": {c["column"]: c["cardinality"] for c in chosen},
+        "cells_per_partition": round(cells),
+        "cells": round(cells * max(1, partitions)),
+        "rows_per_cell": round(rows_per_partition / cells),
+        "blocks_per_cell": round(pages_per_cell / extent_pages, 1),
+        "estimated_space_overhead_pct": round(100.0 * wasted_pages / profile.pages, 1),
+        "clause": f"ORGANIZE BY DIMENSIONS ({', '.join(c['column'] for c in chosen)})"
+    }
+
+
+def generate_rebuild_ddl(profile: TableProfile, partitioning: Dict[str, Any], mdc: Dict[str, Any]) -> List[str]:
+    """DB2 statements that add generated dimension columns and move the table online into the new layout."""
+    statements = []
+    generated = mdc["generated_columns"] if mdc else []
+    if generated:
+        statements.append(f"SET INTEGRITY FOR {profile.sql_name} OFF;")
+        for column in generated:
+            statements.append(f"ALTER TABLE {profile.sql_name} ADD COLUMN {column['column']} INTEGER "
+                              f"GENERATED ALWAYS AS ({column['expression']});")
+        statements.append(f"SET INTEGRITY FOR {profile.sql_name} IMMEDIATE CHECKED FORCE GENERATED;")
+
+    organize = mdc["clause"] if mdc else ""
+    data_part = partitioning["clause"].replace("'", "''") if partitioning else ""
+    # ADMIN_MOVE_TABLE takes the schema and table exactly as the catalog stores them
+    schema = "'" + profile.schema.replace("'", "''") + "'" if profile.schema else "CURRENT SCHEMA"
+    table_name = profile.catalog_name.replace("'", "''")
+    statements.append(f"CALL SYSPROC.ADMIN_MOVE_TABLE({schema}, '{table_name}', '', '', '', "
+                      f"'{organize}', '', '{data_part}', '', '', 'MOVE');")
+    statements.append(f"RUNSTATS ON TABLE {profile.sql_name} WITH DISTRIBUTION AND INDEXES ALL;")
+    return statements
+
+
+def recommend_layouts(model: Dict[str, Any], catalog: CatalogStats, workload: List[Tuple[str, float]] = None,
+                      dialect: str = None, min_rows: int = MIN_TABLE_ROWS, extent_pages: int = EXTENT_PAGES,
+                      max_dimensions: int = MAX_DIMENSIONS, today: date = None) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    """
+    Recommend range partitioning and MDC for every table with at least min_rows rows.
+    Returns the recommendations (largest tables first) and a summary.
+    """
+    usage, errors = collect_column_usage(model, workload or [], dialect)
+    recommendations = []
+    skipped = []
+    for table in model["tables"].values():
+        stats = catalog.table(table["name"])
+        if stats is None or stats["CARD"] is None:
+            skipped.append({"table": table["name"], "reason": "no statistics"})
+            continue
+        if stats["CARD"] < min_rows:
+            continue
+        profile = TableProfile(table, stats, catalog)
+        table_usage = usage.get(table["name"].lower(), {})
+        partitioning = recommend_range_partitioning(profile, table_usage, today)
+        partitions = partitioning["partitions"] if partitioning else 1
+        mdc = recommend_mdc(profile, table_usage, partitions, extent_pages, max_dimensions,
+                            partitioning["column"] if partitioning else None, today)
+        if partitioning is None and mdc is None:
+            skipped.append({"table": table["name"], "reason": "no suitable partitioning or dimension columns"})
+            continue
+        recommendations.append({
+            "table": profile.qualified_name,
+            "rows": profile.rows,
+            "pages": profile.pages,
+            "range_partitioning": partitioning,
+            "mdc": mdc,
+            "ddl": generate_rebuild_ddl(profile, partitioning, mdc)
+        })
+    recommendations.sort(key=lambda r: (-r["rows"], r["table"].lower()))
+
+    summary = {
+        "tables": len(model["tables"]),
+        "queries": len(workload or []),
+        "recommendations": len(recommendations),
+        "skipped": skipped,
+        "errors": errors
+    }
+    return recommendations, summary
+
+
+def main():
+    """Main entry point for the script."""
+    positional, options = split_cli_args(sys.argv[1:])
+    if len(positional) < 2:
+        print(json.dumps({"error": "Usage: sql_partition_advisor.py <schema_ddl_or_mmd> <syscat_export[,more_exports]> [dialect] [--workload=file] [--min-rows=N] [--extent-pages=N] [--max-dimensions=N] [--format=sql|json]"}), file=sys.stderr)
+        sys.exit(1)
+
+    schema_file = positional[0]
+    export_files = [path for path in positional[1].split(',') if path]
+    dialect = positional[2] if len(positional) > 2 and positional[2] else None
+
+    try:
+        recommendations, summary = recommend_layouts(
+            load_schema_model(schema_file),
+            load_catalog_stats(export_files),
+            load_workload(options["workload"]) if options.get("workload") else None,
+            dialect,
+            min_rows=int(options.get("min-rows", str(MIN_TABLE_ROWS))),
+            extent_pages=int(options.get("extent-pages", str(EXTENT_PAGES))),
+            max_dimensions=int(options.get("max-dimensions", str(MAX_DIMENSIONS)))
+        )
+
+        if options.get("format", "sql") == "json":
+            print(json.dumps({"summary": summary, "recommendations": recommendations}, indent=2))
+        else:
+            print(f"-- Partitioning and MDC recommendations for {schema_file} ({summary['recommendations']} tables)")
+            for recommendation in recommendations:
+                print(f"\n-- {recommendation['table']}: {recommendation['rows']:,} rows, {recommendation['pages']:,} pages")
+                partitioning = recommendation["range_partitioning"]
+                if partitioning:
+                    print(f"-- range partitioning on {partitioning['column']}: {partitioning['partitions']} partitions "
+                          f"of {partitioning['every']} (~{partitioning['rows_per_partition']:,} rows each)")
+                    for note in partitioning["notes"]:
+                        print(f"--   note: {note}")
+                mdc = recommendation["mdc"]
+                if mdc:
+                    print(f"-- MDC dimensions ({', '.join(mdc['dimensions'])}): {mdc['cells_per_partition']:,} cells per "
+                          f"partition, ~{mdc['blocks_per_cell']} blocks per cell, "
+                          f"~{mdc['estimated_space_overhead_pct']}% space overhead")
+                for statement in recommendation["ddl"]:
+                    print(statement)
+
+        for error in summary["errors"]:
+            print(json.dumps({"warning": error}), file=sys.stderr)
+
+    except FileNotFoundError as e:
+        print(json.dumps({"error": f"File not found: {e.filename}"}), file=sys.stderr)
+        sys.exit(1)
+    except Exception as e:
+        print(json.dumps({"error": str(e)}), file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,665 @@
+#!/usr/bin/env python3
+"""
+Referentially consistent data subsetting from table exports.
+This script reads a schema (DDL or Mermaid ERD, loaded through sql_to_mmd) and
+a directory of delimited table exports (DB2 DEL, PostgreSQL COPY text or the
+SQLite CSV files sql_datagen writes), selects the rows matching seed predicates
+on a few driving tables, follows FKs down to their child rows and up to every
+parent row those rows need, and writes the subset as bulk-load files with a
+load script. Exports are streamed once per pass; only the keys of selected
+rows are kept in memory (as hashes, or in Bloom filters with --bloom), so
+memory follows the subset size rather than the export size.
+"""
+
+import sys
+import os
+import re
+import csv
+import json
+import math
+import time
+from typing import List, Dict, Any, Tuple, Callable
+
+try:
+    import sqlglot
+    from sqlglot import exp
+except ImportError:
+    print(json.dumps({"error": "SQLGlot not installed. Please install with: pip install sqlglot"}), file=sys.stderr)
+    sys.exit(1)
+
+from sql_to_mmd import load_schema_model, table_for
+from sql_dialect_translate import BULK_LOAD_TARGETS, BULK_NULL_MARKER, split_cli_args
+from fk_graph import FkGraph
+
+
+# Export file extensions and the bulk-load target their format belongs to
+EXPORT_FORMATS = {".del": "db2", ".tsv": "postgres", ".csv": "sqlite"}
+
+# Passes over one FK cycle (or self-referencing table) before giving up on a fixpoint
+MAX_CYCLE_PASSES = 50
+
+DEFAULT_BLOOM_ERROR_RATE = 0.01
+
+# A full Bloom key set adds a slice this many times larger, with its error rate
+# multiplied by BLOOM_TIGHTENING, so the combined false-positive rate stays
+# below the requested one however far --bloom underestimates the keys
+BLOOM_GROWTH = 2
+BLOOM_TIGHTENING = 0.5
+
+_CHUNK_SUFFIX_RE = re.compile(r'_\d{4}$')
+_INT_RE = re.compile(r'^[+-]?\d+$')
+_NUMBER_RE = re.compile(r'^[+-]?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?$')
+_DB2_TIMESTAMP_RE = re.compile(r'^(\d{4}-\d{2}-\d{2})[ T-](\d{2})[:.](\d{2})[:.](\d{2})(\.\d+)?$')
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over key hashes, probed by double hashing."""
+
+    def __init__(self, capacity: int, error_rate: float = DEFAULT_BLOOM_ERROR_RATE):
+        capacity = max(1, capacity)
+        self.size = max(64, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.probes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key: int):
+        first = key & 0xFFFFFFFF
+        second = ((key >> 32) & 0xFFFFFFFF) | 1
+        for i in range(self.probes):
+            yield (first + i * second) % self.size
+
+    def add(self, key: int):
+        # Only keys that set a new bit are counted, so repeats do not fill the filter's capacity
+        new = False
+        for position in self._positions(key):
+            mask = 1 << (position & 7)
+            if not self.bits[position >> 3] & mask:
+                self.bits[position >> 3] |= mask
+                new = True
+        if new:
+            self.count += 1
+
+    def __contains__(self, key: int) -> bool:
+        if key is None:
+            return False
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+    def __len__(self) -> int:
+        return self.count
+
+    def false_positive_rate(self) -> float:
+        """Estimated false-positive rate from the fraction of bits set."""
+        filled = int.from_bytes(self.bits, "little").bit_count() / self.size
+        return filled ** self.probes
+
+
+class ScalableBloomFilter:
+    """
+    Bloom key set that grows instead of saturating: once the current slice
+    holds its capacity, keys go to a new, larger slice with a tighter error
+    rate. A key is present when any slice has it.
+    """
+
+    def __init__(self, capacity: int, error_rate: float = DEFAULT_BLOOM_ERROR_RATE):
+        self.capacity = max(1, capacity)
+        self.error_rate = error_rate
+        self.slices = [BloomFilter(self.capacity, error_rate * (1 - BLOOM_TIGHTENING))]
+
+    def add(self, key: int):
+        # Parent keys arrive once per referencing row; only distinct keys take up capacity
+        if key in self:
+            return
+        current = self.slices[-1]
+        if current.count >= self.capacity * BLOOM_GROWTH ** (len(self.slices) - 1):
+            current = BloomFilter(self.capacity * BLOOM_GROWTH ** len(self.slices),
+                                  self.error_rate * (1 - BLOOM_TIGHTENING) * BLOOM_TIGHTENING ** len(self.slices))
+            self.slices.append(current)
+        current.add(key)
+
+    def __contains__(self, key: int) -> bool:
+        return any(key in bloom for bloom in self.slices)
+
+    def __len__(self) -> int:
+        return sum(bloom.count for bloom in self.slices)
+
+    def false_positive_rate(self) -> float:
+        """Estimated chance that a key never added is reported present by some slice."""
+        miss = 1.0
+        for bloom in self.slices:
+            miss *= 1 - bloom.false_positive_rate()
+        return 1 - miss
+
+
+def normalize_key_value(value: str) -> str:
+    """
+    Canonical text of a key field, so the same key matches across tables and
+    formats: CHAR padding dropped, numbers without leading zeros or sign.
+    """
+    if value is None:
+        return None
+    value = value.rstrip(' ')
+    if _INT_RE.match(value):
+        return str(int(value))
+    if _NUMBER_RE.match(value):
+        from decimal import Decimal
+        return format(Decimal(value).normalize(), 'f')
+    return value
+
+
+def key_hash(fields: List[str], positions: List[int]):
+    """Hash of the key at the given field positions, or None when any part is NULL (MATCH SIMPLE)."""
+    values = tuple(normalize_key_value(fields[i]) for i in positions)
+    return None if None in values else hash(values)
+
+
+def split_del_fields(record: str, delimiter: str = ',') -> List[str]:
+    """Fields of one DB2 DEL record; an unquoted empty field is NULL, "" is an empty string."""
+    fields = []
+    i = 0
+    while True:
+        if record.startswith('"', i):
+            parts = []
+            j = i + 1
+            while True:
+                k = record.index('"', j)
+                parts.append(record[j:k])
+                if record.startswith('"', k + 1):
+                    parts.append('"')
+                    j = k + 2
+                    continue
+                i = k + 1
+                break
+            fields.append(''.join(parts))
+            k = record.find(delimiter, i)
+            if k < 0:
+                return fields
+            i = k + 1
+        else:
+            k = record.find(delimiter, i)
+            value = (record[i:] if k < 0 else record[i:k]).strip()
+            fields.append(value or None)
+            if k < 0:
+                return fields
+            i = k + 1
+
+
+def _unescape_copy(value: str) -> str:
+    if value == BULK_NULL_MARKER:
+        return None
+    if '\\' not in value:
+        return value
+    return re.sub(r'\\(.)', lambda m: {'t': '\t', 'n': '\n', 'r': '\r'}.get(m.group(1), m.group(1)), value)
+
+
+class ExportReader:
+    """Streams the records of one table's export files as (record text, fields)."""
+
+    def __init__(self, paths: List[str], export_format: str):
+        self.paths = paths
+        self.format = export_format
+        self.header = None
+        if export_format == "sqlite" and paths:
+            with open(paths[0], 'r', encoding='utf-8', newline='') as f:
+                self.header = next(csv.reader(f), [])
+
+    def __iter__(self):
+        for path in self.paths:
+            with open(path, 'r', encoding='utf-8', newline='') as f:
+                if self.format == "sqlite":
+                    reader = csv.reader(f)
+                    next(reader, None)
+                    for row in reader:
+                        if row:
+                            yield row, [None if value == BULK_NULL_MARKER else value for value in row]
+                elif self.format == "postgres":
+                    for line in f:
+                        record = line.rstrip('\r\n')
+                        if record:
+                            yield record, [_unescape_copy(value) for value in record.split('\t')]
+                else:
+                    # Quoted DEL strings may span lines; doubled quotes keep the count even
+                    pending = ''
+                    for line in f:
+                        pending += line
+                        if pending.count('"') % 2:
+                            continue
+                        record = pending.rstrip('\r\n')
+                        pending = ''
+                        if record:
+                            yield record, split_del_fields(record)
+
+
+def find_exports(export_dir: str, model: Dict[str, Any]) -> Tuple[str, Dict[str, List[str]]]:
+    """
+    Export files per table key: <table>.<ext>, <schema>.<table>.<ext> or the
+    <table>_NNNN.<ext> chunks sql_datagen writes. Returns the export format too.
+    """
+    exports = {}
+    formats = set()
+    for name in sorted(os.listdir(export_dir)):
+        stem, extension = os.path.splitext(name)
+        if extension.lower() not in EXPORT_FORMATS:
+            continue
+        table = table_for(model, _CHUNK_SUFFIX_RE.sub('', stem))
+        if table is None:
+            continue
+        formats.add(EXPORT_FORMATS[extension.lower()])
+        exports.setdefault(table["name"].lower(), []).append(os.path.join(export_dir, name))
+    if len(formats) > 1:
+        raise ValueError(f"Exports in {export_dir} mix formats ({', '.join(sorted(formats))}); use one format per run")
+    if not formats:
+        raise ValueError(f"No table exports (.del, .tsv or .csv) for schema tables found in {export_dir}")
+    return formats.pop(), exports
+
+
+def _typed(value):
+    """Comparable form of a field or literal: int, float or text with DB2 timestamps in ISO form."""
+    if value is None or isinstance(value, (int, float, bool)):
+        return value
+    text = value.strip()
+    if _INT_RE.match(text):
+        return int(text)
+    if _NUMBER_RE.match(text):
+        return float(text)
+    match = _DB2_TIMESTAMP_RE.match(text)
+    if match:
+        return f"{match.group(1)} {match.group(2)}:{match.group(3)}:{match.group(4)}{match.group(5) or ''}"
+    return value.rstrip(' ')
+
+
+def _compare(left, right, operator: Callable):
+    if left is None or right is None:
+        return None
+    if isinstance(left, str) != isinstance(right, str):
+        left, right = str(left), str(right)
+    return operator(left, right)
+
+
+def compile_predicate(predicate: str, columns: List[str]) -> Callable[[List[str]], bool]:
+    """
+    Compile a seed predicate (SQL WHERE syntax: comparisons, IN, BETWEEN, LIKE,
+    IS NULL, AND/OR/NOT, MOD, UPPER/LOWER) into a function over a record's fields.
+    Raises ValueError for unknown columns or unsupported syntax.
+    """
+    import operator
+
+    positions = {name.lower(): i for i, name in enumerate(columns)}
+    comparisons = {exp.EQ: operator.eq, exp.NEQ: operator.ne, exp.GT: operator.gt,
+                   exp.GTE: operator.ge, exp.LT: operator.lt, exp.LTE: operator.le}
+
+    def build(node):
+        if isinstance(node, exp.Paren):
+            return build(node.this)
+        if isinstance(node, exp.Column):
+            if node.name.lower() not in positions:
+                raise ValueError(f"Unknown column in seed predicate: {node.name}")
+            position = positions[node.name.lower()]
+            return lambda fields: _typed(fields[position]) if position < len(fields) else None
+        if isinstance(node, exp.Literal):
+            value = node.this if node.is_string else _typed(node.this)
+            value = _typed(value) if node.is_string and _DB2_TIMESTAMP_RE.match(value) else value
+            return lambda fields: value
+        if isinstance(node, exp.Null):
+            return lambda fields: None
+        if isinstance(node, exp.Boolean):
+            return lambda fields: node.this
+        if isinstance(node, exp.Neg):
+            inner = build(node.this)
+            return lambda fields: None if inner(fields) is None else -inner(fields)
+        if isinstance(node, (exp.Upper, exp.Lower)):
+            inner = build(node.this)
+            convert = str.upper if isinstance(node, exp.Upper) else str.lower
+            return lambda fields: None if inner(fields) is None else convert(str(inner(fields)))
+        if isinstance(node, exp.Mod):
+            left, right = build(node.this), build(node.expression)
+
+            def mod(fields):
+                a, b = left(fields), right(fields)
+                return None if a is None or b is None or not b else a % b
+            return mod
+        if type(node) in comparisons:
+            left, right, compare = build(node.this), build(node.expression), comparisons[type(node)]
+            return lambda fields: _compare(left(fields), right(fields), compare)
+        if isinstance(node, exp.And):
+            left, right = build(node.this), build(node.expression)
+
+            def both(fields):
+                a = left(fields)
+                if a is False:
+                    return False
+                b = right(fields)
+                return False if b is False else (None if a is None or b is None else True)
+            return both
+        if isinstance(node, exp.Or):
+            left, right = build(node.this), build(node.expression)
+
+            def either(fields):
+                a = left(fields)
+                if a is True:
+                    return True
+                b = right(fields)
+                return True if b is True else (None if a is None or b is None else False)
+            return either
+        if isinstance(node, exp.Not):
+            inner = build(node.this)
+            return lambda fields: None if inner(fields) is None else not inner(fields)
+        if isinstance(node, exp.Is) and isinstance(node.expression, exp.Null):
+            inner = build(node.this)
+            return lambda fields: inner(fields) is None
+        if isinstance(node, exp.In) and not node.args.get("query"):
+            inner = build(node.this)
+            values = [build(value) for value in node.expressions]
+
+            def contains(fields):
+                a = inner(fields)
+                results = [_compare(a, value(fields), operator.eq) for value in values]
+                return True if True in results else (None if None in results else False)
+            return contains
+        if isinstance(node, exp.Between):
+            inner, low, high = build(node.this), build(node.args["low"]), build(node.args["high"])
+
+            def between(fields):
+                a = inner(fields)
+                lower, upper = _compare(a, low(fields), operator.ge), _compare(a, high(fields), operator.le)
+                return None if lower is None or upper is None else lower and upper
+            return between
+        if isinstance(node, (exp.Like, exp.ILike)) and isinstance(node.expression, exp.Literal):
+            inner = build(node.this)
+            pattern = ''.join('.*' if c == '%' else '.' if c == '_' else re.escape(c) for c in node.expression.this)
+            regex = re.compile(f"^{pattern}$", re.DOTALL | (re.IGNORECASE if isinstance(node, exp.ILike) else 0))
+            return lambda fields: None if inner(fields) is None else bool(regex.match(str(inner(fields))))
+        raise ValueError(f"Unsupported seed predicate syntax: {node.sql()}")
+
+    try:
+        tree = exp.condition(predicate)
+    except Exception as e:
+        raise ValueError(f"Cannot parse seed predicate '{predicate}': {str(e).splitlines()[0]}")
+    test = build(tree)
+    return lambda fields: test(fields) is True
+
+
+def parse_seed(seed: str) -> Tuple[str, str]:
+    """'table:predicate' (or just 'table' for every row) as (table, predicate)."""
+    table, _, predicate = seed.partition(':')
+    return table.strip(), predicate.strip() or None
+
+
+def write_load_script(tables: List[Dict[str, Any]], target: str, output_dir: str,
+                      db2_command: str = "LOAD") -> str:
+    """Load script in parent-before-child order, with SET INTEGRITY after DB2 LOAD."""
+    script_path = os.path.join(output_dir, BULK_LOAD_TARGETS[target]["script"])
+    with open(script_path, 'w', encoding='utf-8', newline='\n') as script:
+        for table in tables:
+            column_list = ', '.join(table["columns"])
+            file_name = table["file"]
+            if target == "db2":
+                if db2_command == "IMPORT":
+                    script.write(f"IMPORT FROM '{file_name}' OF DEL MODIFIED BY CODEPAGE=1208 COMMITCOUNT AUTOMATIC "
+                                 f"INSERT INTO {table['name']} ({column_list});\n")
+                else:
+                    script.write(f"LOAD FROM '{file_name}' OF DEL MODIFIED BY CODEPAGE=1208 "
+                                 f"INSERT INTO {table['name']} ({column_list}) NONRECOVERABLE;\n")
+            elif target == "postgres":
+                script.write(f"\\copy {table['name']} ({column_list}) FROM '{file_name}'\n")
+            else:
+                staging = f"_subset_{os.path.splitext(file_name)[0]}"
+                select_list = ', '.join(f"NULLIF(\"{name}\", '{BULK_NULL_MARKER}')" for name in table["columns"])
+                script.write(f".import --csv '{file_name}' {staging}\n")
+                script.write(f"INSERT INTO {table['name']} ({column_list}) SELECT {select_list} FROM {staging};\n")
+                script.write(f"DROP TABLE {staging};\n")
+
+        if target == "db2" and db2_command != "IMPORT":
+            # LOAD leaves tables with FKs in set integrity pending state
+            checked = [table["name"] for table in tables if table["has_fks"]]
+            if checked:
+                script.write(f"SET INTEGRITY FOR {', '.join(checked)} IMMEDIATE CHECKED;\n")
+    return script_path
+
+
+def subset_exports(model: Dict[str, Any], export_dir: str, output_dir: str, seeds: List[str],
+                   follow_children: bool = True, bloom_capacity: int = 0,
+                   bloom_error_rate: float = DEFAULT_BLOOM_ERROR_RATE, max_passes: int = MAX_CYCLE_PASSES,
+                   db2_command: str = "LOAD") -> Dict[str, Any]:
+    """
+    Select the seed rows, their descendants (unless follow_children is off) and
+    every ancestor row those need, then write them as bulk-load files.
+    Pass 1 walks the FK DAG parents-first, taking rows that match a seed or
+    reference a row taken in this pass; pass 2 walks it children-first, taking
+    every parent row a taken row references; pass 3 writes the taken rows.
+    FK cycles and self-references are re-read until no new rows are taken.
+    """
+    started = time.perf_counter()
+    export_format, exports = find_exports(export_dir, model)
+    graph = FkGraph.from_model(model)
+    warnings = []
+
+    layouts = {}
+    for key, table in model["tables"].items():
+        reader = ExportReader(exports.get(key, []), export_format)
+        columns = reader.header or table["column_order"]
+        positions = {name.lower(): i for i, name in enumerate(columns)}
+        missing = [name for name in table["primary_keys"] if name.lower() not in positions]
+        layouts[key] = {
+            "reader": reader,
+            "columns": columns,
+            "positions": positions,
+            "identity": None if missing or not table["primary_keys"]
+            else [positions[name.lower()] for name in table["primary_keys"]]
+        }
+
+    def positions_of(table_key: str, names: List[str]) -> List[int]:
+        positions = layouts[table_key]["positions"]
+        unknown = [name for name in names if name.lower() not in positions]
+        if unknown:
+            raise ValueError(f"Export of {model['tables'][table_key]['name']} has no column(s) {', '.join(unknown)}")
+        return [positions[name.lower()] for name in names]
+
+    # FK edges with field positions on both sides
+    parent_edges = {key: [] for key in model["tables"]}
+    referenced = {key: {} for key in model["tables"]}
+    for edge in graph.edges:
+        parent, child = edge["parent"].lower(), edge["child"].lower()
+        parent_columns = tuple(name.lower() for name in edge["parent_columns"])
+        parent_edges[child].append((parent, parent_columns, positions_of(child, edge["child_columns"])))
+        referenced[parent][parent_columns] = positions_of(parent, list(parent_columns))
+
+    predicates = {}
+    for seed in seeds:
+        name, predicate = parse_seed(seed)
+        table = table_for(model, name)
+        if table is None:
+            raise ValueError(f"Seed table {name} is not in the schema")
+        key = table["name"].lower()
+        test = compile_predicate(predicate, layouts[key]["columns"]) if predicate else (lambda fields: True)
+        predicates.setdefault(key, []).append(test)
+    for key in predicates:
+        if key not in exports:
+            warnings.append(f"Seed table {model['tables'][key]['name']} has no export in {export_dir}")
+
+    def new_key_set():
+        return ScalableBloomFilter(bloom_capacity, bloom_error_rate) if bloom_capacity else set()
+
+    taken = {key: set() for key in model["tables"]}
+    taken_down = {}   # (table, referenced columns) -> keys of rows taken in pass 1
+    required = {}     # (table, referenced columns) -> keys some taken row references
+    stats = {key: {"rows_read": 0, "scans": 0} for key in model["tables"]}
+
+    def identity(table_key, record, fields):
+        positions = layouts[table_key]["identity"]
+        if positions is None:
+            return hash(record if isinstance(record, str) else tuple(record))
+        return hash(tuple(normalize_key_value(fields[i]) for i in positions))
+
+    def scan(table_key):
+        stats[table_key]["scans"] += 1
+        for record, fields in layouts[table_key]["reader"]:
+            stats[table_key]["rows_read"] += 1
+            yield record, fields, identity(table_key, record, fields)
+
+    def take(table_key, fields, row_id, downward):
+        taken[table_key].add(row_id)
+        for parent, parent_columns, positions in parent_edges[table_key]:
+            key = key_hash(fields, positions)
+            if key is not None:
+                if (parent, parent_columns) not in required:
+                    required[(parent, parent_columns)] = new_key_set()
+                required[(parent, parent_columns)].add(key)
+        if downward:
+            for columns, positions in referenced[table_key].items():
+                key = key_hash(fields, positions)
+                if key is not None:
+                    if (table_key, columns) not in taken_down:
+                        taken_down[(table_key, columns)] = new_key_set()
+                    taken_down[(table_key, columns)].add(key)
+
+    def run_component(members: List[str], select_row) -> int:
+        """Scan the tables of one DAG component until a pass takes no new rows."""
+        cyclic = len(members) > 1 or any(parent == members[0] for parent, _, _ in parent_edges[members[0]])
+        for _ in range(max_passes if cyclic else 1):
+            added = 0
+            for table_key in members:
+                test = select_row(table_key)
+                if test is None or table_key not in exports:
+                    continue
+                for record, fields, row_id in scan(table_key):
+                    if row_id not in taken[table_key] and test(fields):
+                        test.take(fields, row_id)
+                        added += 1
+            if not cyclic or added == 0:
+                return 0
+        return 1
+
+    # Pass 1: seed rows and (optionally) everything that references them, parents first
+    def downward_test(table_key):
+        tests = predicates.get(table_key, [])
+        links = []
+        if follow_children:
+            links = [(positions, taken_down[(parent, columns)]) for parent, columns, positions in parent_edges[table_key]
+                     if (parent, columns) in taken_down]
+        if not tests and not links:
+            return None
+
+        def test(fields):
+            return any(seed(fields) for seed in tests) or any(
+                key_hash(fields, positions) in keys for positions, keys in links)
+        test.take = lambda fields, row_id: take(table_key, fields, row_id, True)
+        return test
+
+    # Pass 2: every parent row a taken row references, children first
+    def upward_test(table_key):
+        links = [(positions, required[(table_key, columns)]) for columns, positions in referenced[table_key].items()
+                 if (table_key, columns) in required]
+        if not links:
+            return None
+
+        def test(fields):
+            return any(key_hash(fields, positions) in keys for positions, keys in links)
+        test.take = lambda fields, row_id: take(table_key, fields, row_id, False)
+        return test
+
+    unfinished = 0
+    for members in reversed(graph.components):
+        unfinished += run_component([graph.names[n].lower() for n in members], downward_test)
+    for members in graph.components:
+        unfinished += run_component([graph.names[n].lower() for n in members], upward_test)
+    if unfinished:
+        warnings.append(f"{unfinished} FK cycle(s) did not settle within {max_passes} passes; the subset may miss rows")
+    for (table_key, _), keys in required.items():
+        if keys and table_key not in exports:
+            warnings.append(f"Rows reference {model['tables'][table_key]['name']}, which has no export in {export_dir}")
+
+    # Pass 3: write the taken rows, parents first
+    os.makedirs(output_dir, exist_ok=True)
+    extension = next(ext for ext, target in EXPORT_FORMATS.items() if target == export_format)
+    written = []
+    result_tables = {}
+    for members in reversed(graph.components):
+        for node in members:
+            table_key = graph.names[node].lower()
+            table = model["tables"][table_key]
+            if not taken[table_key]:
+                result_tables[table["name"]] = {"rows": 0, "rows_read": stats[table_key]["rows_read"],
+                                                "scans": stats[table_key]["scans"], "file": None}
+                continue
+            file_name = (re.sub(r'[^\w.]+', '_', table["name"]).strip('_') or "table") + extension
+            count = 0
+            with open(os.path.join(output_dir, file_name), 'w', encoding='utf-8', newline='') as f:
+                writer = csv.writer(f, lineterminator='\n') if export_format == "sqlite" else None
+                if writer:
+                    writer.writerow(layouts[table_key]["columns"])
+                for record, fields, row_id in scan(table_key):
+                    if row_id in taken[table_key]:
+                        if writer:
+                            writer.writerow(record)
+                        else:
+                            f.write(record + '\n')
+                        count += 1
+            written.append({"name": table["name"], "columns": layouts[table_key]["columns"], "file": file_name,
+                            "has_fks": bool(parent_edges[table_key])})
+            result_tables[table["name"]] = {"rows": count, "rows_read": stats[table_key]["rows_read"],
+                                            "scans": stats[table_key]["scans"], "file": file_name}
+
+    script = write_load_script(written, export_format, output_dir, db2_command.upper())
+    result = {
+        "target": export_format,
+        "script": script,
+        "tables": result_tables,
+        "rows": sum(entry["rows"] for entry in result_tables.values()),
+        "key_sets": "bloom" if bloom_capacity else "hash",
+        "seconds": round(time.perf_counter() - started, 3),
+        "warnings": warnings
+    }
+    if bloom_capacity:
+        blooms = list(taken_down.values()) + list(required.values())
+        largest = max((len(bloom) for bloom in blooms), default=0)
+        grown = sum(1 for bloom in blooms if len(bloom.slices) > 1)
+        result["bloom"] = {
+            "capacity": bloom_capacity,
+            "error_rate": bloom_error_rate,
+            "key_sets": len(blooms),
+            "grown": grown,
+            "largest_keys": largest,
+            "false_positive_rate": round(max((bloom.false_positive_rate() for bloom in blooms), default=0.0), 6)
+        }
+        if grown:
+            warnings.append(f"--bloom={bloom_capacity} was undersized: {grown} key set(s) outgrew it "
+                            f"(largest holds about {largest} distinct keys) and added larger filters; "
+                            f"pass --bloom={largest} or more to keep one filter per key set")
+    return result
+
+
+def main():
+    """Main entry point for the script."""
+    positional, options = split_cli_args(sys.argv[1:])
+    if len(positional) < 4:
+        print(json.dumps({"error": "Usage: sql_subset.py <schema_ddl_or_mmd> <exports_dir> <output_dir> "
+                                   "<table[:predicate]> [more seeds...] [--no-children] [--bloom=expected_keys] "
+                                   "[--bloom-error=0.01] [--max-passes=N] [--db2-command=LOAD|IMPORT]"}), file=sys.stderr)
+        sys.exit(1)
+
+    try:
+        result = subset_exports(
+            load_schema_model(positional[0]),
+            positional[1],
+            positional[2],
+            positional[3:],
+            follow_children="no-children" not in options,
+            bloom_capacity=int(options.get("bloom", "0")),
+            bloom_error_rate=float(options.get("bloom-error", str(DEFAULT_BLOOM_ERROR_RATE))),
+            max_passes=max(1, int(options.get("max-passes", str(MAX_CYCLE_PASSES)))),
+            db2_command=options.get("db2-command", "LOAD")
+        )
+        for warning in result.pop("warnings"):
+            print(json.dumps({"warning": warning}), file=sys.stderr)
+        print(json.dumps(result, indent=2))
+
+    except FileNotFoundError as e:
+        print(json.dumps({"error": f"File not found: {e.filename}"}), file=sys.stderr)
+        sys.exit(1)
+    except Exception as e:
+        print(json.dumps({"error": str(e)}), file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
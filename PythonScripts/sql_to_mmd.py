@@ -6,7 +6,7 @@ This script parses SQL DDL and outputs Mermaid ERD diagram syntax.
 
 import sys
 import json
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Tuple
 
 try:
     import sqlglot
@@ -15,6 +15,23 @@ except ImportError:
     print(json.dumps({"error": "SQLGlot not installed. Please install with: pip install sqlglot"}), file=sys.stderr)
     sys.exit(1)
 
+from sql_type_model import mask_type_clauses, read_type, type_annotation
+from sql_parse_guard import ParseBudget, StatementSupervisor, guarded_call, record_diagnostic
+
+
+# Size classes for ERD entities by data pages (NPAGES): (class name, minimum pages, Mermaid style)
+SIZE_CLASSES = [
+    ("huge", 100000, "fill:#f8d7da,stroke:#c0392b,stroke-width:3px"),
+    ("large", 10000, "fill:#fde2c4,stroke:#d35400,stroke-width:2px"),
+    ("medium", 1000, "fill:#fff3cd,stroke:#b7950b"),
+    ("small", 0, "fill:#e8f5e9,stroke:#2e7d32")
+]
+NO_STATS_CLASS = ("nostats", "fill:#eeeeee,stroke:#999999,stroke-dasharray:5 5")
+VIEW_CLASS = ("view", "fill:#e3f2fd,stroke:#1565c0,stroke-dasharray:3 3")
+
+# Views nested at least this deep are flagged for flattening
+DEEP_VIEW_DEPTH = 3
+
 
 def clean_tsql_brackets(sql: str) -> str:
     """Remove T-SQL/MS SQL Server bracket notation [identifier]."""
@@ -28,36 +45,55 @@ def clean_tsql_brackets(sql: str) -> str:
     return sql
 
 
-def parse_sql_to_tables(sql: str):
-    """Parse SQL DDL and extract table definitions and indexes."""
+def parse_sql_to_tables(sql: str, budget: ParseBudget = None, diagnostics: List[Dict[str, Any]] = None,
+                        views: List[Dict[str, Any]] = None):
+    """
+    Parse SQL DDL and extract table definitions and indexes; CREATE VIEW
+    definitions are appended to views when a list is given.
+    With a ParseBudget, statements are parsed one at a time under its token,
+    depth and time limits; statements over budget are skipped and recorded in
+    diagnostics instead of stalling the whole conversion.
+    """
     tables = []
     alter_foreign_keys = []  # Store FK from ALTER TABLE statements
     indexes = []  # Store CREATE INDEX statements
+    if diagnostics is None:
+        diagnostics = []
+    
+    def collect(kind: str, info: Dict[str, Any]):
+        if not info:
+            return
+        if kind == "table":
+            tables.append(info)
+        elif kind == "index":
+            indexes.append(info)
+        elif kind == "alter_fk":
+            alter_foreign_keys.append(info)
+        elif kind == "view" and views is not None:
+            views.append(info)
     
     try:
         # Clean T-SQL brackets first
         sql = clean_tsql_brackets(sql)
         
-        # Parse SQL statements
-        statements = parse(sql)
-        
-        for statement in statements:
-            if isinstance(statement, exp.Create) and statement.kind == "TABLE":
-                table_info = extract_table_info(statement)
-                if table_info:
-                    tables.append(table_info)
-            
-            elif isinstance(statement, exp.Create) and statement.kind == "INDEX":
-                # Extract index information
-                index_info = extract_index_info(statement)
-                if index_info:
-                    indexes.append(index_info)
+        if budget is None:
+            # Parse SQL statements; DB2 type clauses SQLGlot cannot parse are masked,
+            # and the exact column types are read back from the unmasked text
+            for statement in parse(mask_type_clauses(sql)):
+                collect(*classify_statement(statement, sql))
+        else:
+            from sql_dialect_translate import split_sql_statements
             
-            elif isinstance(statement, exp.Alter):
-                # Extract foreign keys from ALTER TABLE statements
-                fk_info = extract_alter_table_foreign_key(statement)
-                if fk_info:
-                    alter_foreign_keys.append(fk_info)
+            with StatementSupervisor(budget) as supervisor:
+                for index, text in enumerate(split_sql_statements(sql), 1):
+                    status, result = guarded_call(supervisor, parse_statement_text, text)
+                    if status == "over_budget":
+                        record_diagnostic(diagnostics, index, text, result, "skipped")
+                    elif status == "error":
+                        raise Exception(result)
+                    else:
+                        for kind, info in result:
+                            collect(kind, info)
     
     except Exception as e:
         raise Exception(f"SQL parsing failed: {str(e)}")
@@ -78,8 +114,30 @@ def parse_sql_to_tables(sql: str):
     return tables, indexes
 
 
-def extract_table_info(create_statement: exp.Create) -> Dict[str, Any]:
-    """Extract table information from CREATE TABLE statement."""
+def classify_statement(statement: exp.Expression, source: str = None) -> Tuple[str, Dict[str, Any]]:
+    """Kind ("table", "index", "view", "alter_fk" or None) and extracted info of a parsed DDL statement."""
+    if isinstance(statement, exp.Create) and statement.kind == "TABLE":
+        return "table", extract_table_info(statement, source)
+    if isinstance(statement, exp.Create) and statement.kind == "VIEW":
+        return "view", extract_view_info(statement)
+    if isinstance(statement, exp.Create) and statement.kind == "INDEX":
+        return "index", extract_index_info(statement)
+    if isinstance(statement, exp.Alter):
+        # Extract foreign keys from ALTER TABLE statements
+        return "alter_fk", extract_alter_table_foreign_key(statement)
+    return None, None
+
+
+def parse_statement_text(text: str) -> List[Tuple[str, Dict[str, Any]]]:
+    """Parse one statement's text into (kind, info) pairs; runs in the parse worker under a budget."""
+    return [classify_statement(statement, text) for statement in parse(mask_type_clauses(text)) if statement]
+
+
+def extract_table_info(create_statement: exp.Create, source: str = None) -> Dict[str, Any]:
+    """
+    Extract table information from CREATE TABLE statement.
+    source is the text the statement was parsed from, for exact column types.
+    """
     # SQLGlot CREATE TABLE has a Schema object in 'this'
     # The Schema has a Table object in its 'this' attribute
     schema_obj = create_statement.this
@@ -115,12 +173,21 @@ def extract_table_info(create_statement: exp.Create) -> Dict[str, Any]:
     primary_keys = []
     foreign_keys = []
     unique_constraints = []
+    unique_keys = []  # one column list per UNIQUE constraint
+    
+    # Named table constraints (CONSTRAINT name ...) wrap the actual constraint
+    table_elements = []
+    for expr in create_statement.this.expressions or []:
+        if isinstance(expr, exp.Constraint):
+            table_elements.extend(expr.expressions)
+        else:
+            table_elements.append(expr)
     
     # Extract column definitions
-    if create_statement.this.expressions:
-        for expr in create_statement.this.expressions:
+    if table_elements:
+        for expr in table_elements:
             if isinstance(expr, exp.ColumnDef):
-                column_info = extract_column_info(expr)
+                column_info = extract_column_info(expr, source)
                 columns.append(column_info)
                 
                 # Track primary keys
@@ -130,6 +197,7 @@ def extract_table_info(create_statement: exp.Create) -> Dict[str, Any]:
                 # Track unique constraints
                 if column_info.get("is_unique"):
                     unique_constraints.append(column_info["name"])
+                    unique_keys.append([column_info["name"]])
             
             elif isinstance(expr, exp.PrimaryKey):
                 # Table-level primary key - properly extract column names
@@ -142,10 +210,11 @@ def extract_table_info(create_statement: exp.Create) -> Dict[str, Any]:
                 if fk_info:
                     foreign_keys.append(fk_info)
             
-            elif isinstance(expr, exp.Unique):
+            elif isinstance(expr, exp.UniqueColumnConstraint) and isinstance(expr.this, exp.Schema):
                 # Unique constraint - properly extract column names
-                unique_cols = [str(col.name) if hasattr(col, 'name') else str(col) for col in expr.expressions]
+                unique_cols = [str(col.name) if hasattr(col, 'name') else str(col) for col in expr.this.expressions]
                 unique_constraints.extend(unique_cols)
+                unique_keys.append(unique_cols)
     
     # Mark columns as FK if they're in foreign keys
     fk_column_names = set()
@@ -162,12 +231,17 @@ def extract_table_info(create_statement: exp.Create) -> Dict[str, Any]:
         "columns": columns,
         "primary_keys": primary_keys,
         "foreign_keys": foreign_keys,
-        "unique_constraints": unique_constraints
+        "unique_constraints": unique_constraints,
+        "unique_keys": unique_keys
     }
 
 
-def extract_column_info(column_def: exp.ColumnDef) -> Dict[str, Any]:
-    """Extract column information from column definition."""
+def extract_column_info(column_def: exp.ColumnDef, source: str = None) -> Dict[str, Any]:
+    """
+    Extract column information from column definition.
+    With the source text, sql_type is the type exactly as written there
+    (SQLGlot's data_type drops DB2 units, CCSID, FOR BIT DATA and LOB K/M/G lengths).
+    """
     # Properly extract column name as string
     col_obj = column_def.this
     if hasattr(col_obj, 'name'):
@@ -177,6 +251,11 @@ def extract_column_info(column_def: exp.ColumnDef) -> Dict[str, Any]:
     
     data_type = str(column_def.kind) if column_def.kind else "VARCHAR"
     
+    sql_type = None
+    name_end = col_obj.meta.get("end") if isinstance(col_obj, exp.Expression) else None
+    if source and name_end is not None and column_def.kind:
+        sql_type = read_type(source, name_end + 1)
+    
     # Parse constraints
     is_primary_key = False
     is_foreign_key = False
@@ -205,6 +284,7 @@ def extract_column_info(column_def: exp.ColumnDef) -> Dict[str, Any]:
     return {
         "name": column_name,
         "data_type": data_type,
+        "sql_type": sql_type or data_type,
         "is_primary_key": is_primary_key,
         "is_foreign_key": is_foreign_key,
         "is_unique": is_unique,
@@ -264,12 +344,20 @@ def extract_foreign_key(fk_expr: exp.ForeignKey, table_name: str) -> Dict[str, A
                     else:
                         ref_columns.append(str(col))
         
+        # Referential actions are kept as option strings, e.g. "ON DELETE CASCADE"
+        on_delete = "NO ACTION"
+        for option in reference.args.get("options") or []:
+            option = str(option).upper()
+            if option.startswith("ON DELETE "):
+                on_delete = option[len("ON DELETE "):].strip()
+        
         if ref_table:
             return {
                 "from_table": table_name,
                 "from_columns": columns,
                 "to_table": ref_table,
-                "to_columns": ref_columns
+                "to_columns": ref_columns,
+                "on_delete": on_delete
             }
     
     return None
@@ -376,12 +464,455 @@ def extract_index_info(create_statement: exp.Create) -> Dict[str, Any]:
     return None
 
 
-def generate_mermaid_erd(tables: List[Dict[str, Any]], indexes: List[Dict[str, Any]]) -> str:
-    """Generate Mermaid ERD diagram from table definitions."""
+def _view_source_column(scope, source_name: str, column_name: str) -> List[str]:
+    """Base "table.column" sources of one column of a FROM source (table, CTE or derived table)."""
+    source = scope.sources.get(source_name)
+    if isinstance(source, exp.Table):
+        return [f"{source.name}.{column_name}"]
+    if source is not None:
+        return _view_projection_sources(source, column_name)
+    return []
+
+
+def _view_column_sources(scope, node: exp.Expression) -> List[str]:
+    """Base sources of the columns an expression reads."""
+    sources = []
+    for column in node.find_all(exp.Column):
+        if column.is_star:
+            continue
+        if column.table:
+            sources.extend(_view_source_column(scope, column.table, column.name))
+        elif len(scope.selected_sources) == 1:
+            sources.extend(_view_source_column(scope, next(iter(scope.selected_sources)), column.name))
+        else:
+            # Unqualified column over a join: its table cannot be told without the table columns
+            sources.append(column.name)
+    return sources
+
+
+def _query_branches(scope) -> List[Any]:
+    """The SELECT scopes of a query, one per UNION/INTERSECT/EXCEPT branch."""
+    if not scope.union_scopes:
+        return [scope]
+    return [branch for union_scope in scope.union_scopes for branch in _query_branches(union_scope)]
+
+
+def _view_projection_sources(scope, column_name: str) -> List[str]:
+    """Base sources of the named output column of a query scope; "*" means every output column."""
+    branches = _query_branches(scope)
+    if len(branches) > 1:
+        # Set operations match columns by position, named after the first branch
+        names = [projection.alias_or_name for projection in branches[0].expression.selects]
+        positions = range(len(names)) if column_name == "*" else [i for i, name in enumerate(names) if name == column_name]
+        return [source for position in positions for source in _view_output_sources(scope, position)]
+    
+    stars = []
+    sources = []
+    for projection in scope.expression.selects:
+        if projection.is_star:
+            stars.append(projection)
+        elif column_name == "*":
+            sources.extend(_view_column_sources(scope, projection))
+        elif projection.alias_or_name == column_name:
+            return _view_column_sources(scope, projection)
+    
+    # A column not selected by name comes through SELECT * or t.*
+    for star in stars:
+        qualifier = star.table if isinstance(star, exp.Column) else None
+        for source_name in ([qualifier] if qualifier else list(scope.selected_sources)):
+            sources.extend(_view_source_column(scope, source_name, column_name))
+    return sources
+
+
+def _view_output_sources(scope, position: int) -> List[str]:
+    """Base sources of the output column at a position, across every set-operation branch."""
+    sources = []
+    for branch in _query_branches(scope):
+        projections = branch.expression.selects
+        if position < len(projections):
+            projection = projections[position]
+            if projection.is_star:
+                sources.extend(_view_projection_sources(branch, "*"))
+            else:
+                sources.extend(_view_column_sources(branch, projection))
+    return sources
+
+
+def _view_column_is_passthrough(scope, projection: exp.Expression) -> bool:
+    """True when an output column is a bare column reference all the way down to its base table."""
+    node = projection.unalias()
+    if not isinstance(node, exp.Column) or node.is_star:
+        return False
+    source_name = node.table or (next(iter(scope.selected_sources)) if len(scope.selected_sources) == 1 else None)
+    source = scope.sources.get(source_name) if source_name else None
+    if source is None or isinstance(source, exp.Table):
+        return True
+    branches = _query_branches(source)
+    names = [select.alias_or_name for select in branches[0].expression.selects]
+    if node.name not in names:
+        # Reaches the derived table's SELECT *, which passes its columns through
+        return any(select.is_star for select in branches[0].expression.selects)
+    position = names.index(node.name)
+    return all(position < len(branch.expression.selects)
+               and _view_column_is_passthrough(branch, branch.expression.selects[position]) for branch in branches)
+
+
+def _view_star_sources(scope, star: exp.Expression) -> List[str]:
+    """Tables and views a SELECT * or t.* reads, in FROM order; None for a derived table or CTE."""
+    qualifier = star.table if isinstance(star, exp.Column) else None
+    names = []
+    for source_name in ([qualifier] if qualifier else list(scope.selected_sources)):
+        source = scope.sources.get(source_name)
+        names.append(source.name if isinstance(source, exp.Table) else None)
+    return names
+
+
+def extract_view_info(create_statement: exp.Create) -> Dict[str, Any]:
+    """
+    Extract a view's name, the tables and views it reads (with how often each
+    is scanned) and the lineage of its columns from a CREATE VIEW statement.
+    """
+    from sqlglot.optimizer.scope import build_scope
+    
+    target = create_statement.this
+    column_names = []
+    if isinstance(target, exp.Schema):
+        column_names = [column.name for column in target.expressions]
+        target = target.this
+    view_name = target.name if isinstance(target, exp.Table) else None
+    query = create_statement.expression
+    if not view_name or not isinstance(query, exp.Query):
+        return None
+    
+    # Every table reference is a scan; CTE names are not objects of their own
+    cte_names = {cte.alias_or_name.lower() for cte in query.find_all(exp.CTE)}
+    scans = {}
+    for table in query.find_all(exp.Table):
+        if table.name and table.name.lower() not in cte_names:
+            scans[table.name] = scans.get(table.name, 0) + 1
+    
+    columns = []
+    try:
+        scope = build_scope(query)
+        branches = _query_branches(scope)
+        selects = branches[0].expression.selects
+        output_names = [projection.alias_or_name for projection in selects]
+        # Explicit view column names rename the query's outputs by position
+        for position, name in enumerate(column_names or output_names):
+            if not column_names and position < len(selects) and selects[position].is_star:
+                columns.append({"name": name, "sources": [], "expression": False,
+                                "star": _view_star_sources(branches[0], selects[position])})
+                continue
+            sources = _view_output_sources(scope, position)
+            passthrough = all(position < len(branch.expression.selects)
+                              and _view_column_is_passthrough(branch, branch.expression.selects[position])
+                              for branch in branches)
+            columns.append({"name": name, "sources": list(dict.fromkeys(sources)), "expression": not passthrough})
+    except Exception:
+        columns = [{"name": name, "sources": [], "expression": True} for name in column_names]
+    
+    return {
+        "name": view_name,
+        "columns": columns,
+        "references": list(scans),
+        "scans": scans
+    }
+
+
+def build_schema_model(tables: List[Dict[str, Any]], indexes: List[Dict[str, Any]],
+                       views: List[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Combine parsed tables, indexes and views into a lookup model for the analysis tools.
+    Table and column keys are lower-case; each table lists its explicit indexes
+    plus the implicit unique indexes DB2 creates for primary keys and UNIQUE constraints.
+    """
+    model = {"tables": {}, "views": {view["name"].lower(): view for view in views or []}}
+    for table in tables:
+        entry = {
+            "name": table["name"],
+            "columns": {column["name"].lower(): column for column in table["columns"]},
+            "column_order": [column["name"] for column in table["columns"]],
+            "primary_keys": list(table.get("primary_keys", [])),
+            "unique_keys": [list(key) for key in table.get("unique_keys", [])],
+            "foreign_keys": list(table.get("foreign_keys", [])),
+            "indexes": []
+        }
+        if entry["primary_keys"]:
+            entry["indexes"].append({
+                "name": f"PK_{table['name']}",
+                "table": table["name"],
+                "columns": entry["primary_keys"],
+                "is_unique": True,
+                "is_implicit": True,
+                "is_primary_key": True
+            })
+        for key in entry["unique_keys"]:
+            entry["indexes"].append({
+                "name": f"UK_{table['name']}_{'_'.join(key)}",
+                "table": table["name"],
+                "columns": key,
+                "is_unique": True,
+                "is_implicit": True,
+                "is_primary_key": False
+            })
+        model["tables"][table["name"].lower()] = entry
+
+    for idx in indexes:
+        entry = model["tables"].get(idx["table"].lower())
+        if entry is not None:
+            index = dict(idx)
+            index.setdefault("is_implicit", False)
+            index.setdefault("is_primary_key", False)
+            entry["indexes"].append(index)
+
+    return model
+
+
+def analyze_view_stacks(views: List[Dict[str, Any]], tables: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Nesting report for views, deepest first. depth is 1 for a view over base
+    tables only and one more per view level below it; fan_in counts the objects
+    a view reads directly and used_by the views that read it. base_scans counts
+    how often each base table is scanned once every nested view is expanded, and
+    duplicated_scans keeps the tables scanned more than once. Deep or duplicated
+    stacks are flagged as flatten candidates.
+    """
+    by_name = {view["name"].lower(): view for view in views}
+    table_names = {table["name"].lower() for table in tables}
+    used_by = {name: [] for name in by_name}
+    for view in views:
+        for reference in view["references"]:
+            if reference.lower() in by_name:
+                used_by[reference.lower()].append(view["name"])
+    
+    expanded = {}
+    
+    def expand(name: str, visiting: set) -> Tuple[int, Dict[str, int]]:
+        """(depth, base-table scan counts) of a view with its nested views expanded."""
+        if name in expanded:
+            return expanded[name]
+        if name in visiting:
+            return 0, {}  # circular definition; DB2 rejects these, so stop here
+        visiting.add(name)
+        depth = 1
+        base_scans = {}
+        for reference, count in by_name[name]["scans"].items():
+            if reference.lower() in by_name:
+                nested_depth, nested_scans = expand(reference.lower(), visiting)
+                depth = max(depth, nested_depth + 1)
+                for table, scans in nested_scans.items():
+                    base_scans[table] = base_scans.get(table, 0) + scans * count
+            else:
+                base_scans[reference] = base_scans.get(reference, 0) + count
+        visiting.discard(name)
+        expanded[name] = (depth, base_scans)
+        return expanded[name]
+    
+    report = []
+    for view in views:
+        depth, base_scans = expand(view["name"].lower(), set())
+        duplicated = {table: scans for table, scans in base_scans.items() if scans > 1}
+        report.append({
+            "view": view["name"],
+            "depth": depth,
+            "fan_in": len(view["references"]),
+            "used_by": sorted(used_by[view["name"].lower()]),
+            "views": [name for name in view["references"] if name.lower() in by_name],
+            "tables": [name for name in view["references"] if name.lower() in table_names],
+            "unknown": [name for name in view["references"]
+                        if name.lower() not in by_name and name.lower() not in table_names],
+            "base_scans": base_scans,
+            "duplicated_scans": duplicated,
+            "flatten": depth >= DEEP_VIEW_DEPTH or bool(duplicated)
+        })
+    report.sort(key=lambda entry: (-entry["depth"], -sum(entry["duplicated_scans"].values()), entry["view"]))
+    return report
+
+
+def table_for(model: Dict[str, Any], name: str) -> Dict[str, Any]:
+    """Look up a table in the model by name, ignoring case and any schema prefix."""
+    if not name:
+        return None
+    name = name.strip('"').lower()
+    return model["tables"].get(name) or model["tables"].get(name.split('.')[-1])
+
+
+def is_leading_index_column(table: Dict[str, Any], column_name: str) -> bool:
+    """True when some index on the table starts with the column, so it can drive an index lookup."""
+    column_name = column_name.lower()
+    return any(
+        index["columns"] and index["columns"][0].lower() == column_name
+        for index in table["indexes"]
+    )
+
+
+def load_schema_model(schema_file: str) -> Dict[str, Any]:
+    """
+    Load a schema model from a SQL DDL file or a Mermaid ERD (.mmd).
+    For ERDs, PK/UK markers, relationships and the index comment block that
+    generate_mermaid_erd writes are read back.
+    """
+    import re
+
+    with open(schema_file, 'r', encoding='utf-8') as f:
+        content = f.read()
+
+    if not schema_file.lower().endswith(('.mmd', '.mermaid')):
+        views = []
+        tables, indexes = parse_sql_to_tables(content, views=views)
+        return build_schema_model(tables, indexes, views)
+
+    from mmd_diff_to_sql import parse_mermaid_erd
+
+    entities = parse_mermaid_erd(content)
+    tables = []
+    for entity in entities.values():
+        # Columns with a sql: annotation keep their exact type
+        columns = [dict(col, data_type=col["sql_type"] or col["data_type"]) for col in entity["columns"].values()]
+        tables.append({
+            "name": entity["name"],
+            "columns": columns,
+            "primary_keys": [col["name"] for col in columns if col["is_primary_key"]],
+            "unique_keys": [[col["name"]] for col in columns if col["is_unique"]],
+            "foreign_keys": []
+        })
+    by_name = {table["name"]: table for table in tables}
+
+    # Relationships: parent ||--o{ child : fk_column (the label may carry an index note)
+    relationship_pattern = re.compile(r'^\s*(\w+)\s+[|}{o]+-[-.]*[|}{o]+\s+(\w+)\s*:\s*"?(\w+)')
+    # Index comments: %% TABLE (n indexes): followed by %%   - name: UNIQUE index on (a, b)
+    index_table_pattern = re.compile(r'^%%\s+(\w+)\s+\(\d+\s+index(?:es)?\):')
+    index_pattern = re.compile(r'^%%\s+-\s+(\w+):\s+(UNIQUE index|Index)\s+on\s+\(([^)]*)\)')
+
+    indexes = []
+    index_table = None
+    for line in content.split('\n'):
+        line = line.strip()
+        relationship = relationship_pattern.match(line)
+        if relationship and relationship.group(2) in by_name:
+            parent, child, fk_column = relationship.groups()
+            by_name[child]["foreign_keys"].append({
+                "from_table": child,
+                "from_columns": [fk_column],
+                "to_table": parent,
+                "to_columns": list(by_name[parent]["primary_keys"]) if parent in by_name else []
+            })
+            continue
+        table_header = index_table_pattern.match(line)
+        if table_header:
+            index_table = table_header.group(1)
+            continue
+        index_line = index_pattern.match(line)
+        if index_line and index_table:
+            indexes.append({
+                "name": index_line.group(1),
+                "table": index_table,
+                "columns": [col.strip() for col in index_line.group(3).split(',') if col.strip()],
+                "is_unique": index_line.group(2) == "UNIQUE index"
+            })
+
+    return build_schema_model(tables, indexes)
+
+
+def load_table_stats(tables: List[Dict[str, Any]], export_files: List[str]) -> Dict[str, Dict[str, Any]]:
+    """
+    Look up CARD, NPAGES, FPAGES and STATS_TIME for each table in SYSCAT.TABLES exports.
+    Returns {table name: stats}; tables missing from the catalog get None values.
+    """
+    from syscat_stats import load_catalog_stats
+
+    catalog = load_catalog_stats(export_files)
+    table_stats = {}
+    for table in tables:
+        entry = catalog.table(table["name"]) or {}
+        table_stats[table["name"]] = {
+            "card": entry.get("CARD"),
+            "npages": entry.get("NPAGES"),
+            "fpages": entry.get("FPAGES"),
+            "stats_time": entry.get("STATS_TIME")
+        }
+    return table_stats
+
+
+def size_class(stats: Dict[str, Any]) -> str:
+    """Mermaid class name for a table's size; falls back to CARD when NPAGES is missing."""
+    if not stats or (stats.get("npages") is None and stats.get("card") is None):
+        return NO_STATS_CLASS[0]
+    pages = stats.get("npages")
+    if pages is None:
+        # Rough 4K-page estimate from the row count
+        pages = stats["card"] / 50
+    for name, min_pages, _ in SIZE_CLASSES:
+        if pages >= min_pages:
+            return name
+    return SIZE_CLASSES[-1][0]
+
+
+def describe_table_stats(stats: Dict[str, Any]) -> str:
+    """One-line summary such as '2,000,000 rows, 40,000 pages, stats 2025-06-01T00:00:00'."""
+    if not stats or stats.get("card") is None:
+        return "no statistics"
+    parts = [f"{stats['card']:,} rows"]
+    if stats.get("npages") is not None:
+        pages = f"{stats['npages']:,} pages"
+        if stats.get("fpages") is not None and stats["fpages"] != stats["npages"]:
+            pages += f" ({stats['fpages']:,} allocated)"
+        parts.append(pages)
+    parts.append(f"stats {stats['stats_time']}" if stats.get("stats_time") else "stats never collected")
+    return ", ".join(parts)
+
+
+def describe_view_stack(entry: Dict[str, Any]) -> str:
+    """One-line summary of an analyze_view_stacks entry, such as 'depth 3, reads 2 views, 1 table; orders scanned 3x'."""
+    parts = [f"depth {entry['depth']}"]
+    reads = []
+    if entry["views"]:
+        reads.append(f"{len(entry['views'])} view{'s' if len(entry['views']) != 1 else ''}")
+    if entry["tables"]:
+        reads.append(f"{len(entry['tables'])} table{'s' if len(entry['tables']) != 1 else ''}")
+    if reads:
+        parts.append(f"reads {', '.join(reads)}")
+    if entry["used_by"]:
+        parts.append(f"used by {len(entry['used_by'])} view{'s' if len(entry['used_by']) != 1 else ''}")
+    text = ", ".join(parts)
+    if entry["duplicated_scans"]:
+        text += "; " + ", ".join(f"{table} scanned {scans}x" for table, scans in entry["duplicated_scans"].items())
+    if entry["flatten"]:
+        text += "; flatten candidate"
+    return text
+
+
+def generate_mermaid_erd(tables: List[Dict[str, Any]], indexes: List[Dict[str, Any]],
+                         table_stats: Dict[str, Dict[str, Any]] = None, min_rows: int = 0,
+                         views: List[Dict[str, Any]] = None) -> str:
+    """
+    Generate Mermaid ERD diagram from table definitions.
+    With table_stats (see load_table_stats), entities get a size comment and a
+    size class, and tables with fewer than min_rows rows are left out.
+    Views are drawn as entities of their own class, with column lineage and
+    dotted lines to the tables and views they read.
+    """
     lines = ["erDiagram"]
     
+    dropped_tables = []
+    if table_stats:
+        kept = []
+        for table in tables:
+            card = (table_stats.get(table["name"]) or {}).get("card")
+            if min_rows and card is not None and card < min_rows:
+                dropped_tables.append(table["name"])
+            else:
+                kept.append(table)
+        tables = kept
+        dropped = {name.lower() for name in dropped_tables}
+        indexes = [idx for idx in indexes if idx["table"].lower() not in dropped]
+    else:
+        dropped = set()
+    
     # Generate entity definitions FIRST (relationships come after)
     for table in tables:
+        if table_stats:
+            lines.append(f"    %% {table['name']}: {describe_table_stats(table_stats.get(table['name']))}")
         lines.append(f"    {table['name']} {{")
         
         primary_keys = set(table.get("primary_keys", []))
@@ -402,8 +933,12 @@ def generate_mermaid_erd(tables: List[Dict[str, Any]], indexes: List[Dict[str, A
                 if "PK" not in markers:  # Don't mark UK if already PK
                     markers.append("UK")
             
-            # Build constraint description
+            # Build constraint description; an exact type the simplified name
+            # loses goes first, so DEFAULT stays the last item
             constraints = []
+            annotation = type_annotation(column.get("sql_type") or column["data_type"])
+            if annotation:
+                constraints.append(annotation)
             if column.get("is_not_null") and "PK" not in markers:
                 constraints.append("NOT NULL")
             if column.get("default_value"):
@@ -434,6 +969,8 @@ def generate_mermaid_erd(tables: List[Dict[str, Any]], indexes: List[Dict[str, A
         for fk in table.get("foreign_keys", []):
             from_table = fk["from_table"]
             to_table = fk["to_table"]
+            if to_table.lower() in dropped:
+                continue
             
             # Avoid duplicate relationships
             rel_key = f"{from_table}-{to_table}"
@@ -465,6 +1002,105 @@ def generate_mermaid_erd(tables: List[Dict[str, Any]], indexes: List[Dict[str, A
     if relationships_added:
         lines.append("")
     
+    # Views use the aliased entity header (name["label"]), which the Mermaid-to-SQL
+    # converters do not read as a table, so views never come back as CREATE TABLE
+    if views:
+        stacks = {entry["view"]: entry for entry in analyze_view_stacks(views, tables)}
+        table_columns = {table["name"].lower(): {column["name"].lower(): column for column in table["columns"]}
+                         for table in tables}
+        views_by_name = {view["name"].lower(): view for view in views}
+        
+        def output_columns(name: str, seen: frozenset) -> List[Dict[str, Any]]:
+            """A view's columns with SELECT * expanded from the model; unknown sources become placeholders."""
+            columns = []
+            for column in views_by_name[name]["columns"]:
+                if column.get("star") is None:
+                    columns.append(column)
+                    continue
+                for source in column["star"]:
+                    key = source.lower() if source else None
+                    if key in table_columns:
+                        names = [item["name"] for item in table_columns[key].values()]
+                    elif key in views_by_name and key not in seen:
+                        names = [item["name"] for item in output_columns(key, seen | {key}) if item["name"]]
+                    else:
+                        columns.append({"name": None, "sources": [], "placeholder": source or "a derived table"})
+                        continue
+                    columns.extend({"name": column_name, "sources": [f"{source}.{column_name}"], "expression": False}
+                                   for column_name in names)
+            return columns
+        
+        expanded = {name: output_columns(name, frozenset([name])) for name in views_by_name}
+        view_columns = {name: {column["name"].lower(): column for column in columns if column["name"]}
+                        for name, columns in expanded.items()}
+        known = set(table_columns) | set(view_columns)
+        
+        def source_type(source: str, seen: frozenset) -> str:
+            """Simplified type of a "table.column" source, followed down through nested views."""
+            name, _, column_name = source.lower().partition('.')
+            if name in table_columns:
+                column = table_columns[name].get(column_name)
+                return simplify_data_type(column["data_type"]) if column else None
+            column = view_columns.get(name, {}).get(column_name)
+            if column and not column.get("expression") and len(column["sources"]) == 1 and name not in seen:
+                return source_type(column["sources"][0], seen | {name})
+            return None
+        
+        for view in views:
+            lines.append(f"    %% {view['name']}: {describe_view_stack(stacks[view['name']])}")
+            lines.append(f'    {view["name"]}["{view["name"]} (view)"] {{')
+            for column in expanded[view["name"].lower()]:
+                if column.get("placeholder"):
+                    lines.append(f'        expr all_columns "SELECT * from {column["placeholder"]}"')
+                    continue
+                if not column["name"].replace('_', '').isalnum():
+                    continue  # expression names Mermaid cannot show
+                # Only bare column references keep their source's type; anything computed is an expression
+                data_type = None
+                if not column.get("expression") and len(column["sources"]) == 1:
+                    data_type = source_type(column["sources"][0], frozenset([view["name"].lower()]))
+                data_type = data_type or "expr"
+                lineage = f' "from {", ".join(column["sources"])}"' if column["sources"] else ""
+                lines.append(f"        {data_type} {column['name']}{lineage}")
+            lines.append("    }")
+            lines.append("")
+        for view in views:
+            for reference, scans in view["scans"].items():
+                if reference.lower() in known and reference.lower() not in dropped:
+                    label = "reads" if scans == 1 else f"reads {scans}x"
+                    lines.append(f'    {view["name"]} }}o..o{{ {reference} : "{label}"')
+        lines.append(f"    classDef {VIEW_CLASS[0]} {VIEW_CLASS[1]}")
+        lines.append(f"    class {','.join(view['name'] for view in views)} {VIEW_CLASS[0]}")
+        lines.append("")
+    
+    # Color entities by size class and list them largest first
+    if table_stats:
+        classes = {}
+        for table in tables:
+            classes.setdefault(size_class(table_stats.get(table["name"])), []).append(table["name"])
+        for name, _, style in SIZE_CLASSES + [(NO_STATS_CLASS[0], None, NO_STATS_CLASS[1])]:
+            if name in classes:
+                lines.append(f"    classDef {name} {style}")
+        for name, members in classes.items():
+            lines.append(f"    class {','.join(members)} {name}")
+        lines.append("")
+        
+        ranked = sorted(
+            tables,
+            key=lambda t: ((table_stats.get(t["name"]) or {}).get("npages") or -1,
+                           (table_stats.get(t["name"]) or {}).get("card") or -1),
+            reverse=True
+        )
+        lines.append("%% ===========================================================")
+        lines.append("%% TABLE SIZES (largest first)")
+        lines.append("%% ===========================================================")
+        for rank, table in enumerate(ranked, 1):
+            stats = table_stats.get(table["name"])
+            lines.append(f"%% {rank:>3}. {table['name']} [{size_class(stats)}]: {describe_table_stats(stats)}")
+        if dropped_tables:
+            lines.append(f"%% Omitted {len(dropped_tables)} table(s) below {min_rows:,} rows: {', '.join(dropped_tables)}")
+        lines.append("")
+    
     # Add index information as comments at the bottom
     if indexes:
         lines.append("")
@@ -560,12 +1196,15 @@ def simplify_data_type(data_type: str) -> str:
 
 def main():
     """Main entry point for the script."""
-    if len(sys.argv) < 2:
-        print(json.dumps({"error": "Usage: sql_to_mmd.py <sql_file> [ast_output_file]"}), file=sys.stderr)
+    from sql_dialect_translate import split_cli_args
+    
+    positional, options = split_cli_args(sys.argv[1:])
+    if not positional:
+        print(json.dumps({"error": "Usage: sql_to_mmd.py <sql_file> [ast_output_file] [--stats=syscat_export[,more]] [--min-rows=N] [--view-report=file.json] [--statement-timeout=S] [--max-tokens=N] [--max-depth=N]"}), file=sys.stderr)
         sys.exit(1)
     
-    sql_file = sys.argv[1]
-    ast_output_file = sys.argv[2] if len(sys.argv) > 2 else None
+    sql_file = positional[0]
+    ast_output_file = positional[1] if len(positional) > 1 else None
     
     try:
         # Read SQL file
@@ -577,7 +1216,7 @@ def main():
             try:
                 # Clean and parse SQL to get AST
                 cleaned_sql = clean_tsql_brackets(sql_content)
-                statements = parse(cleaned_sql)
+                statements = parse(mask_type_clauses(cleaned_sql))
                 
                 # Build AST representation
                 ast_lines = ["SQLGlot Abstract Syntax Tree (AST)", "=" * 60, ""]
@@ -607,10 +1246,24 @@ def main():
                     f.write(f"AST Export Error: {str(e)}\n")
         
         # Parse SQL
-        tables, indexes = parse_sql_to_tables(sql_content)
+        diagnostics = []
+        views = []
+        tables, indexes = parse_sql_to_tables(sql_content, ParseBudget.from_cli(options), diagnostics, views)
+        for diagnostic in diagnostics:
+            print(json.dumps({"warning": diagnostic}), file=sys.stderr)
+        
+        # Nested-view report: depth, fan-in and duplicated base-table scans per view
+        if options.get("view-report"):
+            with open(options["view-report"], 'w', encoding='utf-8') as f:
+                json.dump(analyze_view_stacks(views, tables), f, indent=2)
+        
+        # Merge catalog statistics if requested
+        table_stats = None
+        if options.get("stats"):
+            table_stats = load_table_stats(tables, [path for path in options["stats"].split(',') if path])
         
         # Generate Mermaid ERD
-        mermaid_output = generate_mermaid_erd(tables, indexes)
+        mermaid_output = generate_mermaid_erd(tables, indexes, table_stats, int(options.get("min-rows", "0")), views)
         
         # Output result
         print(mermaid_output)
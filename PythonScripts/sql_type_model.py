@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""
+Precision-preserving column type model for the SQL <-> Mermaid round trip.
+Mermaid ERDs only hold a simple type word (simplify_data_type turns VARCHAR(20)
+into varchar), and the Mermaid-to-SQL converters widen that word again
+(VARCHAR(255), DECIMAL(10,2), CHAR(50)). Types that would not survive that are
+written into the column's quoted attribute string as a "sql:<TYPE>" item, which
+the converters read back, so regenerated DDL keeps length, precision, scale,
+string unit, CCSID, FOR BIT DATA and LOB inline length.
+Dependency-free: the Mermaid converters that do not need SQLGlot import it too.
+"""
+
+import re
+from typing import List, Dict, Any, Optional
+
+
+ANNOTATION_PREFIX = "sql:"
+
+# Type names made of several words; any other type name is a single word.
+# Longer names first so the alternation prefers them.
+MULTI_WORD_TYPES = [
+    "NATIONAL CHARACTER VARYING",
+    "CHARACTER LARGE OBJECT",
+    "BINARY LARGE OBJECT",
+    "CHAR LARGE OBJECT",
+    "NATIONAL CHARACTER",
+    "CHARACTER VARYING",
+    "DOUBLE PRECISION",
+    "LONG VARGRAPHIC",
+    "NATIONAL CHAR",
+    "LONG VARCHAR",
+    "CHAR VARYING"
+]
+STRING_UNITS = ("OCTETS", "CODEUNITS16", "CODEUNITS32")
+LOB_MULTIPLIERS = {"K": 1024, "M": 1024 ** 2, "G": 1024 ** 3}
+DEFAULT_LOB_BYTES = 1024 ** 2  # DB2 default when a LOB has no length
+
+# Types whose simplified Mermaid name already regenerates the same DDL
+LOSSLESS_TYPES = {
+    "INT", "INTEGER", "BIGINT", "SMALLINT", "FLOAT", "DOUBLE", "DOUBLE PRECISION",
+    "DATE", "TIME", "TIMESTAMP", "DATETIME", "BOOLEAN", "BOOL", "TEXT", "UUID"
+}
+
+# Type families that other dialects spell differently
+CHARACTER_LOBS = {"CLOB", "CHARACTER LARGE OBJECT", "CHAR LARGE OBJECT", "LONG VARCHAR"}
+DOUBLE_BYTE_LOBS = {"DBCLOB", "LONG VARGRAPHIC"}
+BINARY_LOBS = {"BLOB", "BINARY LARGE OBJECT"}
+FIXED_CHARACTER = {"CHAR", "CHARACTER", "GRAPHIC", "NCHAR", "NATIONAL CHAR", "NATIONAL CHARACTER"}
+VARYING_CHARACTER = {"VARCHAR", "CHARACTER VARYING", "CHAR VARYING", "VARGRAPHIC",
+                     "NVARCHAR", "NATIONAL CHARACTER VARYING"}
+
+_TYPE_NAME = ('(?:' + '|'.join(name.replace(' ', r'\s+') for name in MULTI_WORD_TYPES)
+              + r'|[A-Za-z_][A-Za-z0-9_]*)\b')
+_TYPE_CLAUSE = r'FOR\s+(?:BIT|SBCS|MIXED)\s+DATA|CCSID\s+\w+|INLINE\s+LENGTH\s+\d+'
+
+TYPE_PATTERN = re.compile(
+    r'(?P<base>' + _TYPE_NAME + r')'
+    r'(?:\s*\((?P<args>[^()]*)\))?'
+    r'(?P<suffix>\s+WITH(?:OUT)?\s+(?:LOCAL\s+)?TIME\s+ZONE)?'
+    r'(?P<clauses>(?:\s+(?:' + _TYPE_CLAUSE + r'))*)',
+    re.IGNORECASE
+)
+CLAUSE_PATTERN = re.compile(r'FOR\s+(BIT|SBCS|MIXED)\s+DATA|CCSID\s+(\w+)|INLINE\s+LENGTH\s+(\d+)', re.IGNORECASE)
+LENGTH_PATTERN = re.compile(r'^(\d+)\s*([KMG])?\s*(' + '|'.join(STRING_UNITS) + r')?$', re.IGNORECASE)
+
+# DB2 spellings SQLGlot cannot parse: the K/M/G multiplier and string unit inside
+# a length, and the clauses after a type
+MASK_LENGTH_PATTERN = re.compile(
+    r'\(\s*\d+(\s*[KMG])?(\s*(?:' + '|'.join(STRING_UNITS) + r'))?\s*\)', re.IGNORECASE)
+MASK_CLAUSE_PATTERN = re.compile(r'\b(?:' + _TYPE_CLAUSE + r'|LONG(?=\s+VAR(?:CHAR|GRAPHIC)\b))\b', re.IGNORECASE)
+
+
+def parse_type(text: str) -> Optional[Dict[str, Any]]:
+    """
+    Parse a column type such as "VARCHAR(20 OCTETS) CCSID 1208" or
+    "CLOB(1M) INLINE LENGTH 200" into its parts. Returns None when the text is
+    not a single type.
+    """
+    match = TYPE_PATTERN.fullmatch((text or "").strip())
+    if not match:
+        return None
+
+    args = [arg.strip().upper() for arg in match.group("args").split(',')] if match.group("args") else []
+    unit = None
+    if args:
+        length = LENGTH_PATTERN.match(args[0])
+        if length:
+            args[0] = length.group(1) + (length.group(2) or "").upper()
+            unit = length.group(3).upper() if length.group(3) else None
+
+    spec = {
+        "base": " ".join(match.group("base").upper().split()),
+        "args": args,
+        "unit": unit,
+        "suffix": " ".join((match.group("suffix") or "").upper().split()),
+        "for_data": None,
+        "ccsid": None,
+        "inline_length": None
+    }
+    for clause in CLAUSE_PATTERN.finditer(match.group("clauses") or ""):
+        if clause.group(1):
+            spec["for_data"] = clause.group(1).upper()
+        elif clause.group(2):
+            spec["ccsid"] = clause.group(2).upper()
+        else:
+            spec["inline_length"] = int(clause.group(3))
+    return spec
+
+
+def read_type(sql: str, position: int) -> Optional[str]:
+    """Read the column type that starts at (or after whitespace from) position in sql."""
+    while position < len(sql) and sql[position].isspace():
+        position += 1
+    match = TYPE_PATTERN.match(sql, position)
+    return " ".join(match.group(0).split()) if match else None
+
+
+def mask_type_clauses(sql: str) -> str:
+    """
+    Blank out the DB2 type spellings SQLGlot cannot parse (CLOB(1M),
+    VARCHAR(20 OCTETS), FOR BIT DATA, CCSID, INLINE LENGTH, the LONG of
+    LONG VARCHAR) with spaces.
+    The text keeps its length, so parser positions still index the original.
+    """
+    chars = list(sql)
+
+    def blank(start: int, end: int):
+        chars[start:end] = ' ' * (end - start)
+
+    for match in MASK_LENGTH_PATTERN.finditer(sql):
+        for group in (1, 2):
+            if match.group(group):
+                blank(match.start(group), match.end(group))
+    for match in MASK_CLAUSE_PATTERN.finditer(sql):
+        blank(match.start(), match.end())
+    return ''.join(chars)
+
+
+def lob_bytes(spec: Dict[str, Any]) -> int:
+    """Maximum length in bytes (or characters) of a LOB type, with DB2's 1M default."""
+    if not spec["args"]:
+        return DEFAULT_LOB_BYTES
+    length = LENGTH_PATTERN.match(spec["args"][0])
+    if not length:
+        return DEFAULT_LOB_BYTES
+    return int(length.group(1)) * LOB_MULTIPLIERS.get((length.group(2) or "").upper(), 1)
+
+
+def _spell(base: str, args: List[str]) -> str:
+    return f"{base}({','.join(args)})" if args else base
+
+
+# Dialect names the converters accept that spell the same types as another
+DIALECT_ALIASES = {"sqlserver": "tsql"}
+
+
+def _sized_lob(dialect: str, size: int, text: bool) -> str:
+    """Spell a LOB of the given size in a dialect without DB2's LOB types."""
+    if dialect == "postgres":
+        return "TEXT" if text else "BYTEA"
+    if dialect == "tsql":
+        return "VARCHAR(MAX)" if text else "VARBINARY(MAX)"
+    if dialect == "mysql":
+        family = "TEXT" if text else "BLOB"
+        if size <= 65535:
+            return family
+        return ("MEDIUM" if size <= 16777215 else "LONG") + family
+    return "TEXT" if text else "BLOB"
+
+
+def format_type(spec: Dict[str, Any], dialect: str = '') -> str:
+    """
+    Spell a parsed type for a dialect. ANSI (empty dialect) and DB2 keep every
+    clause; other dialects get the nearest native type without the DB2-only
+    clauses (string units, CCSID, INLINE LENGTH, K/M/G lengths).
+    """
+    dialect = (dialect or '').lower()
+    dialect = DIALECT_ALIASES.get(dialect, dialect)
+    base, args = spec["base"], list(spec["args"])
+
+    if dialect in ('', 'db2'):
+        if spec["unit"] and args:
+            args[0] = f"{args[0]} {spec['unit']}"
+        text = _spell(base, args)
+        if spec["suffix"]:
+            text += f" {spec['suffix']}"
+        if spec["for_data"]:
+            text += f" FOR {spec['for_data']} DATA"
+        if spec["ccsid"]:
+            text += f" CCSID {spec['ccsid']}"
+        if spec["inline_length"] is not None:
+            text += f" INLINE LENGTH {spec['inline_length']}"
+        return text
+
+    if base in CHARACTER_LOBS and spec["for_data"] != "BIT":
+        return _sized_lob(dialect, lob_bytes(spec), True)
+    if base in DOUBLE_BYTE_LOBS:
+        return "NVARCHAR(MAX)" if dialect == "tsql" else _sized_lob(dialect, lob_bytes(spec), True)
+    if base in BINARY_LOBS or base in CHARACTER_LOBS:
+        return _sized_lob(dialect, lob_bytes(spec), False)
+
+    if args and LENGTH_PATTERN.match(args[0]):
+        args[0] = str(lob_bytes(spec))
+    if spec["for_data"] == "BIT" and (base in FIXED_CHARACTER or base in VARYING_CHARACTER):
+        if dialect == "postgres":
+            return "BYTEA"
+        return _spell("BINARY" if base in FIXED_CHARACTER else "VARBINARY", args)
+    if base in ("GRAPHIC", "VARGRAPHIC"):
+        national = "N" if dialect == "tsql" else ""
+        return _spell(national + ("CHAR" if base == "GRAPHIC" else "VARCHAR"), args)
+
+    if base == "TIMESTAMP" and dialect == "tsql":
+        # TIMESTAMP is a row version in T-SQL; DATETIME2 keeps up to 7 fractional digits
+        return _spell("DATETIME2", [str(min(int(args[0]), 7))] if args and args[0].isdigit() else args)
+
+    text = _spell(base, args)
+    if spec["suffix"] and dialect == "postgres":
+        text += f" {spec['suffix']}"
+    return text
+
+
+def format_sql_type(sql_type: str, dialect: str = '') -> Optional[str]:
+    """parse_type plus format_type; None when sql_type is not a type."""
+    spec = parse_type(sql_type)
+    return format_type(spec, dialect) if spec else None
+
+
+def type_annotation(sql_type: str) -> Optional[str]:
+    """
+    The "sql:<TYPE>" attribute item for a column type, or None when the
+    simplified Mermaid type already regenerates the same DDL.
+    """
+    spec = parse_type(sql_type)
+    if spec is None:
+        return None
+    if spec["base"] in LOSSLESS_TYPES and not (spec["args"] or spec["unit"] or spec["suffix"] or spec["for_data"]
+                                               or spec["ccsid"] or spec["inline_length"] is not None):
+        return None
+    return ANNOTATION_PREFIX + format_type(spec)
+
+
+def split_attributes(attributes: str) -> List[str]:
+    """Split a Mermaid attribute string on commas outside parentheses."""
+    items = []
+    depth = 0
+    current = []
+    for char in attributes or "":
+        if char == '(':
+            depth += 1
+        elif char == ')':
+            depth = max(depth - 1, 0)
+        elif char == ',' and depth == 0:
+            items.append(''.join(current).strip())
+            current = []
+            continue
+        current.append(char)
+    items.append(''.join(current).strip())
+    return [item for item in items if item]
+
+
+def annotated_type(attributes: str) -> Optional[str]:
+    """The exact SQL type carried by a Mermaid attribute string, if any."""
+    for item in split_attributes(attributes):
+        if item.lower().startswith(ANNOTATION_PREFIX):
+            return item[len(ANNOTATION_PREFIX):].strip() or None
+    return None
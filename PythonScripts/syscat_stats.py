@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+In-memory catalog of DB2 statistics loaded from SYSCAT exports.
+Reads SYSCAT.TABLES, SYSCAT.COLUMNS and SYSCAT.INDEXES result sets exported
+as JSON, CSV, TSV or XML (the formats of syscat_tables.*) and indexes them by
+table and column name for the estimation and ERD tools.
+"""
+
+import sys
+import os
+import re
+import csv
+import json
+import xml.etree.ElementTree as ET
+from typing import List, Dict, Any
+
+
+# Numeric statistics columns; -1 means "no statistics collected"
+TABLE_STAT_FIELDS = ["CARD", "NPAGES", "FPAGES", "MPAGES", "OVERFLOW", "AVGROWSIZE", "COLCOUNT"]
+COLUMN_STAT_FIELDS = ["COLCARD", "NUMNULLS", "AVGCOLLEN", "LENGTH", "SCALE", "COLNO"]
+INDEX_STAT_FIELDS = ["FIRSTKEYCARD", "FULLKEYCARD", "NLEAF", "NLEVELS", "CLUSTERRATIO", "COLCOUNT", "INDCARD"]
+
+# Control characters that XML 1.0 does not allow
+_XML_INVALID_CHARS_RE = re.compile(r'[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+
+def _clean_value(value):
+    """Exports write NULL as {} (JSON) or an empty field; CHAR columns are blank-padded."""
+    if value is None or value == {}:
+        return None
+    if isinstance(value, str):
+        value = value.strip()
+        return value if value else None
+    return value
+
+
+def _to_number(value):
+    if value is None or isinstance(value, (int, float)):
+        return value
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    return int(number) if number.is_integer() else number
+
+
+def read_catalog_export(export_file: str) -> List[Dict[str, Any]]:
+    """Read the rows of one catalog export (.json, .csv, .tsv or .xml) with nulls and padding cleaned."""
+    extension = os.path.splitext(export_file)[1].lower()
+    if extension == '.json':
+        with open(export_file, 'r', encoding='utf-8-sig') as f:
+            data = json.load(f)
+        rows = data if isinstance(data, list) else data.get("rows") or data.get("data", {}).get("rows", [])
+    elif extension in ('.csv', '.tsv'):
+        with open(export_file, 'r', encoding='utf-8-sig', newline='') as f:
+            rows = list(csv.DictReader(f, delimiter='\t' if extension == '.tsv' else ','))
+    elif extension == '.xml':
+        with open(export_file, 'r', encoding='utf-8-sig') as f:
+            # CHAR(1) columns such as DROPRULE can hold NUL, which is not legal XML
+            content = _XML_INVALID_CHARS_RE.sub('', f.read())
+        rows = [{child.tag: child.text for child in row} for row in ET.fromstring(content)]
+    else:
+        raise ValueError(f"Unsupported catalog export format: {export_file}")
+
+    return [{key.strip().upper(): _clean_value(value) for key, value in row.items() if key} for row in rows]
+
+
+def stat_value(value):
+    """Numeric statistic, or None when missing or -1 (not collected)."""
+    number = _to_number(value)
+    return None if number is None or number < 0 else number
+
+
+class CatalogStats:
+    """
+    Table, column and index statistics keyed by lower-case 'schema.table' and 'table'.
+    A bare table name resolves only when it is unique across schemas.
+    """
+
+    def __init__(self):
+        self.tables = {}
+        self.columns = {}
+        self.indexes = {}
+        self._by_name = {}
+
+    @staticmethod
+    def _key(schema: str, table: str) -> str:
+        return f"{(schema or '').lower()}.{table.lower()}"
+
+    def _register(self, schema: str, table: str):
+        self._by_name.setdefault(table.lower(), set()).add(self._key(schema, table))
+
+    def add_rows(self, rows: List[Dict[str, Any]]):
+        """Add rows from any supported catalog view, detected by its columns."""
+        for row in rows:
+            table = row.get("TABNAME")
+            if not table:
+                continue
+            schema = row.get("TABSCHEMA") or ""
+            key = self._key(schema, table)
+            self._register(schema, table)
+            if "COLNAME" in row:
+                entry = dict(row)
+                for field in COLUMN_STAT_FIELDS:
+                    entry[field] = stat_value(row.get(field))
+                self.columns.setdefault(key, {})[row["COLNAME"].lower()] = entry
+            elif "INDNAME" in row:
+                entry = dict(row)
+                for field in INDEX_STAT_FIELDS:
+                    entry[field] = stat_value(row.get(field))
+                entry["COLUMNS"] = [name for name in (row.get("COLNAMES") or "").replace('-', '+').split('+') if name]
+                self.indexes.setdefault(key, []).append(entry)
+            else:
+                entry = dict(row)
+                for field in TABLE_STAT_FIELDS:
+                    entry[field] = stat_value(row.get(field))
+                self.tables[key] = entry
+
+    def resolve(self, name: str) -> str:
+        """Catalog key for 'schema.table' or an unambiguous bare table name."""
+        if not name:
+            return None
+        name = name.replace('"', '').lower()
+        if '.' in name:
+            schema, table = name.rsplit('.', 1)
+            key = self._key(schema, table)
+            return key if key in self._by_name.get(table, ()) else None
+        keys = self._by_name.get(name, set())
+        return next(iter(keys)) if len(keys) == 1 else None
+
+    def table(self, name: str) -> Dict[str, Any]:
+        key = self.resolve(name)
+        return self.tables.get(key) if key else None
+
+    def cardinality(self, name: str):
+        """CARD for a table, or None without statistics."""
+        table = self.table(name)
+        return table["CARD"] if table else None
+
+    def column(self, table_name: str, column_name: str) -> Dict[str, Any]:
+        key = self.resolve(table_name)
+        return self.columns.get(key, {}).get(column_name.lower()) if key else None
+
+    def column_cardinality(self, table_name: str, column_name: str):
+        """COLCARD for a column, or None without statistics."""
+        column = self.column(table_name, column_name)
+        return column["COLCARD"] if column else None
+
+    def table_indexes(self, table_name: str) -> List[Dict[str, Any]]:
+        key = self.resolve(table_name)
+        return self.indexes.get(key, []) if key else []
+
+
+def load_catalog_stats(export_files: List[str]) -> CatalogStats:
+    """Load one or more SYSCAT exports into a CatalogStats."""
+    catalog = CatalogStats()
+    for export_file in export_files:
+        catalog.add_rows(read_catalog_export(export_file))
+    return catalog
+
+
+def main():
+    """Print a summary of the statistics found in the given exports."""
+    if len(sys.argv) < 2:
+        print(json.dumps({"error": "Usage: syscat_stats.py <syscat_export> [more_exports...]"}), file=sys.stderr)
+        sys.exit(1)
+
+    try:
+        catalog = load_catalog_stats(sys.argv[1:])
+        summary = {
+            "tables": len(catalog.tables),
+            "tables_with_stats": sum(1 for t in catalog.tables.values() if t["CARD"] is not None),
+            "columns": sum(len(c) for c in catalog.columns.values()),
+            "indexes": sum(len(i) for i in catalog.indexes.values())
+        }
+        print(json.dumps(summary, indent=2))
+    except FileNotFoundError as e:
+        print(json.dumps({"error": f"File not found: {e.filename}"}), file=sys.stderr)
+        sys.exit(1)
+    except Exception as e:
+        print(json.dumps({"error": str(e)}), file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+import random
+
+from mmd_diff_to_sql import ErdDocument, IncrementalDiff, parse_mermaid_erd, compare_entities
+
+EDIT_PIECES = ["    X{} {{", "        int z", "    }}", "", "%% c", "        varchar q NOT", "    T3 {{", "}}"]
+
+
+def make_erd(rng: random.Random, tables: int) -> str:
+    lines = ["erDiagram"]
+    for i in range(tables):
+        lines.append(f"    T{i} {{")
+        for j in range(rng.randint(2, 8)):
+            lines.append(f"        {rng.choice(['int', 'varchar', 'date'])} c{j}{' PK' if j == 0 else ''}")
+        lines.append("    }")
+        lines.append("")
+    lines.append("    T0 ||--o{ T1 : c1")
+    return "\n".join(lines)
+
+
+def test_random_line_edits_match_a_full_reparse():
+    rng = random.Random(7)
+    for trial in range(100):
+        document = ErdDocument(make_erd(rng, 15))
+        for step in range(10):
+            count = len(document.lines)
+            start = rng.randint(1, count + 1)
+            end = rng.randint(start - 1, min(count, start + 4))
+            text = "\n".join(rng.choice(EDIT_PIECES).format(rng.randint(0, 99)) for _ in range(rng.randint(1, 3)))
+            document.apply_edit(start, end, text)
+            assert document.entities == parse_mermaid_erd(document.content()), (trial, step)
+
+
+def test_incremental_changes_match_a_full_comparison():
+    rng = random.Random(11)
+    before = make_erd(rng, 200)
+    diff = IncrementalDiff(before, before, "db2")
+    after = diff.documents["after"]
+    for _ in range(100):
+        line = rng.randint(2, len(after.lines) - 2)
+        diff.apply("after", line, line, after.lines[line - 1] + "x" if rng.random() < 0.5 else "        int newcol")
+    assert diff.changes == compare_entities(parse_mermaid_erd(before), parse_mermaid_erd(after.content()))
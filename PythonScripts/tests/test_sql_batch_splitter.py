@@ -0,0 +1,18 @@
+from sql_batch_splitter import split_script, write_resume_script
+
+
+def test_resume_replays_the_session_state_of_the_next_batch(tmp_path):
+    source = tmp_path / "in.sql"
+    source.write_text("SET SCHEMA A;\nINSERT INTO t VALUES (1);\nSET SCHEMA B;\nINSERT INTO t VALUES (2);\n",
+                      encoding="utf-8")
+    result = split_script(str(source), str(tmp_path / "out.sql"), max_statements=1)
+
+    first = write_resume_script(result["manifest"], 0, str(tmp_path / "r0.sql"))
+    second = write_resume_script(result["manifest"], 1, str(tmp_path / "r1.sql"))
+    first_text = open(first["script"], encoding="utf-8").read()
+    second_text = open(second["script"], encoding="utf-8").read()
+
+    assert "SET SCHEMA A;" in first_text.split("-- batch 1")[0]
+    assert "SET SCHEMA B" not in first_text.split("-- batch 1")[0]
+    assert second_text.split("-- batch 2")[0].count("SET SCHEMA") == 1
+    assert "SET SCHEMA B;" in second_text.split("-- batch 2")[0]
@@ -0,0 +1,14 @@
+from syscat_stats import CatalogStats
+from sql_cardinality import CardinalityEstimator
+
+
+def test_cte_references_use_the_cte_estimate():
+    catalog = CatalogStats()
+    catalog.add_rows([{"TABSCHEMA": "APP", "TABNAME": "ORDERS", "CARD": "500000"},
+                      {"TABSCHEMA": "APP", "TABNAME": "CUSTOMERS", "CARD": "20000"}])
+    result = CardinalityEstimator(catalog).estimate_statement(
+        "WITH big AS (SELECT cust_id FROM orders) SELECT * FROM big b JOIN customers c ON b.cust_id = c.id")
+
+    assert result["missing_stats"] == []
+    reference = next(step for step in result["steps"] if step["step"] == "cte_scan")
+    assert reference["cte"] == "big" and reference["rows"] == 500000.0
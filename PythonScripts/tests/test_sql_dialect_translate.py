@@ -0,0 +1,47 @@
+from sql_dialect_translate import translate_sql
+
+
+def test_db2_order_by_keeps_nulls_high_on_postgres():
+    # DB2 sorts NULL above every value, as PostgreSQL does, so no NULLS clause is needed
+    assert translate_sql("SELECT a FROM t ORDER BY a", "db2", "postgres").split() == \
+        "SELECT a FROM t ORDER BY a".split()
+    assert translate_sql("SELECT a FROM t ORDER BY a DESC", "db2", "postgres").split() == \
+        "SELECT a FROM t ORDER BY a DESC".split()
+
+
+def test_explicit_db2_nulls_clause_is_preserved():
+    assert "a NULLS FIRST" in translate_sql("SELECT a FROM t ORDER BY a NULLS FIRST", "db2", "postgres")
+
+
+def test_keyset_parameters_are_positional_on_postgres(tmp_path):
+    from sql_dialect_translate import keyset_sql
+    from sql_to_mmd import load_schema_model
+
+    schema = tmp_path / "schema.sql"
+    schema.write_text("CREATE TABLE orders (id INTEGER NOT NULL PRIMARY KEY, created DATE);", encoding="utf-8")
+    sql, report = keyset_sql("SELECT id, created FROM orders ORDER BY created OFFSET 20 ROWS",
+                             "db2", "postgres", load_schema_model(str(schema)))
+
+    assert "%(" not in sql
+    assert "(created, id) > ($1, $2)" in sql
+    assert [(p["name"], p["position"]) for p in report[0]["parameters"]] == [("last_created", 1), ("last_id", 2)]
+
+
+def test_nolock_only_on_tables_read_outside_ctes():
+    sql = translate_sql("WITH c AS (SELECT a FROM t) SELECT * FROM c JOIN u ON c.a = u.a WITH UR", "db2", "tsql")
+    assert "FROM t WITH (NOLOCK)" in sql and "JOIN u WITH (NOLOCK)" in sql
+    assert "FROM c\n" in sql
+
+    sql = translate_sql("UPDATE t SET a = 1 WHERE b IN (SELECT b FROM u) WITH UR", "db2", "tsql")
+    assert sql.startswith("UPDATE t SET") and "FROM u WITH (NOLOCK)" in sql
+
+
+def test_fast_insert_path_matches_the_parser_layout():
+    long_text = "x" * 90
+    sql = ";\n".join([
+        "INSERT INTO t (a, b) VALUES (1, 'one')",
+        "INSERT INTO t (a, b) VALUES (2, 'it''s\nsplit')",
+        f"INSERT INTO t (a, b) VALUES (3, '{long_text}')",
+    ])
+    for target in ("postgres", "tsql", "mysql"):
+        assert translate_sql(sql, "postgres", target) == translate_sql(sql, "postgres", target, fast_inserts=False)
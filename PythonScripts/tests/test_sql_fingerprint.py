@@ -0,0 +1,13 @@
+from sql_fingerprint import WorkloadAggregator
+
+
+def test_insert_arity_keeps_separate_fingerprints():
+    aggregator = WorkloadAggregator()
+    aggregator.add("INSERT INTO t VALUES (1,2)")
+    aggregator.add("INSERT INTO t VALUES (1,2,3)")
+    aggregator.add("SELECT * FROM t WHERE a IN (1,2)")
+    aggregator.add("SELECT * FROM t WHERE a IN (1,2,3)")
+
+    counts = {entry["fingerprint"]: entry["executions"] for entry in aggregator.top()}
+    assert counts == {"INSERT INTO t VALUES (?, ?)": 1.0, "INSERT INTO t VALUES (?, ?, ?)": 1.0,
+                      "SELECT * FROM t WHERE a IN (?)": 2.0}
@@ -0,0 +1,19 @@
+from sql_to_mmd import load_schema_model
+from sql_index_redundancy import find_redundant_indexes
+
+
+def findings_for(tmp_path, ddl):
+    schema = tmp_path / "schema.sql"
+    schema.write_text(ddl, encoding="utf-8")
+    findings, _ = find_redundant_indexes(load_schema_model(str(schema)))
+    return {finding["index"]: finding for finding in findings}
+
+
+def test_unique_index_on_constraint_columns_is_not_dropped(tmp_path):
+    findings = findings_for(tmp_path, """
+        CREATE TABLE customers (id INTEGER NOT NULL PRIMARY KEY, code VARCHAR(10) NOT NULL, UNIQUE (code));
+        CREATE UNIQUE INDEX ux_c_code ON customers (code);
+        CREATE INDEX ix_c_code ON customers (code);
+    """)
+    assert findings["ux_c_code"]["drop"] is False and findings["ux_c_code"]["ddl"] is None
+    assert findings["ix_c_code"]["ddl"] == "DROP INDEX ix_c_code;"
@@ -0,0 +1,11 @@
+from sql_subset import ScalableBloomFilter
+
+
+def test_repeated_keys_do_not_grow_a_bloom_key_set():
+    keys = ScalableBloomFilter(50)
+    for row in range(20000):
+        keys.add(hash((str(row % 10),)))
+
+    assert len(keys) == 10
+    assert len(keys.slices) == 1
+    assert all(hash((str(value),)) in keys for value in range(10))
@@ -0,0 +1,27 @@
+from sql_to_mmd import generate_mermaid_erd, parse_sql_to_tables
+
+
+def view_entity(ddl, view_name):
+    views = []
+    tables, indexes = parse_sql_to_tables(ddl, views=views)
+    lines = generate_mermaid_erd(tables, indexes, views=views).splitlines()
+    start = next(i for i, line in enumerate(lines) if line.strip().startswith(f'{view_name}["'))
+    end = lines.index("    }", start)
+    return [line.strip() for line in lines[start + 1:end]]
+
+
+SCHEMA = """
+    CREATE TABLE orders (id INT PRIMARY KEY, total DECIMAL(10,2));
+    CREATE VIEW v_dbl AS SELECT o.id, o.total * 2 AS dbl FROM orders o;
+    CREATE VIEW v_all AS SELECT * FROM v_dbl;
+    CREATE VIEW v_unknown AS SELECT * FROM missing_table;
+"""
+
+
+def test_only_bare_column_references_keep_their_type():
+    assert view_entity(SCHEMA, "v_dbl") == ['int id "from orders.id"', 'expr dbl "from orders.total"']
+
+
+def test_select_star_expands_from_the_model_or_emits_a_placeholder():
+    assert view_entity(SCHEMA, "v_all") == ['int id "from v_dbl.id"', 'expr dbl "from v_dbl.dbl"']
+    assert view_entity(SCHEMA, "v_unknown") == ['expr all_columns "SELECT * from missing_table"']
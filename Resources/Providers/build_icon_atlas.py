@@ -0,0 +1,157 @@
+"""Pre-render provider logos into per-DPI icons, multi-size .ico files and one atlas.
+
+Run after fix_logos.py. For every logo PNG in this folder, Icons/ gets
+<name>_<size>.png for each size, <name>.ico with all sizes, and atlas.png
+(one row per size, one column per provider) with atlas.json giving the offset
+of every icon, so the app can load one small pre-scaled image at startup.
+The atlas always covers every logo; glob patterns only limit which per-icon
+files are rebuilt. Icons left behind by a deleted logo are removed.
+Output is deterministic: the same sources always give byte-identical files,
+and files whose bytes would not change are not rewritten.
+
+    python build_icon_atlas.py
+    python build_icon_atlas.py "db2*.png" --check
+"""
+import argparse
+import hashlib
+import json
+import sys
+from io import BytesIO
+from pathlib import Path
+
+from PIL import Image
+
+DIR = Path(__file__).resolve().parent
+OUTPUT = DIR / "Icons"
+SIZES = [16, 24, 32, 48, 64, 128]
+# Transparent gap between atlas cells so bilinear sampling never bleeds into a neighbour
+PADDING = 2
+
+
+def square(img: Image.Image) -> Image.Image:
+    """Center the logo on a transparent square canvas so scaling keeps its aspect ratio."""
+    side = max(img.size)
+    canvas = Image.new("RGBA", (side, side), (0, 0, 0, 0))
+    canvas.paste(img, ((side - img.width) // 2, (side - img.height) // 2))
+    return canvas
+
+
+def render(source: Path) -> dict:
+    with Image.open(source) as img:
+        base = square(img.convert("RGBA"))
+    return {size: base.resize((size, size), Image.LANCZOS) for size in SIZES}
+
+
+def png_bytes(img: Image.Image) -> bytes:
+    buffer = BytesIO()
+    img.save(buffer, "PNG", compress_level=9)
+    return buffer.getvalue()
+
+
+def ico_bytes(icons: dict) -> bytes:
+    # ICO entries are capped at 256 px; every size is pre-scaled, not resampled by the encoder
+    buffer = BytesIO()
+    largest = icons[max(SIZES)]
+    largest.save(buffer, "ICO", sizes=[(s, s) for s in SIZES],
+                 append_images=[icons[s] for s in SIZES if s != max(SIZES)])
+    return buffer.getvalue()
+
+
+def build(sources, selected=None) -> dict:
+    """
+    Return {relative output path: bytes}: the atlas from all sources, plus the
+    per-icon files of the selected sources (all of them when selected is None).
+    """
+    outputs = {}
+    rendered = {}
+    for source in sources:
+        name = source.stem.lower()
+        rendered[name] = render(source)
+        if selected is not None and source not in selected:
+            continue
+        for size, icon in rendered[name].items():
+            outputs[f"{name}_{size}.png"] = png_bytes(icon)
+        outputs[f"{name}.ico"] = ico_bytes(rendered[name])
+
+    names = sorted(rendered)
+    cell = {size: size + PADDING for size in SIZES}
+    width = max((len(names) * cell[size] for size in SIZES), default=0)
+    height = sum(cell[size] for size in SIZES)
+    atlas = Image.new("RGBA", (max(width, 1), max(height, 1)), (0, 0, 0, 0))
+    index = {"image": "atlas.png", "width": atlas.width, "height": atlas.height,
+             "sizes": SIZES, "padding": PADDING, "providers": {}}
+    y = 0
+    for size in SIZES:
+        for column, name in enumerate(names):
+            x = column * cell[size]
+            atlas.paste(rendered[name][size], (x, y))
+            index["providers"].setdefault(name, {})[str(size)] = {
+                "x": x, "y": y, "width": size, "height": size, "file": f"{name}_{size}.png"
+            }
+        y += cell[size]
+    outputs["atlas.png"] = png_bytes(atlas)
+
+    index["sources"] = {
+        source.name: hashlib.sha256(source.read_bytes()).hexdigest() for source in sources
+    }
+    outputs["atlas.json"] = (json.dumps(index, indent=2, sort_keys=True) + "\n").encode("utf-8")
+    return outputs
+
+
+def orphans(sources) -> list:
+    """Per-icon files in Icons/ whose logo no longer exists."""
+    names = {source.stem.lower() for source in sources}
+    icon_names = {f"{name}_{size}.png" for name in names for size in SIZES} | {f"{name}.ico" for name in names}
+    found = []
+    for path in sorted(OUTPUT.glob("*")) if OUTPUT.is_dir() else []:
+        stem, _, size = path.stem.rpartition("_")
+        per_icon = (path.suffix.lower() == ".ico"
+                    or (path.suffix.lower() == ".png" and stem and size in {str(s) for s in SIZES}))
+        if path.is_file() and per_icon and path.name not in icon_names:
+            found.append(path.name)
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("patterns", nargs="*", help="glob(s) relative to this folder (default *.png)")
+    parser.add_argument("--check", action="store_true",
+                        help="exit with status 1 if any output is missing or stale, without writing")
+    args = parser.parse_args()
+
+    sources = sorted(p for p in DIR.glob("*.png") if p.is_file())
+    selected = None
+    if args.patterns:
+        selected = set()
+        for pattern in args.patterns:
+            selected.update(p for p in DIR.glob(pattern) if p in sources)
+        if not selected:
+            print("No provider logos match the given pattern(s).")
+    if not sources:
+        print("No provider logos found.")
+        return
+
+    stale = []
+    removed = orphans(sources)
+    if not args.check:
+        for relative in removed:
+            (OUTPUT / relative).unlink()
+    for relative, data in build(sources, selected).items():
+        target = OUTPUT / relative
+        if target.exists() and target.read_bytes() == data:
+            continue
+        stale.append(relative)
+        if not args.check:
+            OUTPUT.mkdir(exist_ok=True)
+            target.write_bytes(data)
+
+    if args.check:
+        report = [f"orphan: {relative}" for relative in removed] + [f"stale: {relative}" for relative in stale]
+        print("\n".join(report) or "Icons are up to date.")
+        sys.exit(1 if report else 0)
+    print(f"Provider icons: {len(sources)} logo(s), {len(stale)} file(s) written, "
+          f"{len(removed)} orphan(s) removed in {OUTPUT.name}/.")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,38 +1,199 @@
-"""Make grey/white transparent on DB2 and SQLite logos; brighten all three."""
+"""Make grey/white transparent on provider logos and brighten them.
+
+Every PNG in this folder (or the given globs) is processed with NumPy array
+operations. The untouched source is kept in _originals/ and always used as the
+input, and .fix_logos_manifest.json records source/output hashes and settings,
+so re-running is a no-op and re-tuning never compounds the brightening.
+
+A logo with no manifest entry is refused, since it may already be processed:
+--adopt records such logos as finished outputs without touching them (logos
+shipped before the manifest existed), and --add processes them as new,
+unprocessed sources. An adopted logo has no original, so it cannot be
+re-tuned until its unprocessed source is put back in place of the file.
+
+    python fix_logos.py                   # all *.png next to this script
+    python fix_logos.py "db2*.png" --dry-run
+    python fix_logos.py --force --brighten=1.3
+    python fix_logos.py newdb.png --add
+    python fix_logos.py --adopt
+"""
+import argparse
+import hashlib
+import json
+from io import BytesIO
 from pathlib import Path
+
+import numpy as np
 from PIL import Image
 
 DIR = Path(__file__).resolve().parent
+ORIGINALS = DIR / "_originals"
+MANIFEST = DIR / ".fix_logos_manifest.json"
 BRIGHTEN = 1.25
 WHITE_GREY_LUM = 240
 GREY_CHROMA = 25
+# Logos whose white/grey background is made transparent (file stem, lower case)
+TRANSPARENT_BACKGROUND = {"db2", "sqlite"}
 
-def is_white_or_grey(r, g, b):
+
+def sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def white_or_grey_mask(rgb: np.ndarray) -> np.ndarray:
+    r, g, b = rgb[..., 0], rgb[..., 1], rgb[..., 2]
     lum = (r + g + b) // 3
-    if lum < WHITE_GREY_LUM:
-        return False
-    return abs(r - g) <= GREY_CHROMA and abs(g - b) <= GREY_CHROMA and abs(r - b) <= GREY_CHROMA
-
-def process(path: Path, make_transparent: bool):
-    img = Image.open(path).convert("RGBA")
-    w, h = img.size
-    data = list(img.getdata())
-    out = []
-    for (r, g, b, a) in data:
-        if make_transparent and is_white_or_grey(r, g, b):
-            out.append((r, g, b, 0))
+    return ((lum >= WHITE_GREY_LUM)
+            & (np.abs(r - g) <= GREY_CHROMA)
+            & (np.abs(g - b) <= GREY_CHROMA)
+            & (np.abs(r - b) <= GREY_CHROMA))
+
+
+def process_array(rgba: np.ndarray, make_transparent: bool, brighten: float):
+    """Return the processed RGBA array and the transparency mask."""
+    pixels = rgba.astype(np.int32)
+    rgb, alpha = pixels[..., :3], pixels[..., 3]
+    mask = white_or_grey_mask(rgb) if make_transparent else np.zeros(alpha.shape, dtype=bool)
+    bright = np.minimum(255, (rgb * brighten).astype(np.int32))
+    out = np.empty_like(pixels)
+    # Transparent pixels keep their colour; everything else is brightened
+    out[..., :3] = np.where(mask[..., None], rgb, bright)
+    out[..., 3] = np.where(mask, 0, alpha)
+    return out.astype(np.uint8), mask
+
+
+def encode_png(rgba: np.ndarray) -> bytes:
+    buffer = BytesIO()
+    Image.fromarray(rgba, "RGBA").save(buffer, "PNG", compress_level=9)
+    return buffer.getvalue()
+
+
+def load_manifest() -> dict:
+    if MANIFEST.exists():
+        return json.loads(MANIFEST.read_text(encoding="utf-8"))
+    return {}
+
+
+def collect(patterns):
+    files = set()
+    for pattern in patterns or ["*.png"]:
+        files.update(p for p in DIR.glob(pattern) if p.is_file() and p.suffix.lower() == ".png")
+    return sorted(files)
+
+
+def adopt(path: Path, settings: dict, manifest: dict, dry_run: bool) -> dict:
+    """Record a logo as an already processed output, without changing it."""
+    if path.name in manifest:
+        return {"file": path.name, "action": "unchanged", "reason": "already in manifest"}
+    if not dry_run:
+        manifest[path.name] = {
+            "source_sha256": None,
+            "output_sha256": sha256(path.read_bytes()),
+            "settings": settings,
+            "adopted": True,
+        }
+    return {"file": path.name, "action": "would adopt" if dry_run else "adopted"}
+
+
+def process(path: Path, settings: dict, manifest: dict, dry_run: bool, force: bool, add: bool = False) -> dict:
+    current = path.read_bytes()
+    entry = manifest.get(path.name)
+    original_path = ORIGINALS / path.name
+
+    if entry is None and not add:
+        return {"file": path.name, "action": "refused",
+                "reason": "not in manifest; use --adopt if already processed or --add if unprocessed"}
+    entry = entry or {}
+
+    # A file that no longer matches our last output was replaced: it is the new source
+    is_output = entry.get("output_sha256") == sha256(current)
+    from_original = is_output and original_path.exists()
+    if from_original:
+        source = original_path.read_bytes()
+        if not force and entry.get("settings") == settings and entry.get("source_sha256") == sha256(source):
+            return {"file": path.name, "action": "unchanged"}
+    elif is_output:
+        # Adopted output: without its original, any reprocessing would compound
+        if entry.get("settings") == settings and not force:
+            return {"file": path.name, "action": "unchanged"}
+        return {"file": path.name, "action": "refused",
+                "reason": "no original in _originals/; replace the logo with its unprocessed source to re-tune"}
+    else:
+        source = current
+
+    with Image.open(original_path if from_original else path) as img:
+        rgba = np.asarray(img.convert("RGBA"))
+    out, mask = process_array(rgba, path.stem.lower() in settings["transparent"], settings["brighten"])
+    data = encode_png(out)
+
+    with Image.open(path) as img:
+        changed = np.any(out != np.asarray(img.convert("RGBA")), axis=-1)
+    report = {
+        "file": path.name,
+        "action": "would write" if dry_run else "written",
+        "size": f"{rgba.shape[1]}x{rgba.shape[0]}",
+        "pixels_changed": int(changed.sum()),
+        "made_transparent": int(mask.sum()),
+        "bytes": f"{len(current)} -> {len(data)}",
+    }
+    if dry_run:
+        return report
+
+    if not from_original:
+        ORIGINALS.mkdir(exist_ok=True)
+        original_path.write_bytes(source)
+    if data != current:
+        tmp = path.with_suffix(".tmp.png")
+        tmp.write_bytes(data)
+        tmp.replace(path)
+    manifest[path.name] = {
+        "source_sha256": sha256(source),
+        "output_sha256": sha256(data),
+        "settings": settings,
+    }
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("patterns", nargs="*", help="glob(s) relative to this folder (default *.png)")
+    parser.add_argument("--dry-run", action="store_true", help="report what would change without writing")
+    parser.add_argument("--force", action="store_true", help="reprocess even when the manifest matches")
+    parser.add_argument("--adopt", action="store_true",
+                        help="record logos missing from the manifest as processed outputs, unchanged")
+    parser.add_argument("--add", action="store_true",
+                        help="process logos missing from the manifest as new, unprocessed sources")
+    parser.add_argument("--brighten", type=float, default=BRIGHTEN)
+    parser.add_argument("--transparent", default=",".join(sorted(TRANSPARENT_BACKGROUND)),
+                        help="comma-separated logo names whose white/grey background becomes transparent")
+    args = parser.parse_args()
+
+    settings = {
+        "brighten": args.brighten,
+        "white_grey_lum": WHITE_GREY_LUM,
+        "grey_chroma": GREY_CHROMA,
+        "transparent": sorted(name.strip().lower() for name in args.transparent.split(",") if name.strip()),
+    }
+    if args.adopt and args.add:
+        parser.error("--adopt and --add are mutually exclusive")
+    manifest = load_manifest()
+    refused = 0
+    for path in collect(args.patterns):
+        if args.adopt:
+            report = adopt(path, settings, manifest, args.dry_run)
         else:
-            nr = min(255, int(r * BRIGHTEN))
-            ng = min(255, int(g * BRIGHTEN))
-            nb = min(255, int(b * BRIGHTEN))
-            out.append((nr, ng, nb, a))
-    img.putdata(out)
-    tmp = path.with_suffix(".tmp.png")
-    img.save(tmp, "PNG")
-    img.close()
-    tmp.replace(path)
-
-process(DIR / "db2.png", make_transparent=True)
-process(DIR / "sqlite.png", make_transparent=True)
-process(DIR / "postgresql.png", make_transparent=False)
-print("Provider logos updated: transparency and brightness applied.")
+            report = process(path, settings, manifest, args.dry_run, args.force, args.add)
+        refused += report["action"] == "refused"
+        print("  ".join(f"{key}={value}" for key, value in report.items()))
+
+    if not args.dry_run:
+        MANIFEST.write_text(json.dumps(manifest, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+    if refused:
+        raise SystemExit(f"{refused} logo(s) refused; see the reasons above")
+    if not args.dry_run:
+        print("Provider logos adopted into the manifest." if args.adopt
+              else "Provider logos updated: transparency and brightness applied.")
+
+
+if __name__ == "__main__":
+    main()